@@ -0,0 +1,142 @@
+"""
+API benchmarks: throughput of /performances through the ASGI app with a number
+of stored performances, with and without the response cache.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.cache import MemoryCache, response_cache
+from src.db import get_session_factory
+from src.main import app
+
+from .common import ameasure
+from .store import create_benchmark_engine, seed
+
+PAGE_SIZE = 100
+
+
+async def _get(client: httpx.AsyncClient, requests: int, **params) -> None:
+    """Send the same request for a page of performances a number of times."""
+    for _ in range(requests):
+        response = await client.get("/performances/", params=params)
+        response.raise_for_status()
+
+
+async def _walk(client: httpx.AsyncClient) -> None:
+    """Read all pages of performances following cursors."""
+    params = {"limit": PAGE_SIZE}
+    while True:
+        response = await client.get("/performances/", params=params)
+        response.raise_for_status()
+        if "X-Next-Cursor" not in response.headers:
+            return
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+async def _export(client: httpx.AsyncClient) -> None:
+    """Stream the NDJSON export of all performances."""
+    async with client.stream("GET", "/performances/export") as response:
+        response.raise_for_status()
+        async for _ in response.aiter_bytes():
+            pass
+
+
+async def _run(
+    database_url: str, size: int, rounds: int, requests: int
+) -> list[dict[str, Any]]:
+    """Run all scenarios in a single event loop, so connections are reused."""
+    async_engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    backend = response_cache.backend
+
+    # Scenarios with the number of requests they send
+    scenarios = {
+        "first-page": (lambda: _get(client, requests, limit=PAGE_SIZE), requests),
+        "theater-page": (
+            lambda: _get(client, requests, theater_name="fomenki", limit=PAGE_SIZE),
+            requests,
+        ),
+        "walk": (lambda: _walk(client), size // PAGE_SIZE + 1),
+        "export": (lambda: _export(client), 1),
+    }
+
+    results = []
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            for cache in ("none", "memory"):
+                response_cache.backend = MemoryCache() if cache == "memory" else None
+                for scenario, (function, count) in scenarios.items():
+                    # Exports are streamed past the cache
+                    if scenario == "export" and cache != "none":
+                        continue
+                    timings = await ameasure(function, rounds)
+                    results.append(
+                        {
+                            "benchmark": "api",
+                            "name": f"{size}/{scenario}/cache-{cache}",
+                            "params": {
+                                "stored": size,
+                                "scenario": scenario,
+                                "cache": cache,
+                                "requests": count,
+                            },
+                            "requests_per_second": count / timings["min"],
+                            **timings,
+                        }
+                    )
+    finally:
+        response_cache.backend = backend
+        app.dependency_overrides.pop(get_session_factory, None)
+        await async_engine.dispose()
+    return results
+
+
+def run(
+    rounds: int = 5,
+    sizes: tuple[int, ...] = (10_000,),
+    requests: int = 100,
+    database_url: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Measure the throughput of /performances with a number of stored performances.
+
+    Scenarios are repeated requests for the first page of all performances and
+    of a theater's ones, reading all pages following cursors, with and without
+    the in-memory response cache, and the NDJSON export.
+
+    Args:
+        rounds: Number of times every scenario is run
+        sizes: Numbers of stored performances
+        requests: Number of requests for the same page per round
+        database_url: URL of a database to wipe and use, a temporary SQLite
+            file by default
+
+    Returns:
+        Results per number of stored performances, scenario and cache backend
+    """
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_benchmark_engine(database_url, Path(directory))
+            try:
+                seed(engine, size)
+                # psycopg provides both drivers, SQLite needs aiosqlite
+                async_url = engine.url
+                if async_url.drivername == "sqlite":
+                    async_url = async_url.set(drivername="sqlite+aiosqlite")
+                results += asyncio.run(_run(async_url, size, rounds, requests))
+            finally:
+                engine.dispose()
+    return results
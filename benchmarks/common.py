@@ -0,0 +1,81 @@
+import datetime
+import importlib.util
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from src.scrapers.parsers import PARSERS, _is_available
+
+
+def _summarize(durations: list[float]) -> dict[str, float]:
+    """Summarize durations of rounds in seconds."""
+    return {
+        "rounds": len(durations),
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+    }
+
+
+def measure(function: Callable[[], Any], rounds: int) -> dict[str, float]:
+    """
+    Time a function over a number of rounds.
+
+    Args:
+        function: Function to call once per round
+        rounds: Number of rounds
+
+    Returns:
+        Minimum, median and mean duration of a call in seconds
+    """
+    durations = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started_at)
+    return _summarize(durations)
+
+
+async def ameasure(
+    function: Callable[[], Awaitable[Any]], rounds: int
+) -> dict[str, float]:
+    """
+    Time an async function over a number of rounds.
+
+    Args:
+        function: Async function to await once per round
+        rounds: Number of rounds
+
+    Returns:
+        Minimum, median and mean duration of a call in seconds
+    """
+    durations = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        await function()
+        durations.append(time.perf_counter() - started_at)
+    return _summarize(durations)
+
+
+def get_environment() -> dict[str, Any]:
+    """Describe the environment the benchmarks run in, to compare results."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "started_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parsers": [
+            name for name, (_, modules) in PARSERS.items() if _is_available(modules)
+        ],
+        "orjson": importlib.util.find_spec("orjson") is not None,
+    }
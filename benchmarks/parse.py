@@ -0,0 +1,81 @@
+"""
+Parsing benchmarks: the saved Fomenki timetable page and synthetic pages with
+thousands of events, with every installed HTML parser backend.
+"""
+
+import re
+from pathlib import Path
+from typing import Any
+
+from src.scrapers.fomenki import FomenkiScraper
+from src.scrapers.parsers import PARSERS, _is_available, get_parser
+
+from .common import measure
+
+FIXTURE = Path(__file__).parent.parent / "tests/scrapers/fixtures/fomenki_sample.html"
+
+EVENTS_START = '<div class="events">'
+EVENT_START = re.compile(r'<div class="event[ "]')
+
+
+def make_page(html_content: str, events: int) -> str:
+    """
+    Build a timetable page with a given number of events by repeating the
+    events of a saved page.
+
+    Args:
+        html_content: Saved timetable page
+        events: Number of events on the built page
+
+    Returns:
+        HTML content of the built page
+    """
+    start = html_content.index(EVENTS_START) + len(EVENTS_START)
+    starts = [match.start() for match in EVENT_START.finditer(html_content, start)]
+    # Every event but the last one ends where the next one starts
+    blocks = [html_content[a:b] for a, b in zip(starts, starts[1:])]
+    repeated = (blocks * (events // len(blocks) + 1))[:events]
+    return html_content[:start] + "".join(repeated) + "</div></div></body></html>"
+
+
+def run(rounds: int = 5, sizes: tuple[int, ...] = (1000, 5000)) -> list[dict[str, Any]]:
+    """
+    Time `FomenkiScraper.parse_page` on the saved page and on synthetic pages.
+
+    Args:
+        rounds: Number of times every page is parsed
+        sizes: Numbers of events on synthetic pages
+
+    Returns:
+        Results per page and parser backend
+    """
+    fixture = FIXTURE.read_text(encoding="utf-8")
+    pages = {"fixture": fixture}
+    pages.update({f"synthetic-{size}": make_page(fixture, size) for size in sizes})
+
+    results = []
+    for page_name, html_content in pages.items():
+        expected = None
+        for backend, (_, modules) in reversed(PARSERS.items()):
+            if not _is_available(modules):
+                continue
+            parser = get_parser(backend)
+            performances = FomenkiScraper.parse_page(html_content, parser)
+            expected = expected or performances
+
+            timings = measure(
+                lambda parser=parser: FomenkiScraper.parse_page(html_content, parser),
+                rounds,
+            )
+            results.append(
+                {
+                    "benchmark": "parse",
+                    "name": f"{page_name}/{backend}",
+                    "params": {"page": page_name, "parser": backend},
+                    "performances": len(performances),
+                    "identical": performances == expected,
+                    "events_per_second": len(performances) / timings["min"],
+                    **timings,
+                }
+            )
+    return results
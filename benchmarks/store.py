@@ -0,0 +1,193 @@
+"""
+Storing benchmarks: synchronizing a scrape of one month with a database that
+already holds many performances, on SQLite or PostgreSQL.
+"""
+
+import asyncio
+import datetime
+import tempfile
+from collections.abc import Iterator
+from functools import partial
+from itertools import batched, repeat
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.db import create_db_and_tables
+from src.models import Performance, ScrapedPerformance, Show, Stage, Theater
+from src.scrapers.manager import ScraperManager
+from src.services.listing_service import ListingService
+
+from .common import measure
+
+# Stored performances are spread over the years before the benchmarked months
+SHOW_COUNT = 500
+FIRST_DATETIME = datetime.datetime(2000, 1, 1, 19, 0)
+STORED_INTERVAL = datetime.timedelta(minutes=10)
+SCRAPED_YEAR = 2100
+SCRAPED_COUNT = 300
+
+
+def create_benchmark_engine(database_url: str | None, directory: Path) -> Engine:
+    """
+    Create an engine with empty tables.
+
+    Args:
+        database_url: URL of a database to wipe, a temporary SQLite file if None
+        directory: Directory of the temporary SQLite file
+
+    Returns:
+        Database engine
+    """
+    if database_url is None:
+        database_url = f"sqlite:///{directory / 'benchmark.db'}"
+    engine = create_engine(database_url)
+    SQLModel.metadata.drop_all(engine)
+    create_db_and_tables(engine)
+    return engine
+
+
+def seed(engine: Engine, rows: int, batch_size: int = 10_000) -> int:
+    """
+    Store a theater, a stage, its shows and a number of past performances.
+
+    Args:
+        engine: Database engine
+        rows: Number of stored performances
+        batch_size: Number of performances per INSERT statement
+
+    Returns:
+        ID of the stage
+    """
+    with Session(engine) as session:
+        theater = Theater(
+            name="fomenki",
+            full_name="Мастерская Петра Фоменко",
+            url="https://fomenko.theatre.ru/",
+        )
+        stage = Stage(name="Старая сцена, Зелёный зал", theater=theater)
+        shows = [
+            Show(title=f"Спектакль {i}", director="Пётр Фоменко", theater=theater)
+            for i in range(SHOW_COUNT)
+        ]
+        session.add(stage)
+        session.add_all(shows)
+        session.commit()
+        stage_id = stage.stage_id
+        show_ids = [show.show_id for show in shows]
+
+        for batch in batched(range(rows), batch_size):
+            session.execute(
+                insert(Performance),
+                [
+                    {
+                        "show_id": show_ids[i % SHOW_COUNT],
+                        "stage_id": stage_id,
+                        "datetime": FIRST_DATETIME + i * STORED_INTERVAL,
+                    }
+                    for i in batch
+                ],
+            )
+        ListingService().refresh(session)
+        session.commit()
+    return stage_id
+
+
+def make_scrape(
+    stage_id: int, month: int, director: str = "Пётр Фоменко"
+) -> list[ScrapedPerformance]:
+    """Make a scrape of performances in one month of `SCRAPED_YEAR`."""
+    start = datetime.datetime(SCRAPED_YEAR + month // 12, month % 12 + 1, 1, 12, 0)
+    return [
+        ScrapedPerformance(
+            title=f"Спектакль {i}",
+            stage_id=stage_id,
+            datetime=start + i * datetime.timedelta(hours=2),
+            director=director,
+        )
+        for i in range(SCRAPED_COUNT)
+    ]
+
+
+def store(engine: Engine, performances: list[ScrapedPerformance]) -> None:
+    """Store a scrape the way `ScraperManager.run_scraper` does."""
+    with Session(engine) as session:
+        asyncio.run(ScraperManager.store_performances(session, performances, "fomenki"))
+
+
+def store_next(
+    engine: Engine, stage_id: int, months: Iterator[int], directors: Iterator[str]
+) -> None:
+    """Store a scrape of the next month with the next director."""
+    store(engine, make_scrape(stage_id, next(months), next(directors)))
+
+
+def run(
+    rounds: int = 5,
+    sizes: tuple[int, ...] = (10_000, 100_000),
+    database_url: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Time `ScraperManager.store_performances` with a number of stored performances.
+
+    Scenarios are a scrape of a new month (all performances are inserted),
+    an unchanged scrape and a scrape with every performance changed.
+
+    Args:
+        rounds: Number of times every scenario is run
+        sizes: Numbers of stored performances
+        database_url: URL of a database to wipe and use, a temporary SQLite
+            file by default
+
+    Returns:
+        Results per number of stored performances and scenario
+    """
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_benchmark_engine(database_url, Path(directory))
+            try:
+                stage_id = seed(engine, size)
+                store(engine, make_scrape(stage_id, 0))
+
+                director = repeat("Пётр Фоменко")
+                scenarios = {
+                    "new-month": partial(
+                        store_next,
+                        engine,
+                        stage_id,
+                        iter(range(1, rounds + 1)),
+                        director,
+                    ),
+                    "unchanged": partial(
+                        store_next, engine, stage_id, repeat(0), director
+                    ),
+                    "changed": partial(
+                        store_next,
+                        engine,
+                        stage_id,
+                        repeat(0),
+                        (f"Режиссёр {i}" for i in range(rounds)),
+                    ),
+                }
+                for scenario, function in scenarios.items():
+                    timings = measure(function, rounds)
+                    results.append(
+                        {
+                            "benchmark": "store",
+                            "name": f"{engine.dialect.name}-{size}/{scenario}",
+                            "params": {
+                                "database": engine.dialect.name,
+                                "stored": size,
+                                "scraped": SCRAPED_COUNT,
+                                "scenario": scenario,
+                            },
+                            "performances_per_second": SCRAPED_COUNT / timings["min"],
+                            **timings,
+                        }
+                    )
+            finally:
+                engine.dispose()
+    return results
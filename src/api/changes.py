@@ -0,0 +1,64 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from ..changes import stream_changes, wait_for_changes
+from ..config import settings
+from ..db import SessionFactoryDep
+from ..models import PerformanceChange, TheaterName
+from ..serialization import MEDIA_TYPES
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"],
+)
+
+
+@router.get("/")
+async def get_changes(
+    session_factory: SessionFactoryDep,
+    since: Annotated[int, Query(ge=0)] = 0,
+    theater_name: TheaterName | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    timeout: Annotated[
+        float, Query(ge=0, le=settings.CHANGES_POLL_TIMEOUT)
+    ] = settings.CHANGES_POLL_TIMEOUT,
+) -> list[PerformanceChange]:
+    """
+    Get inserted, rescheduled and removed performances logged after the
+    `since` sequence number, ordered by sequence number.
+
+    If there are none yet, the request waits up to `timeout` seconds for new
+    ones and returns an empty list if none are logged. Pass the sequence
+    number of the last returned change as `since` to get the next ones.
+    """
+    return await wait_for_changes(
+        session_factory,
+        since,
+        theater_name.value if theater_name else None,
+        limit=limit,
+        timeout=timeout,
+    )
+
+
+@router.get("/stream")
+async def stream_changes_events(
+    session_factory: SessionFactoryDep,
+    since: Annotated[int, Query(ge=0)] = 0,
+    theater_name: TheaterName | None = None,
+    last_event_id: Annotated[int | None, Header(ge=0)] = None,
+) -> StreamingResponse:
+    """
+    Stream changes logged after the `since` sequence number as Server-Sent
+    Events. Reconnecting clients resume after the `Last-Event-ID` they send.
+    """
+    return StreamingResponse(
+        stream_changes(
+            session_factory,
+            since if last_event_id is None else last_event_id,
+            theater_name.value if theater_name else None,
+        ),
+        media_type=MEDIA_TYPES["sse"],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,19 @@
 from fastapi import APIRouter
 
+from ..models import ScrapeResult
+from ..scrapers.manager import ScraperManager
+
 router = APIRouter(
     prefix="/db",
     tags=["database"],
     responses={404: {"description": "Not found"}},
 )
+
+
+@router.get("/sync/")
+async def get_sync_results() -> list[ScrapeResult]:
+    """
+    Get the result of the latest scrape and sync of each theater,
+    including the number of inserted, updated and cancelled performances.
+    """
+    return list(ScraperManager.last_results.values())
@@ -0,0 +1,34 @@
+from fastapi import HTTPException, Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..cache import calendar_feeds
+from ..services.calendar_service import CalendarService
+
+
+async def get_calendar_feed_response(
+    request: Request, session: AsyncSession, feed_key: str
+) -> Response:
+    """
+    Serve a pre-rendered calendar feed, from memory unless it is not cached.
+
+    Args:
+        request: GET request of the feed
+        session: SQLModel async database session, used on a cache miss
+        feed_key: Key of the feed
+
+    Returns:
+        Feed response
+
+    Raises:
+        HTTPException: If the feed was never rendered
+    """
+    service = CalendarService()
+    feed = await calendar_feeds.get(
+        feed_key, lambda key: service.aget_by_id(session, key)
+    )
+    if feed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Calendar feed {feed_key} not found",
+        )
+    return calendar_feeds.respond(request, feed)
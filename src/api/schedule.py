@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, status
+
+from ..db import SessionDep
+from ..models import ScrapeSchedule
+from ..services.schedule_service import ScheduleService
+
+router = APIRouter(
+    prefix="/schedule",
+    tags=["schedule"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/")
+async def get_schedules(session: SessionDep) -> list[ScrapeSchedule]:
+    """
+    Get last and next scrape times of all theaters.
+    """
+    service = ScheduleService()
+    return await service.aget_all(session)
+
+
+@router.get("/{theater_name}")
+async def get_schedule(theater_name: str, session: SessionDep) -> ScrapeSchedule:
+    """
+    Get last and next scrape times of a theater.
+    """
+    service = ScheduleService()
+    schedule = await service.aget_by_id(session, theater_name)
+    if schedule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Schedule for theater {theater_name} not found",
+        )
+    return schedule
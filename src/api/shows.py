@@ -0,0 +1,62 @@
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+
+from ..db import SessionDep
+from ..models import ShowResponse, TheaterName
+from ..services.calendar_service import get_feed_key
+from ..services.show_service import ShowResponseService
+from .feeds import get_calendar_feed_response
+
+router = APIRouter(
+    prefix="/shows",
+    tags=["shows"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/")
+async def get_shows(
+    session: SessionDep,
+    theater_name: TheaterName | None = None,
+    upcoming: bool = True,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+) -> list[ShowResponse]:
+    """
+    Get shows ordered by their next date, with the number of upcoming dates
+    and the stages they are performed on, optionally filtered by theater.
+    Shows without upcoming dates are included if `upcoming` is false.
+
+    Aggregates are precomputed after every scrape.
+    """
+    service = ShowResponseService()
+    return await service.aget_shows(
+        session, theater_name=theater_name, upcoming=upcoming, skip=skip, limit=limit
+    )
+
+
+@router.get("/{show_id}")
+async def get_show(show_id: int, session: SessionDep) -> ShowResponse:
+    """
+    Get show by ID.
+    """
+    service = ShowResponseService()
+    show = await service.aget_by_id(session, show_id)
+    if show is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Show with ID {show_id} not found",
+        )
+    return show
+
+
+@router.get("/{show_id}/calendar.ics", response_class=Response)
+async def get_show_calendar(
+    show_id: int, request: Request, session: SessionDep
+) -> Response:
+    """
+    Get the iCalendar feed of a show's dates, rendered after every scrape.
+    """
+    feed_key = get_feed_key("show", show_id)
+    return await get_calendar_feed_response(request, session, feed_key)
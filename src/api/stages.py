@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
-from ..db import engine
+from ..db import SessionDep
 from ..models import Stage, TheaterName
+from ..services.calendar_service import get_feed_key
 from ..services.stage_service import StageService
+from .feeds import get_calendar_feed_response
 
 router = APIRouter(
     prefix="/stages",
@@ -13,29 +14,40 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_stages(theater_name: TheaterName | None = None) -> list[Stage]:
+async def get_stages(
+    session: SessionDep, theater_name: TheaterName | None = None
+) -> list[Stage]:
     """
     Get all stages or filter by theater name if provided.
     """
-    with Session(engine) as session:
-        service = StageService()
-        if theater_name:
-            return service.get_by_theater_name(session, theater_name)
-        else:
-            return service.get_all(session)
+    service = StageService()
+    if theater_name:
+        return await service.aget_by_theater_name(session, theater_name)
+    else:
+        return await service.aget_all(session)
 
 
 @router.get("/{stage_id}")
-async def get_stage_by_id(stage_id: int) -> Stage:
+async def get_stage_by_id(stage_id: int, session: SessionDep) -> Stage:
     """
     Get stage by ID.
     """
-    with Session(engine) as session:
-        service = StageService()
-        stage = service.get_by_id(session, stage_id)
-        if stage is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Stage with ID {stage_id} not found",
-            )
-        return stage
+    service = StageService()
+    stage = await service.aget_by_id(session, stage_id)
+    if stage is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Stage with ID {stage_id} not found",
+        )
+    return stage
+
+
+@router.get("/{stage_id}/calendar.ics", response_class=Response)
+async def get_stage_calendar(
+    stage_id: int, request: Request, session: SessionDep
+) -> Response:
+    """
+    Get the iCalendar feed of a stage's performances, rendered after every scrape.
+    """
+    feed_key = get_feed_key("stage", stage_id)
+    return await get_calendar_feed_response(request, session, feed_key)
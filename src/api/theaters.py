@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
-from ..db import engine
+from ..db import SessionDep
 from ..models import Stage, Theater, TheaterName
+from ..services.calendar_service import get_feed_key
 from ..services.theater_service import TheaterService
+from .feeds import get_calendar_feed_response
 
 router = APIRouter(
     prefix="/theaters",
@@ -13,42 +14,52 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_theaters() -> list[Theater]:
+async def get_theaters(session: SessionDep) -> list[Theater]:
     """
     Get all theaters or filter by theater name if provided.
     """
-    with Session(engine) as session:
-        service = TheaterService()
-        return service.get_all(session)
+    service = TheaterService()
+    return await service.aget_all(session)
 
 
 @router.get("/id/{theater_id}")
-async def get_theater_by_id(theater_id: int) -> Theater:
+async def get_theater_by_id(theater_id: int, session: SessionDep) -> Theater:
     """
     Get theater by ID.
     """
-    with Session(engine) as session:
-        service = TheaterService()
-        theater = service.get_by_id(session, theater_id)
-        if theater is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"theater with ID {theater_id} not found",
-            )
-        return theater
+    service = TheaterService()
+    theater = await service.aget_by_id(session, theater_id)
+    if theater is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"theater with ID {theater_id} not found",
+        )
+    return theater
 
 
 @router.get("/name/{theater_name}")
-async def get_theater_by_name(theater_name: TheaterName) -> Theater:
+async def get_theater_by_name(
+    theater_name: TheaterName, session: SessionDep
+) -> Theater:
     """
     Get theater by name.
     """
-    with Session(engine) as session:
-        service = TheaterService()
-        theater = service.get_by_theater_name(session, theater_name)
-        if theater is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"theater with name {theater_name} not found",
-            )
-        return theater
+    service = TheaterService()
+    theater = await service.aget_by_theater_name(session, theater_name)
+    if theater is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"theater with name {theater_name} not found",
+        )
+    return theater
+
+
+@router.get("/{theater_name}/calendar.ics", response_class=Response)
+async def get_theater_calendar(
+    theater_name: TheaterName, request: Request, session: SessionDep
+) -> Response:
+    """
+    Get the iCalendar feed of a theater's performances, rendered after every scrape.
+    """
+    feed_key = get_feed_key("theater", theater_name.value)
+    return await get_calendar_feed_response(request, session, feed_key)
@@ -0,0 +1,406 @@
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from urllib.parse import urlencode
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .config import settings
+from .models import CachedResponse, CalendarFeed
+from .serialization import MEDIA_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Response headers stored along with cached bodies
+CACHED_HEADERS = ("content-type", "x-next-cursor")
+
+
+def matches_etag(request: Request, *etags: str) -> bool:
+    """Check whether the request's `If-None-Match` header lists any of the ETags."""
+    if_none_match = request.headers.get("if-none-match", "")
+    return any(tag.strip() in etags for tag in if_none_match.split(","))
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Check whether the request's `Accept-Encoding` header allows gzip."""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+class CacheBackend(ABC):
+    """
+    Storage of cached responses. Responses are stored under keys including
+    the data version, so bumping the version invalidates all of them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        """Get a cached response, None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse) -> None:
+        """Cache a response for `settings.CACHE_TTL` seconds."""
+
+    @abstractmethod
+    async def get_version(self) -> int:
+        """Get the current data version."""
+
+    @abstractmethod
+    async def bump_version(self) -> None:
+        """Increment the data version, invalidating all cached responses."""
+
+
+class MemoryCache(CacheBackend):
+    """
+    Per-process LRU cache with a time-to-live. With multiple workers, other
+    workers see new data after at most `settings.CACHE_TTL` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.CACHE_MAX_ENTRIES,
+        ttl: float = settings.CACHE_TTL,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl: Seconds a response is kept
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._version = 0
+
+    async def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_version(self) -> int:
+        return self._version
+
+    async def bump_version(self) -> None:
+        self._version += 1
+        # Entries of older versions are never read again
+        self._entries.clear()
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by all workers and replicas, requires the "redis" extra.
+    Old versions' entries are left to expire.
+    """
+
+    KEY_PREFIX = "theater-scraper:response:"
+    VERSION_KEY = "theater-scraper:version"
+
+    def __init__(
+        self,
+        url: str = settings.CACHE_URL,
+        ttl: float = settings.CACHE_TTL,
+        client=None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            url: Redis URL
+            ttl: Seconds a response is kept
+            client: Redis client, one connected to `url` by default
+        """
+        if client is None:
+            import redis.asyncio
+
+            client = redis.asyncio.from_url(url)
+        self.client = client
+        self.ttl = ttl
+
+    async def get(self, key: str) -> CachedResponse | None:
+        value = await self.client.get(self.KEY_PREFIX + key)
+        return CachedResponse.model_validate_json(value) if value else None
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        await self.client.set(
+            self.KEY_PREFIX + key,
+            response.model_dump_json(),
+            px=int(self.ttl * 1000),
+        )
+
+    async def get_version(self) -> int:
+        return int(await self.client.get(self.VERSION_KEY) or 0)
+
+    async def bump_version(self) -> None:
+        await self.client.incr(self.VERSION_KEY)
+
+
+def create_cache_backend(name: str = settings.CACHE_BACKEND) -> CacheBackend | None:
+    """
+    Create a cache backend by name.
+
+    Args:
+        name: "memory", "redis" or "none"
+
+    Returns:
+        Cache backend, None if caching is disabled
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if name == "memory":
+        return MemoryCache()
+    if name == "redis":
+        return RedisCache()
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+class ResponseCache:
+    """
+    Read-through cache of API responses, invalidated whenever stored
+    performances change.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage of cached responses, caching is disabled if None
+        """
+        self.backend = backend
+
+    @staticmethod
+    def get_key(request: Request, version: int) -> str:
+        """Get the cache key of a request: its path and sorted query parameters."""
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{version}:{request.url.path}?{query}"
+
+    @staticmethod
+    def get_etag(body: bytes) -> str:
+        """Get a strong ETag of a response body."""
+        return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    async def invalidate(self) -> None:
+        """Invalidate all cached responses, e.g. after a scrape is stored."""
+        if self.backend is None:
+            return
+        try:
+            await self.backend.bump_version()
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached responses: {e}")
+
+    async def respond(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        """
+        Serve a request from the cache, calling the route on a cache miss.
+
+        Args:
+            request: GET request to a cached route
+            call_next: Route handler
+
+        Returns:
+            Cached or fresh response with `ETag` and `Cache-Control` headers,
+            304 Not Modified if the client already has it
+        """
+        try:
+            version = await self.backend.get_version()
+            key = self.get_key(request, version)
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache is unavailable: {e}")
+            return await call_next(request)
+
+        if cached is None:
+            response = await call_next(request)
+            # Streamed exports are passed through instead of being buffered
+            if (
+                response.status_code != 200
+                or response.headers.get("content-type") != "application/json"
+            ):
+                return response
+
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            cached = CachedResponse(
+                status_code=response.status_code,
+                headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name in CACHED_HEADERS
+                },
+                body=body,
+                etag=self.get_etag(body),
+            )
+            try:
+                await self.backend.set(key, cached)
+            except Exception as e:
+                logger.warning(f"Failed to cache response: {e}")
+
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"public, max-age={settings.CACHE_MAX_AGE}",
+        }
+        if matches_etag(request, cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=cached.body,
+            status_code=cached.status_code,
+            headers={**cached.headers, **headers},
+        )
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serves GET requests to the given path prefixes from a response cache."""
+
+    def __init__(
+        self,
+        app,
+        cache: ResponseCache,
+        paths: tuple[str, ...],
+        skipped_suffixes: tuple[str, ...] = (),
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            cache: Response cache
+            paths: Path prefixes of cached routes
+            skipped_suffixes: Path suffixes of routes under these prefixes
+                that are not cached
+        """
+        super().__init__(app)
+        self.cache = cache
+        self.paths = paths
+        self.skipped_suffixes = skipped_suffixes
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if (
+            request.method != "GET"
+            or self.cache.backend is None
+            or not request.url.path.startswith(self.paths)
+            or request.url.path.endswith(self.skipped_suffixes)
+        ):
+            return await call_next(request)
+        return await self.cache.respond(request, call_next)
+
+
+class FeedCache:
+    """
+    Per-process LRU cache of pre-rendered calendar feeds, so serving a feed
+    costs a dictionary lookup. Feeds rendered by this process's scrapers
+    replace cached ones right away, feeds rendered by other workers are read
+    from the database once cached ones are older than `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.CACHE_MAX_ENTRIES,
+        ttl: float = settings.CACHE_TTL,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached feeds
+            ttl: Seconds a feed is kept
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, CalendarFeed]] = OrderedDict()
+
+    async def get(
+        self,
+        feed_key: str,
+        load: Callable[[str], Awaitable[CalendarFeed | None]],
+    ) -> CalendarFeed | None:
+        """
+        Get a feed, loading it on a cache miss.
+
+        Args:
+            feed_key: Key of the feed
+            load: Loads a feed by key from the database
+
+        Returns:
+            The feed, None if it was never rendered
+        """
+        entry = self._entries.get(feed_key)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(feed_key)
+            return entry[1]
+
+        feed = await load(feed_key)
+        if feed is not None:
+            self.update([feed])
+        return feed
+
+    def update(self, feeds: list[CalendarFeed]) -> None:
+        """Cache rendered feeds, replacing older versions."""
+        for feed in feeds:
+            self._entries[feed.feed_key] = (time.monotonic() + self.ttl, feed)
+            self._entries.move_to_end(feed.feed_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def respond(request: Request, feed: CalendarFeed) -> Response:
+        """
+        Serve a feed, gzip-compressed if the client accepts it.
+
+        Args:
+            request: GET request of the feed
+            feed: Rendered feed
+
+        Returns:
+            Feed with `ETag` and `Cache-Control` headers, 304 Not Modified
+            if the client already has it
+        """
+        # Representations with different content codings need their own ETags
+        gzip_etag = f'{feed.etag[:-1]}-gzip"'
+        use_gzip = accepts_gzip(request)
+        headers = {
+            "ETag": gzip_etag if use_gzip else feed.etag,
+            "Cache-Control": f"public, max-age={settings.CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if matches_etag(request, feed.etag, gzip_etag):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=feed.gzip_body if use_gzip else feed.body,
+            media_type=MEDIA_TYPES["ics"],
+            headers=headers,
+        )
+
+
+# Shared by the API and the scrapers invalidating it
+response_cache = ResponseCache(create_cache_backend())
+
+# Shared by the API and the scrapers rendering feeds
+calendar_feeds = FeedCache()
@@ -0,0 +1,124 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import settings
+from .models import PerformanceChange
+from .serialization import encode_server_sent_event
+from .services.change_service import ChangeService
+
+
+def _wake(waiter: asyncio.Future[None]) -> None:
+    """Resolve a waiter unless it already timed out."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ChangeNotifier:
+    """
+    Wakes up requests and webhook deliveries waiting for changes as soon as
+    this process stores them. Changes stored by other workers are found by
+    polling the change log every `settings.CHANGES_POLL_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self._waiters: set[asyncio.Future[None]] = set()
+
+    def notify(self) -> None:
+        """Wake up all waiters, e.g. after changes are committed."""
+        for waiter in list(self._waiters):
+            # Waiters may belong to other event loops, e.g. in tests
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait until changes are stored or the timeout passes.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if woken up by new changes, False on timeout
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+
+async def wait_for_changes(
+    session_factory: async_sessionmaker[AsyncSession],
+    since: int,
+    theater_name: str | None = None,
+    limit: int = 100,
+    timeout: float = settings.CHANGES_POLL_TIMEOUT,
+) -> list[PerformanceChange]:
+    """
+    Get changes logged after a sequence number, waiting for new ones if
+    there are none yet. No connection is held while waiting.
+
+    Args:
+        session_factory: Factory of async database sessions
+        since: Last sequence number seen by the client
+        theater_name: Name of the theater to filter by
+        limit: Maximum number of changes to return
+        timeout: Seconds to wait for new changes at most
+
+    Returns:
+        Changes ordered by sequence number, empty if none were logged in time
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        async with session_factory() as session:
+            changes = await ChangeService().aget_since(
+                session, since, theater_name, limit
+            )
+        remaining = deadline - loop.time()
+        if changes or remaining <= 0:
+            return changes
+        await change_notifier.wait(min(remaining, settings.CHANGES_POLL_INTERVAL))
+
+
+async def stream_changes(
+    session_factory: async_sessionmaker[AsyncSession],
+    since: int,
+    theater_name: str | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream changes logged after a sequence number as Server-Sent Events,
+    with the sequence number as the event ID and the change type as the
+    event type. Comments are sent while no changes are logged, so proxies
+    don't close idle streams.
+
+    Args:
+        session_factory: Factory of async database sessions
+        since: Last sequence number seen by the client
+        theater_name: Name of the theater to filter by
+
+    Yields:
+        Encoded events and keepalive comments
+    """
+    while True:
+        changes = await wait_for_changes(
+            session_factory, since, theater_name, timeout=settings.CHANGES_KEEPALIVE
+        )
+        if not changes:
+            yield b": keepalive\n\n"
+            continue
+        for change in changes:
+            yield encode_server_sent_event(
+                change.sequence, change.change_type.value, change.model_dump()
+            )
+        since = changes[-1].sequence
+
+
+# Notified by the scrapers storing changes, awaited by the API and webhooks
+change_notifier = ChangeNotifier()
@@ -13,6 +13,74 @@ class Settings(BaseSettings):
     DB_PORT: int = 5432
     DB_NAME: str = "theater_db"
     SQL_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+
+    # Startup settings
+    DB_INIT_ON_STARTUP: bool = True  # Otherwise run `python -m src.db_init` once
+    STARTUP_RETRY_DELAY: float = 5.0  # Seconds between database startup attempts
+
+    # Scraping settings
+    # Theaters scraped by this deployment, all if empty
+    ENABLED_THEATERS: list[str] = []
+    SCRAPER_CONCURRENCY: int = 4  # Maximum number of scrapers running at once
+    SCRAPER_TIMEOUT: float = 120.0  # Seconds allowed for a single scraper
+    STORE_BATCH_SIZE: int = 500  # Performances per INSERT statement
+    SCRAPE_MONTHS: int = 3  # Months of repertoire to scrape, including the current
+    HTML_PARSER: str = "auto"  # "selectolax", "lxml", "html.parser" or "auto"
+    PARSER_PROCESSES: int = 1  # Worker processes parsing pages, 0 to parse inline
+    # Directory archiving fetched pages, requires the "archive" extra
+    ARCHIVE_DIR: str = ""
+    ARCHIVE_LEVEL: int = 10  # zstd compression level of archived pages
+    SHOW_DETAILS_CONCURRENCY: int = 4  # Show pages fetched at once, 0 to disable
+    SHOW_DETAILS_TTL: float = 7 * 24 * 60 * 60  # Seconds show details are reused
+
+    # Scheduler settings, intervals are in seconds
+    SCHEDULER_ENABLED: bool = True
+    SCRAPE_INTERVAL: float = 6 * 60 * 60
+    SCRAPE_INTERVALS: dict[str, float] = {}  # Per-theater overrides
+    SCRAPE_JITTER: float = 0.1  # Random fraction added to or removed from delays
+    SCRAPE_BACKOFF_BASE: float = 60.0  # Delay after a failure, doubled after each
+    SCRAPE_BACKOFF_MAX: float = 60 * 60
+
+    # API response cache settings
+    # "memory", "redis" (requires the "redis" extra) or "none"
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL: float = 600.0  # Seconds a cached response is kept
+    CACHE_MAX_ENTRIES: int = 1024  # Responses kept by the "memory" backend
+    CACHE_MAX_AGE: int = 60  # Seconds clients may reuse a response without revalidating
+
+    # Calendar feed settings
+    CALENDAR_TIMEZONE: str = "Europe/Moscow"  # Time zone of scraped dates
+    CALENDAR_PAST_DAYS: int = 30  # Days of past performances kept in feeds
+    CALENDAR_EVENT_DURATION: float = 3 * 60 * 60  # Seconds, event length in feeds
+    CALENDAR_GZIP_LEVEL: int = 9  # Feeds are compressed once, when rendered
+
+    # Change feed settings, intervals are in seconds
+    CHANGES_POLL_TIMEOUT: float = 30.0  # Longest wait of a /changes long-poll
+    CHANGES_POLL_INTERVAL: float = 1.0  # Checks for changes stored by other workers
+    CHANGES_KEEPALIVE: float = 15.0  # Comments keeping idle event streams open
+    WEBHOOK_URLS: list[str] = []  # URLs batches of changes are POSTed to
+    WEBHOOK_SECRET: str = ""  # Signs webhook bodies with HMAC-SHA256 if set
+    WEBHOOK_BATCH_SIZE: int = 100  # Changes per webhook request
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_RETRY_BASE: float = 5.0  # Delay after a failed delivery, doubled after each
+    WEBHOOK_RETRY_MAX: float = 10 * 60
+
+    # Metrics settings
+    METRICS_ENABLED: bool = False  # Serve /metrics, requires the "metrics" extra
+    SLOW_QUERY_THRESHOLD: float = 0.0  # Seconds before a query is logged, 0 to disable
+
+    # HTTP client settings shared by all scrapers
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP2: bool = False  # Requires the "http2" extra
 
     @property
     def DATABASE_URL(self) -> str:
@@ -1,12 +1,190 @@
-from sqlmodel import SQLModel, create_engine
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy import JSON, Connection, Engine, column, func, inspect, literal, table
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateColumn
+from sqlmodel import SQLModel, create_engine, insert, select, text, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import settings
+from .metrics import metrics
+from .models import Performance, PerformanceListing, Show, Stage
+
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+}
+
+# Used by scrapers and startup tasks
+engine = create_engine(settings.DATABASE_URL, echo=settings.SQL_ECHO, **POOL_OPTIONS)
+
+# Used by API routes, psycopg provides both sync and async drivers
+async_engine = create_async_engine(
+    settings.DATABASE_URL, echo=settings.SQL_ECHO, **POOL_OPTIONS
+)
+
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine.sync_engine)
+
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 
-engine = create_engine(settings.DATABASE_URL, echo=settings.SQL_ECHO)
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Provide the async session factory, e.g. for streaming responses that
+    query the database after the request-scoped session is closed.
+    """
+    return async_session_factory
+
+
+SessionFactoryDep = Annotated[
+    async_sessionmaker[AsyncSession], Depends(get_session_factory)
+]
 
 
-def create_db_and_tables() -> None:
+async def get_session(
+    session_factory: SessionFactoryDep,
+) -> AsyncIterator[AsyncSession]:
     """
-    Create all tables defined in SQLModel classes.
+    Provide a request-scoped async database session.
     """
-    SQLModel.metadata.create_all(engine)
+    async with session_factory() as session:
+        yield session
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+def migrate_performance_shows(connection: Connection) -> None:
+    """
+    Move titles, directors and authors of performances stored before shows
+    were introduced to the show table, and point performances and their
+    listing rows to their shows. Does nothing on up-to-date databases.
+
+    Args:
+        connection: Connection in the migrating transaction
+    """
+    preparer = connection.dialect.identifier_preparer
+    inspector = inspect(connection)
+    columns = {column["name"] for column in inspector.get_columns("performance")}
+    if "show_id" in columns or "title" not in columns:
+        return
+    # Listings created by `create_all` along with shows already have show_id
+    legacy_listing = "show_id" not in {
+        column["name"] for column in inspector.get_columns("performancelisting")
+    }
+
+    legacy = table(
+        "performance",
+        column("performance_id"),
+        column("stage_id"),
+        column("title"),
+        column("director"),
+        column("author"),
+        column("show_id"),
+    )
+    # Shows are unique per theater and title, any known director wins
+    connection.execute(
+        insert(Show).from_select(
+            [
+                "theater_id",
+                "title",
+                "director",
+                "author",
+                "upcoming_count",
+                "stage_ids",
+            ],
+            select(
+                Stage.theater_id,
+                legacy.c.title,
+                func.max(legacy.c.director),
+                func.max(legacy.c.author),
+                literal(0),
+                literal([], JSON),
+            )
+            .join(Stage, Stage.stage_id == legacy.c.stage_id)
+            .group_by(Stage.theater_id, legacy.c.title),
+        )
+    )
+
+    performance = preparer.format_table(Performance.__table__)
+    listing = preparer.format_table(PerformanceListing.__table__)
+    connection.execute(text(f"ALTER TABLE {performance} ADD COLUMN show_id INTEGER"))
+    connection.execute(
+        update(legacy).values(
+            show_id=select(Show.show_id)
+            .join(Stage, Stage.theater_id == Show.theater_id)
+            .where(Stage.stage_id == legacy.c.stage_id, Show.title == legacy.c.title)
+            .scalar_subquery()
+        )
+    )
+    if legacy_listing:
+        connection.execute(text(f"ALTER TABLE {listing} ADD COLUMN show_id INTEGER"))
+        connection.execute(
+            update(PerformanceListing).values(
+                show_id=select(legacy.c.show_id)
+                .where(legacy.c.performance_id == PerformanceListing.performance_id)
+                .scalar_subquery()
+            )
+        )
+
+    # Databases created before stores were upserts have no unique index
+    connection.execute(text("DROP INDEX IF EXISTS uq_performance_title_stage_datetime"))
+    for name in ("title", "director", "author"):
+        connection.execute(text(f"ALTER TABLE {performance} DROP COLUMN {name}"))
+    if connection.dialect.name == "postgresql":
+        # SQLite can't add constraints to existing columns
+        connection.execute(
+            text(
+                f"ALTER TABLE {performance} ALTER COLUMN show_id SET NOT NULL, "
+                f"ADD FOREIGN KEY (show_id) REFERENCES "
+                f"{preparer.format_table(Show.__table__)} (show_id)"
+            )
+        )
+        if legacy_listing:
+            connection.execute(
+                text(f"ALTER TABLE {listing} ALTER COLUMN show_id SET NOT NULL")
+            )
+
+
+def create_db_and_tables(bind: Engine = engine) -> None:
+    """
+    Create all tables defined in SQLModel classes, along with nullable
+    columns and indexes added to existing tables since they were created.
+    Performances stored before shows were introduced are migrated to them.
+    """
+    if bind.dialect.name == "postgresql":
+        # Trigram operators used by the title search index
+        with bind.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    SQLModel.metadata.create_all(bind)
+    with bind.begin() as connection:
+        migrate_performance_shows(connection)
+
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing_columns = {
+                column["name"] for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_spec = CreateColumn(column).compile(dialect=bind.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {column_spec}"
+                    )
+                )
+
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
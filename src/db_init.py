@@ -1,121 +1,51 @@
 from sqlmodel import Session, select
 
-from .db import engine
+from .db import create_db_and_tables, engine
 from .models import Stage, Theater
-from .services.theater_service import TheaterService
+from .scrapers.registry import THEATERS
+from .services.calendar_service import CalendarService
+from .services.listing_service import ListingService
+from .services.show_service import ShowService
 
 
 def seed_theaters_and_stages(session: Session) -> None:
     """
-    Seed the database with initial theater and stage data.
-    This should only be run once when setting up a new database.
+    Seed the database with the theaters and stages of the scraper registry.
+    Theaters and stages added to the registry since the last run are added,
+    existing ones are left alone, so this is safe to run repeatedly.
     """
     try:
-        # Check if we already have theaters (to avoid duplicates)
-        theater = session.exec(select(Theater)).first()
-        if theater is not None:
-            print("Database already seeded with theaters.")
-            return
+        theaters = {theater.name: theater for theater in session.exec(select(Theater))}
+        stages = {
+            (stage.theater_id, stage.name) for stage in session.exec(select(Stage))
+        }
 
-        # Create theaters
-        theaters = [
-            Theater(
-                name="fomenki",
-                full_name="Мастерская Петра Фоменко",
-                url="https://fomenko.theatre.ru/",
-            ),
-            Theater(
-                name="ramt",
-                full_name="Российский академический молодежный театр",
-                url="https://ramt.ru/",
-            ),
-            Theater(
-                name="sti",
-                full_name="Студия театрального искусства",
-                url="https://sti.ru/",
-            ),
-        ]
-        session.add_all(theaters)
+        added = 0
+        for entry in THEATERS:
+            theater = theaters.get(entry.name)
+            if theater is None:
+                theater = Theater(
+                    name=entry.name, full_name=entry.full_name, url=entry.url
+                )
+                session.add(theater)
+                added += 1
+            for stage_entry in entry.stages:
+                if (theater.theater_id, stage_entry.name) in stages:
+                    continue
+                session.add(
+                    Stage(
+                        name=stage_entry.name,
+                        address=stage_entry.address,
+                        theater=theater,
+                    )
+                )
+                added += 1
         session.commit()
 
-        fomenki = TheaterService().get_by_theater_name(session, "fomenki")
-        ramt = TheaterService().get_by_theater_name(session, "ramt")
-        sti = TheaterService().get_by_theater_name(session, "sti")
-
-        # Create stages
-        stages = [
-            # Fomenki stages
-            Stage(
-                name="Старая сцена, Зелёный зал",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 30",
-            ),
-            Stage(
-                name="Старая сцена, Серый зал",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 30",
-            ),
-            Stage(
-                name="Новая сцена, Малый зал",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 29",
-            ),
-            Stage(
-                name="Новая сцена, Малый зал",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 29",
-            ),
-            Stage(
-                name="Новая сцена, Большой зал",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 29",
-            ),
-            Stage(
-                name="Новая сцена, Фойе",
-                theater_id=fomenki.theater_id,
-                address="Набережная Тараса Шевченко, 29",
-            ),
-            # RAMT stages
-            Stage(
-                name="Большая сцена",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            Stage(
-                name="Маленькая сцена",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            Stage(
-                name="Черная комната",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            Stage(
-                name="Театральный двор",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            Stage(
-                name="Белая комната",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            Stage(
-                name="Большая сцена*",
-                theater_id=ramt.theater_id,
-                address="Театральная площадь, 2",
-            ),
-            # STI stages
-            Stage(
-                name="Основная сцена",
-                theater_id=sti.theater_id,
-                address="ул. Станиславского, 21 стр. 7",
-            ),
-        ]
-        session.add_all(stages)
-        session.commit()
-        print("Successfully seeded database with theaters and stages.")
+        if added:
+            print(f"Seeded database with {added} theaters and stages.")
+        else:
+            print("Database already seeded with theaters.")
 
     except Exception as e:
         session.rollback()
@@ -124,7 +54,35 @@ def seed_theaters_and_stages(session: Session) -> None:
 
 def initialize_database():
     """
-    Initialize the database with seed data using a new session.
+    Create missing tables, seed the database and rebuild the performance
+    listing, show aggregates and calendar feeds using a new session.
+    Safe to run repeatedly, e.g. as a one-time command before starting the API:
+
+        python -m src.db_init
     """
+    create_db_and_tables()
     with Session(engine) as session:
         seed_theaters_and_stages(session)
+        ListingService().refresh(session)
+        ShowService().refresh_aggregates(session)
+        for theater in THEATERS:
+            CalendarService().refresh(session, theater.name)
+        session.commit()
+
+
+def check_database():
+    """
+    Check that the database is reachable and initialized.
+
+    Raises:
+        RuntimeError: If the database has not been seeded yet
+    """
+    with Session(engine) as session:
+        if session.exec(select(Theater)).first() is None:
+            raise RuntimeError(
+                "Database is not initialized, run `python -m src.db_init`"
+            )
+
+
+if __name__ == "__main__":
+    initialize_database()
@@ -1,34 +1,103 @@
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from sqlmodel import Session
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse, Response
 
-from .api import db, performances, stages, theaters
-from .db import create_db_and_tables, engine
-from .db_init import seed_theaters_and_stages
+from .api import changes, db, schedule, shows, stages, theaters
+from .cache import ResponseCacheMiddleware, response_cache
+from .config import settings
+from .db_init import check_database, initialize_database
+from .metrics import MetricsMiddleware, metrics
+from .routers import performances
+from .scrapers.http_client import create_http_client
 from .scrapers.manager import ScraperManager
+from .scrapers.scheduler import ScrapeScheduler
+from .serialization import FastJSONResponse
+from .webhooks import WebhookDispatcher
+
+logger = logging.getLogger(__name__)
+
+# Used to measure startup time from the moment the app is imported
+IMPORT_STARTED_AT = time.perf_counter()
+
+
+async def prepare(app: FastAPI) -> None:
+    """
+    Initialize the database and start scraping in the background,
+    retrying until the database is available.
+    """
+    while True:
+        try:
+            if settings.DB_INIT_ON_STARTUP:
+                await asyncio.to_thread(initialize_database)
+            else:
+                await asyncio.to_thread(check_database)
+            break
+        except Exception as e:
+            app.state.startup_error = str(e)
+            logger.error(f"Database is not ready: {e}")
+            await asyncio.sleep(settings.STARTUP_RETRY_DELAY)
+
+    if settings.SCHEDULER_ENABLED:
+        app.state.scheduler.start()
+        # Delivered by the workers storing changes, so they are sent right away
+        app.state.webhooks.start()
+
+    app.state.startup_error = None
+    app.state.ready_time = time.perf_counter() - IMPORT_STARTED_AT
+    logger.info(f"Ready to serve data in {app.state.ready_time:.3f}s")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Context manager for FastAPI app lifespan events.
+    The database is prepared in the background, so the app starts right away.
     """
-    create_db_and_tables()
-    with Session(engine) as session:
-        seed_theaters_and_stages(session)
+    app.state.ready_time = None
+    app.state.startup_error = None
+
+    # Process-wide HTTP client shared by all scrapers
+    async with create_http_client() as http_client:
+        app.state.http_client = http_client
+        app.state.scheduler = ScrapeScheduler(client=http_client)
+        app.state.webhooks = WebhookDispatcher(client=http_client)
+        prepare_task = asyncio.create_task(prepare(app))
+
+        app.state.startup_time = time.perf_counter() - IMPORT_STARTED_AT
+        logger.info(f"Started in {app.state.startup_time:.3f}s")
 
-    await ScraperManager.run_all_scrapers()
+        yield
 
-    yield
+        prepare_task.cancel()
+        await app.state.scheduler.stop()
+        await app.state.webhooks.stop()
+        await asyncio.to_thread(ScraperManager.shutdown_executor)
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Data behind these routes only changes when a scrape is stored
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    paths=("/performances", "/shows", "/stages", "/theaters"),
+    # Calendar feeds are pre-rendered and cached on their own
+    skipped_suffixes=(".ics",),
+)
+# Added last to time cached responses as well
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 app.include_router(db.router)
 app.include_router(performances.router)
 app.include_router(theaters.router)
 app.include_router(stages.router)
+app.include_router(shows.router)
+app.include_router(schedule.router)
+app.include_router(changes.router)
 
 
 @app.get("/is_alive/")
@@ -37,3 +106,34 @@ async def is_alive():
     Check if the server is alive.
     """
     return {"status": "alive"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Expose metrics in the Prometheus text format, if they are enabled.
+    """
+    if not metrics.enabled:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": "Metrics are disabled"},
+        )
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/is_ready/")
+async def is_ready():
+    """
+    Check if the database is initialized and the server is ready to serve data.
+    """
+    if app.state.ready_time is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "error": app.state.startup_error},
+        )
+    return {
+        "status": "ready",
+        "startup_time": app.state.startup_time,
+        "ready_time": app.state.ready_time,
+    }
@@ -0,0 +1,274 @@
+import importlib.util
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Engine, event
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .models import ScrapeStatus, StoreResult
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client is optional, metrics are disabled without it
+HAS_PROMETHEUS = importlib.util.find_spec("prometheus_client") is not None
+
+# Longest SQL statement prefix written to the slow query log
+SLOW_QUERY_LOG_LENGTH = 500
+
+
+class Metrics:
+    """
+    Prometheus metrics of scrapers, SQL statements and API requests,
+    requires the "metrics" extra.
+
+    Every method is a no-op while metrics are disabled, so instrumented code
+    does not check whether they are enabled.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.METRICS_ENABLED,
+        slow_query_threshold: float = settings.SLOW_QUERY_THRESHOLD,
+    ):
+        """
+        Initialize the metrics.
+
+        Args:
+            enabled: Whether metrics are collected
+            slow_query_threshold: Seconds after which SQL statements are
+                logged as slow, 0 to disable the slow query log
+        """
+        self.enabled = False
+        self.slow_query_threshold = slow_query_threshold
+        if enabled:
+            if HAS_PROMETHEUS:
+                self.enable()
+            else:
+                logger.warning(
+                    "prometheus_client is not installed, metrics are disabled"
+                )
+
+    def enable(self, registry=None) -> None:
+        """
+        Create the collectors and start collecting metrics.
+
+        Args:
+            registry: Prometheus registry, the global one by default
+        """
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        self.registry = registry or REGISTRY
+        self.scraper_phase_seconds = Histogram(
+            "scraper_phase_seconds",
+            "Duration of a scraper phase: fetch, parse, enrich, resolve or store",
+            ["theater", "phase"],
+            registry=self.registry,
+        )
+        self.scraper_runs = Counter(
+            "scraper_runs",
+            "Finished scraper runs",
+            ["theater", "status"],
+            registry=self.registry,
+        )
+        self.scraper_performances = Counter(
+            "scraper_performances",
+            "Scraped performances by outcome: found, inserted, updated, "
+            "unchanged or cancelled",
+            ["theater", "outcome"],
+            registry=self.registry,
+        )
+        self.db_query_seconds = Histogram(
+            "db_query_seconds",
+            "Duration of an SQL statement",
+            ["operation"],
+            registry=self.registry,
+        )
+        self.db_slow_queries = Counter(
+            "db_slow_queries",
+            "SQL statements slower than the slow query threshold",
+            registry=self.registry,
+        )
+        self.http_request_seconds = Histogram(
+            "http_request_seconds",
+            "Duration of an API request",
+            ["method", "route", "status"],
+            registry=self.registry,
+        )
+        self.enabled = True
+
+    @contextmanager
+    def time_phase(self, theater_name: str, phase: str) -> Iterator[None]:
+        """
+        Time a scraper phase, including failed ones.
+
+        Args:
+            theater_name: Name of the scraped theater
+            phase: "fetch", "parse", "enrich", "resolve" or "store"
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.scraper_phase_seconds.labels(theater_name, phase).observe(
+                time.perf_counter() - start
+            )
+
+    def record_run(
+        self,
+        theater_name: str,
+        status: ScrapeStatus,
+        found: int,
+        stored: StoreResult | None,
+    ) -> None:
+        """
+        Count a finished scraper run and the performances it found and stored.
+
+        Args:
+            theater_name: Name of the scraped theater
+            status: Outcome of the run
+            found: Number of scraped performances
+            stored: Counts of stored performances, None if nothing was stored
+        """
+        if not self.enabled:
+            return
+        self.scraper_runs.labels(theater_name, status.value).inc()
+        outcomes = {"found": found}
+        if stored is not None:
+            outcomes.update(stored.model_dump())
+        for outcome, count in outcomes.items():
+            self.scraper_performances.labels(theater_name, outcome).inc(count)
+
+    def instrument_engine(self, engine: Engine) -> None:
+        """
+        Time SQL statements of an engine and log slow ones. Nothing is
+        attached if both metrics and the slow query log are disabled.
+
+        Args:
+            engine: Sync engine, `AsyncEngine.sync_engine` for async ones
+        """
+        if not self.enabled and self.slow_query_threshold <= 0:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(
+            connection, cursor, statement, parameters, context, executemany
+        ):
+            connection.info.setdefault("query_started_at", []).append(
+                time.perf_counter()
+            )
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(
+            connection, cursor, statement, parameters, context, executemany
+        ):
+            duration = time.perf_counter() - connection.info["query_started_at"].pop()
+            self.observe_query(statement, duration)
+
+    def observe_query(self, statement: str, duration: float) -> None:
+        """
+        Record the duration of an SQL statement, logging it if it is slow.
+
+        Args:
+            statement: SQL statement
+            duration: Seconds the statement took
+        """
+        is_slow = 0 < self.slow_query_threshold <= duration
+        if is_slow:
+            logger.warning(
+                f"Slow query ({duration:.3f}s): {statement[:SLOW_QUERY_LOG_LENGTH]}"
+            )
+        if not self.enabled:
+            return
+        # The first keyword keeps the number of label values small
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        self.db_query_seconds.labels(operation).observe(duration)
+        if is_slow:
+            self.db_slow_queries.inc()
+
+    def observe_request(
+        self, method: str, route: str, status_code: int, duration: float
+    ) -> None:
+        """Record the duration of an API request."""
+        if self.enabled:
+            self.http_request_seconds.labels(method, route, str(status_code)).observe(
+                duration
+            )
+
+    def render(self) -> tuple[bytes, str]:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Returns:
+            Response body and its content type
+        """
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+def _get_route_path(scope: Scope) -> str:
+    """
+    Get the path template of the route handling a request, so paths with
+    different IDs share labels. Responses served by middleware, e.g. from
+    the response cache, never reach a route and are matched here.
+    """
+    route = scope.get("route")
+    if route is None:
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+    Times API requests per route. A plain ASGI middleware, so it costs
+    a single check per request while metrics are disabled.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: "Metrics"):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            metrics: Metrics to record requests in
+        """
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.observe_request(
+                scope["method"],
+                _get_route_path(scope),
+                status_code,
+                time.perf_counter() - start,
+            )
+
+
+# Shared by the API, the database engines and the scrapers
+metrics = Metrics()
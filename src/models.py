@@ -1,13 +1,15 @@
 import datetime
 from enum import Enum
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import JSON, bindparam, text
+from sqlmodel import Field, Index, Relationship, SQLModel, func
 
+from .scrapers.registry import THEATERS
 
-class TheaterName(str, Enum):
-    ramt = "ramt"
-    fomenki = "fomenki"
-    sti = "sti"
+# Names of registered theaters, members are named after their values
+TheaterName = Enum(
+    "TheaterName", {theater.name: theater.name for theater in THEATERS}, type=str
+)
 
 
 class Theater(SQLModel, table=True):
@@ -17,6 +19,7 @@ class Theater(SQLModel, table=True):
     url: str | None = None
 
     stages: list["Stage"] = Relationship(back_populates="theater")
+    shows: list["Show"] = Relationship(back_populates="theater")
 
 
 class Stage(SQLModel, table=True):
@@ -29,15 +32,266 @@ class Stage(SQLModel, table=True):
     performances: list["Performance"] = Relationship(back_populates="stage")
 
 
+class Show(SQLModel, table=True):
+    __table_args__ = (
+        Index("uq_show_theater_title", "theater_id", "title", unique=True),
+    )
+
+    show_id: int | None = Field(default=None, primary_key=True)
+    title: str
+    theater_id: int = Field(foreign_key="theater.theater_id")
+    director: str | None = None
+    author: str | None = None
+    # Aggregates of upcoming performances, refreshed after every scrape
+    next_datetime: datetime.datetime | None = None
+    upcoming_count: int = 0
+    stage_ids: list[int] = Field(default_factory=list, sa_type=JSON)
+
+    theater: "Theater" = Relationship(back_populates="shows")
+    performances: list["Performance"] = Relationship(back_populates="show")
+
+
 class Performance(SQLModel, table=True):
+    __table_args__ = (
+        # Also serves lookups of all dates of a show
+        Index(
+            "uq_performance_show_stage_datetime",
+            "show_id",
+            "stage_id",
+            "datetime",
+            unique=True,
+        ),
+        Index("ix_performance_datetime_id", "datetime", "performance_id"),
+        Index("ix_performance_stage_datetime", "stage_id", "datetime"),
+    )
+
     performance_id: int | None = Field(default=None, primary_key=True)
-    title: str
+    show_id: int = Field(foreign_key="show.show_id")
     stage_id: int = Field(foreign_key="stage.stage_id")
     datetime: datetime.datetime
+    cancelled_at: datetime.datetime | None = None
+
+    show: "Show" = Relationship(back_populates="performances")
+    stage: "Stage" = Relationship(back_populates="performances")
+
+
+# Performances with their show, stage and theater inlined, refreshed after
+# every sync and used for listings instead of joins
+class PerformanceListing(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_performancelisting_datetime_id", "datetime", "performance_id"),
+        Index("ix_performancelisting_stage_datetime", "stage_id", "datetime"),
+        Index(
+            "ix_performancelisting_theater_datetime_id",
+            "theater_name",
+            "datetime",
+            "performance_id",
+        ),
+    )
+
+    performance_id: int = Field(
+        primary_key=True, sa_column_kwargs={"autoincrement": False}
+    )
+    show_id: int
+    title: str
+    datetime: datetime.datetime
     director: str | None = None
     author: str | None = None
+    cancelled_at: datetime.datetime | None = None
+    stage_id: int
+    stage_name: str
+    stage_address: str | None = None
+    theater_id: int
+    theater_name: TheaterName
+    theater_full_name: str | None = None
+    theater_url: str | None = None
 
-    stage: "Stage" = Relationship(back_populates="performances")
+
+# Title in lower case with "ё" read as "е", constants are inlined so that
+# search queries match the expressions of the search indexes
+FOLDED_TITLE = func.translate(
+    func.lower(PerformanceListing.title),
+    bindparam(None, "ё", literal_execute=True),
+    bindparam(None, "е", literal_execute=True),
+)
+TITLE_TSVECTOR = func.to_tsvector(text("'russian'"), FOLDED_TITLE)
+
+# Search indexes, PostgreSQL only: trigrams match misspelled titles and
+# full text matches other forms of their words
+Index(
+    "ix_performancelisting_title_trgm",
+    FOLDED_TITLE.label("folded_title"),
+    postgresql_using="gin",
+    postgresql_ops={"folded_title": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+Index("ix_performancelisting_title_fts", TITLE_TSVECTOR, postgresql_using="gin").ddl_if(
+    dialect="postgresql"
+)
+
+
+class ScrapeSnapshot(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "uq_scrapesnapshot_theater_url",
+            "theater_name",
+            "url",
+            unique=True,
+        ),
+    )
+
+    snapshot_id: int | None = Field(default=None, primary_key=True)
+    theater_name: str
+    url: str
+    content_hash: str
+    fetched_at: datetime.datetime
+    parsed_count: int | None = None
+
+
+# Details of a show from its own page, fetched again once they are older
+# than `settings.SHOW_DETAILS_TTL`
+class ShowDetails(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "uq_showdetails_theater_url",
+            "theater_name",
+            "url",
+            unique=True,
+        ),
+    )
+
+    show_details_id: int | None = Field(default=None, primary_key=True)
+    theater_name: str
+    url: str
+    author: str | None = None
+    director: str | None = None
+    duration: int | None = None  # Minutes
+    fetched_at: datetime.datetime
+
+
+# iCalendar feed of a theater, stage or show, rendered and compressed when
+# a scrape changes its theater's performances and served as is
+class CalendarFeed(SQLModel, table=True):
+    feed_key: str = Field(primary_key=True)  # e.g. "theater/fomenki", "stage/1"
+    theater_name: str = Field(index=True)
+    content_hash: str  # Hash of the events, feeds are re-rendered if it changes
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    generated_at: datetime.datetime
+
+
+# Manifest entry of a fetched page in the page archive
+class ArchivedPage(SQLModel):
+    theater_name: str
+    url: str
+    content_hash: str
+    fetched_at: datetime.datetime
+    size: int
+
+
+class ScrapeStatus(str, Enum):
+    success = "success"
+    unchanged = "unchanged"
+    failed = "failed"
+    timeout = "timeout"
+
+
+class ScrapeSchedule(SQLModel, table=True):
+    theater_name: str = Field(primary_key=True)
+    last_run_at: datetime.datetime | None = None
+    last_status: ScrapeStatus | None = None
+    next_run_at: datetime.datetime | None = None
+    consecutive_failures: int = 0
+
+
+class ChangeType(str, Enum):
+    inserted = "inserted"
+    rescheduled = "rescheduled"
+    removed = "removed"
+
+
+# Append-only log of changes to stored performances. Sequence numbers only
+# grow, so clients resume from the last one they saw
+class PerformanceChange(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_performancechange_theater_sequence", "theater_name", "sequence"),
+    )
+
+    sequence: int | None = Field(default=None, primary_key=True)
+    change_type: ChangeType
+    performance_id: int
+    previous_performance_id: int | None = None  # Cancelled date of a rescheduled one
+    theater_name: str
+    show_id: int
+    title: str
+    stage_id: int
+    datetime: datetime.datetime
+    previous_datetime: datetime.datetime | None = None
+    changed_at: datetime.datetime
+
+
+# Delivery state of a webhook, changes after `last_sequence` are not delivered yet
+class WebhookCursor(SQLModel, table=True):
+    url: str = Field(primary_key=True)
+    last_sequence: int = 0
+    consecutive_failures: int = 0
+    last_error: str | None = None
+    last_attempt_at: datetime.datetime | None = None
+
+
+# Performance as found on a page, before its stage is resolved
+class ParsedPerformance(SQLModel):
+    title: str
+    stage_name: str
+    datetime: datetime.datetime
+    director: str | None = None
+    author: str | None = None
+    url: str | None = None  # Page of the show, fetched for missing details
+
+
+# Performance found by a scraper with its stage resolved, before its show is
+class ScrapedPerformance(SQLModel):
+    title: str
+    stage_id: int | None = None
+    datetime: datetime.datetime
+    director: str | None = None
+    author: str | None = None
+
+
+# Show details as found on its page
+class ParsedShow(SQLModel):
+    author: str | None = None
+    director: str | None = None
+    duration: int | None = None  # Minutes
+
+
+class StoreResult(SQLModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    cancelled: int = 0
+
+
+class ScrapeResult(SQLModel):
+    theater_name: str
+    status: ScrapeStatus
+    started_at: datetime.datetime
+    duration: float
+    performances_found: int = 0
+    stored: StoreResult | None = None
+    error: str | None = None
+
+
+class CachedResponse(SQLModel):
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    etag: str
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
 
 
 class TheaterResponse(SQLModel):
@@ -58,5 +312,17 @@ class PerformanceResponse(SQLModel):
     datetime: datetime.datetime
     director: str | None = None
     author: str | None = None
+    cancelled_at: datetime.datetime | None = None
     stage: StageResponse
     theater: TheaterResponse
+
+
+class ShowResponse(SQLModel):
+    show_id: int
+    title: str
+    director: str | None = None
+    author: str | None = None
+    next_datetime: datetime.datetime | None = None
+    upcoming_count: int = 0
+    stages: list[StageResponse]
+    theater: TheaterResponse
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, HTTPException, status
-from sqlmodel import Session
+import datetime
+from collections.abc import AsyncIterator
+from typing import Annotated
 
-from ..db import engine
-from ..models import Performance, PerformanceResponse, TheaterName
-from ..services.performance_service import PerformanceResponseService, PerformanceService
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+
+from ..db import SessionDep, SessionFactoryDep
+from ..models import (
+    ExportFormat,
+    PerformanceListing,
+    PerformanceResponse,
+    TheaterName,
+)
+from ..serialization import MEDIA_TYPES, encode_csv, encode_ndjson
+from ..services.performance_service import (
+    PerformanceResponseService,
+    encode_cursor,
+)
+from ..services.search_service import SearchService
 
 router = APIRouter(
     prefix="/performances",
@@ -14,30 +28,127 @@ router = APIRouter(
 
 @router.get("/")
 async def get_performances(
+    session: SessionDep,
+    response: Response,
     theater_name: TheaterName | None = None,
+    stage_id: int | None = None,
+    date_from: Annotated[datetime.datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime.datetime | None, Query(alias="to")] = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
 ) -> list[PerformanceResponse]:
     """
-    Get all performances or filter by theater name if provided.
+    Get performances ordered by datetime, optionally filtered by theater,
+    stage and a `from`/`to` datetime range.
+
+    Results are paginated: if there are more performances, the `X-Next-Cursor`
+    header contains the `cursor` to pass to get the next page.
+    """
+    service = PerformanceResponseService()
+    try:
+        performances = await service.aget_page(
+            session,
+            theater_name=theater_name,
+            stage_id=stage_id,
+            date_from=date_from,
+            date_to=date_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if len(performances) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(performances[-1])
+    return performances
+
+
+@router.get("/export")
+async def export_performances(
+    session_factory: SessionFactoryDep,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.ndjson,
+    theater_name: TheaterName | None = None,
+    stage_id: int | None = None,
+    date_from: Annotated[datetime.datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime.datetime | None, Query(alias="to")] = None,
+) -> StreamingResponse:
+    """
+    Export all performances ordered by datetime as NDJSON or CSV with flat
+    stage and theater columns, optionally filtered by theater, stage and a
+    `from`/`to` datetime range.
+
+    Rows are streamed from a server-side cursor as they are read, so exports
+    of any size take constant memory.
     """
-    with Session(engine) as session:
-        service = PerformanceResponseService()
-        if theater_name:
-            return service.get_by_theater_name(session, theater_name)
-        else:
-            return service.get_all(session)
+    service = PerformanceResponseService()
+
+    async def generate() -> AsyncIterator[bytes]:
+        if export_format == ExportFormat.csv:
+            yield encode_csv([], header=list(PerformanceListing.model_fields))
+        # The request-scoped session is closed before the response is streamed
+        async with session_factory() as session:
+            async for rows in service.astream_rows(
+                session,
+                theater_name=theater_name,
+                stage_id=stage_id,
+                date_from=date_from,
+                date_to=date_to,
+            ):
+                if export_format == ExportFormat.csv:
+                    yield encode_csv(rows)
+                else:
+                    yield encode_ndjson(rows)
+
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="performances.{export_format.value}"'
+            )
+        },
+    )
+
+
+# Declared before /{performance_id}, which would match "search" otherwise
+@router.get("/search")
+async def search_performances(
+    session: SessionDep,
+    q: Annotated[str, Query(min_length=2, max_length=200)],
+    theater_name: TheaterName | None = None,
+    date_from: Annotated[datetime.datetime | None, Query(alias="from")] = None,
+    date_to: Annotated[datetime.datetime | None, Query(alias="to")] = None,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> list[PerformanceResponse]:
+    """
+    Search performances by title, ordered by relevance, then by datetime.
+    Case, "ё"/"е", other word forms and typos are tolerated.
+    """
+    service = SearchService()
+    return await service.asearch(
+        session,
+        q,
+        theater_name=theater_name,
+        date_from=date_from,
+        date_to=date_to,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.get("/{performance_id}")
-async def get_performance_by_id(performance_id: int) -> PerformanceResponse:
+async def get_performance_by_id(
+    performance_id: int, session: SessionDep
+) -> PerformanceResponse:
     """
     Get performance by ID.
     """
-    with Session(engine) as session:
-        service = PerformanceResponseService()
-        performance = service.get_by_id(session, performance_id)
-        if performance is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Performance with ID {performance_id} not found",
-            )
-        return performance
+    service = PerformanceResponseService()
+    performance = await service.aget_by_id(session, performance_id)
+    if performance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Performance with ID {performance_id} not found",
+        )
+    return performance
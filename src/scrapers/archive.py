@@ -0,0 +1,167 @@
+import datetime
+import hashlib
+import importlib.util
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+from ..config import settings
+from ..models import ArchivedPage
+
+logger = logging.getLogger(__name__)
+
+# zstandard is optional, pages are not archived without it
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+class PageArchive:
+    """
+    Archive of fetched pages on the local filesystem, requires the "archive"
+    extra. Pages are stored once per content as zstd-compressed blobs named
+    by their SHA-256 hash, and every archived fetch is appended to a JSON
+    Lines manifest, so pages can be parsed again offline.
+
+        <root>/manifest.jsonl
+        <root>/blobs/ab/abcdef....zst
+    """
+
+    MANIFEST_NAME = "manifest.jsonl"
+
+    def __init__(self, root: str | Path, level: int = settings.ARCHIVE_LEVEL):
+        """
+        Initialize the archive.
+
+        Args:
+            root: Directory of the archive, created on first write
+            level: zstd compression level
+        """
+        self.root = Path(root)
+        self.level = level
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / self.MANIFEST_NAME
+
+    def get_blob_path(self, content_hash: str) -> Path:
+        """Get the path of the blob with the given content hash."""
+        return self.root / "blobs" / content_hash[:2] / f"{content_hash}.zst"
+
+    def save(
+        self,
+        theater_name: str,
+        url: str,
+        html_content: str,
+        fetched_at: datetime.datetime | None = None,
+    ) -> ArchivedPage:
+        """
+        Archive a fetched page. Contents already archived are not written again.
+
+        Args:
+            theater_name: Name of the scraped theater
+            url: Page URL
+            html_content: HTML content of the page
+            fetched_at: Time the page was fetched, now by default
+
+        Returns:
+            Manifest entry of the page
+        """
+        import zstandard
+
+        data = html_content.encode()
+        page = ArchivedPage(
+            theater_name=theater_name,
+            url=url,
+            content_hash=hashlib.sha256(data).hexdigest(),
+            fetched_at=fetched_at or datetime.datetime.now(),
+            size=len(data),
+        )
+
+        path = self.get_blob_path(page.content_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+            # Written under a temporary name, so readers never see partial blobs
+            temporary_path = path.with_suffix(
+                f".{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            temporary_path.write_bytes(compressed)
+            temporary_path.replace(path)
+
+        with self._lock, self.manifest_path.open("a", encoding="utf-8") as manifest:
+            manifest.write(page.model_dump_json() + "\n")
+        return page
+
+    def load(self, content_hash: str) -> str:
+        """
+        Read an archived page.
+
+        Args:
+            content_hash: Content hash from the manifest
+
+        Returns:
+            HTML content of the page
+
+        Raises:
+            FileNotFoundError: If the page is not archived
+        """
+        import zstandard
+
+        compressed = self.get_blob_path(content_hash).read_bytes()
+        return zstandard.ZstdDecompressor().decompress(compressed).decode()
+
+    def get_pages(
+        self,
+        theater_name: str | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+    ) -> Iterator[ArchivedPage]:
+        """
+        Read manifest entries in the order pages were archived.
+
+        Args:
+            theater_name: Name of the theater to read pages of, all by default
+            date_from: Earliest fetch time of pages
+            date_to: Fetch time pages are before
+
+        Returns:
+            Iterator of manifest entries
+        """
+        if not self.manifest_path.exists():
+            return
+        with self.manifest_path.open(encoding="utf-8") as manifest:
+            for line in manifest:
+                if not line.strip():
+                    continue
+                page = ArchivedPage.model_validate_json(line)
+                if theater_name is not None and page.theater_name != theater_name:
+                    continue
+                if date_from is not None and page.fetched_at < date_from:
+                    continue
+                if date_to is not None and page.fetched_at >= date_to:
+                    continue
+                yield page
+
+
+def create_page_archive(root: str = settings.ARCHIVE_DIR) -> PageArchive | None:
+    """
+    Create the archive of fetched pages.
+
+    Args:
+        root: Directory of the archive, archiving is disabled if empty
+
+    Returns:
+        Page archive, None if archiving is disabled or zstandard is missing
+    """
+    if not root:
+        return None
+    if not HAS_ZSTANDARD:
+        logger.warning("zstandard is not installed, pages are not archived")
+        return None
+    return PageArchive(root)
+
+
+# Shared by all scrapers
+page_archive = create_page_archive()
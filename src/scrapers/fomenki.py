@@ -1,37 +1,74 @@
 import datetime
 import re
 
-from bs4 import BeautifulSoup
-from bs4.element import Tag
-from sqlmodel import Session
-
-from ..db import engine
-from ..models import Performance
-from ..services.stage_service import StageService
+from ..config import settings
+from ..models import ParsedPerformance, ParsedShow
+from .parsers import HtmlNode, HtmlParser
 from .scraper import Scraper
 
+# The page title is matched in the raw HTML, so only the events are parsed
+TITLE = re.compile(r"<title>(.*?)</title>", re.DOTALL | re.IGNORECASE)
+
+# Labelled details in paragraphs of show pages, e.g. "Режиссёр — Пётр Фоменко",
+# "Режиссёр по пластике" and other crew members are not directors
+SEPARATOR = r"\s*[:—–-]?\s*"
+AUTHOR = re.compile(rf"^Автор(?:ы)?{SEPARATOR}(.+)", re.IGNORECASE)
+DIRECTOR = re.compile(
+    rf"^(?:Режисс[её]р(?:-постановщик)?|Постановка)(?!\s+по\b){SEPARATOR}(.+)",
+    re.IGNORECASE,
+)
+# "2 часа 30 минут", "1 ч. 40 мин." or "90 минут"
+DURATION = re.compile(
+    r"Продолжительность\D*(\d+)\s*(ч|мин)\w*\.?(?:\s*(\d+)\s*мин)?",
+    re.IGNORECASE,
+)
+
 
 class FomenkiScraper(Scraper):
     """
     Scraper for Fomenko Theater (Мастерская Петра Фоменко).
-    Extracts performance names and datetimes from the timetable page.
+    Extracts performance names, datetimes, stages and authors from the
+    timetable page, and directors and durations from show pages.
     """
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         super().__init__(
             repertoire_url="https://fomenki.ru/timetable/",
             theater_name="fomenki",
+            **kwargs,
         )
 
-    async def _parse_month_year(self) -> tuple[int, int]:
+    def get_page_urls(self, today: datetime.date | None = None) -> list[str]:
+        """
+        Get the URLs of the timetable pages of the current month and the
+        following ones, `settings.SCRAPE_MONTHS` months in total.
+
+        Args:
+            today: Date of the current month, today by default
+
+        Returns:
+            List of page URLs, e.g. https://fomenki.ru/timetable/06-2025/
         """
-        Extract the current month and year from the HTML content.
+        today = today or datetime.date.today()
+        urls = [self.repertoire_url]
+        for offset in range(1, settings.SCRAPE_MONTHS):
+            year, month = divmod(today.month - 1 + offset, 12)
+            urls.append(f"{self.repertoire_url}{month + 1:02d}-{today.year + year}/")
+        return urls
+
+    @staticmethod
+    def _parse_month_year(html_content: str) -> tuple[int, int]:
+        """
+        Extract the month and year of a timetable page from its title.
+
+        Args:
+            html_content: HTML content of the timetable page
 
         Returns:
             Tuple of (month, year) as integers
         """
-        title_text = self.soup.head.find("title").text
-        match = re.search(r"\s+(\w+)\s+(\d{4})", title_text)
+        title = TITLE.search(html_content)
+        match = title and re.search(r"\s+(\w+)\s+(\d{4})", title.group(1))
 
         if not match:
             raise ValueError("Could not find month and year in the title")
@@ -59,68 +96,104 @@ class FomenkiScraper(Scraper):
 
         return int(month_number), int(year)
 
-    async def _parse_performance_day(self, event: Tag) -> int:
+    @staticmethod
+    def _parse_performance_day(event: HtmlNode) -> int:
         """
         Extract performance info from a single event tag.
 
         Args:
-            event: BeautifulSoup Tag object representing a single event
+            event: Parsed element representing a single event
 
         Returns:
             Day as an integer
         """
-        date_text = event.find("div", class_="date").text
+        date_text = event.select_one("div.date").text
         day = "".join(filter(str.isdigit, date_text))  # keep only number
         return int(day)
 
-    async def _parse_performance_time(self, event: Tag) -> tuple[int, int]:
+    @staticmethod
+    def _parse_performance_time(event: HtmlNode) -> tuple[int, int]:
         """
         Extract performance time from a single event tag.
 
         Args:
-            event: BeautifulSoup Tag object representing a single event
+            event: Parsed element representing a single event
 
         Returns:
             Time as a tuple (hour, minute)
         """
-        time_text = event.find("p", class_="time").text.replace("Премьера", "")
+        time_text = event.select_one("p.time").text.replace("Премьера", "")
 
         hour, minute = time_text.split(":")
         return int(hour), int(minute)
 
-    async def _parse_performance_name(self, event: Tag) -> str:
+    @staticmethod
+    def _parse_performance_name(event: HtmlNode) -> str:
         """
         Extract performance name from a single event tag.
 
         Args:
-            event: BeautifulSoup Tag object representing a single event
+            event: Parsed element representing a single event
 
         Returns:
             Performance name as a string
         """
-        return event.find("a").get("title")
+        return event.select_one("a").get("title")
+
+    @staticmethod
+    def _parse_performance_url(event: HtmlNode) -> str | None:
+        """
+        Extract the show page link from a single event tag.
+
+        Args:
+            event: Parsed element representing a single event
+
+        Returns:
+            Link to the show page, relative to the website, if any
+        """
+        return event.select_one("a").get("href") or None
 
-    async def _parse_performance_stage(self, event: Tag) -> str:
+    @staticmethod
+    def _parse_performance_author(event: HtmlNode) -> str | None:
+        """
+        Extract the author from a single event tag.
+
+        Args:
+            event: Parsed element representing a single event
+
+        Returns:
+            Author as a string, if any
+        """
+        subtitle = event.select_one("p.subtitle")
+        if subtitle is None:
+            return None
+        return " ".join(subtitle.text.split()) or None
+
+    @staticmethod
+    def _parse_performance_stage(event: HtmlNode) -> str:
         """
         Extract performance stage from a single event tag.
 
         Args:
-            event: BeautifulSoup Tag object representing a single event
+            event: Parsed element representing a single event
 
         Returns:
             Performance stage as a string
         """
-        return event.find("p", class_="place").text
+        return event.select_one("p.place").text
 
-    async def parse_repertoire(self, html_content: str) -> list[Performance]:
+    @staticmethod
+    def parse_page(html_content: str, parser: HtmlParser) -> list[ParsedPerformance]:
         """
-        Parse the HTML content from Fomenki theater website and extract performance information.
+        Parse a timetable page of the Fomenki theater website.
 
         Args:
-            html_content: HTML content from the theater's timetable page
+            html_content: HTML content of the timetable page
+            parser: HTML parser backend
 
         Returns:
-            List of Performance objects with basic info (name and datetime)
+            List of parsed performances with basic info (name, datetime, stage,
+            author and show page)
 
         Raises:
             ValueError: If the HTML content cannot be parsed correctly
@@ -128,18 +201,18 @@ class FomenkiScraper(Scraper):
         if not html_content:
             raise ValueError("Empty HTML content provided")
 
-        self.soup = BeautifulSoup(html_content, "html.parser")
-
-        month, year = await self._parse_month_year()
+        month, year = FomenkiScraper._parse_month_year(html_content)
 
         performances = []
 
-        events_container = self.soup.find("div", class_="events")
-        events = events_container.find_all("div", class_="event")
+        events_container = parser.parse(html_content, root="div.events")
+        if events_container is None:
+            raise ValueError("Could not find events on the page")
+        events = events_container.select("div.event")
 
         for event in events:
-            day = await self._parse_performance_day(event)
-            hour, minute = await self._parse_performance_time(event)
+            day = FomenkiScraper._parse_performance_day(event)
+            hour, minute = FomenkiScraper._parse_performance_time(event)
             datetime_obj = datetime.datetime(
                 year=year,
                 month=month,
@@ -147,17 +220,51 @@ class FomenkiScraper(Scraper):
                 hour=hour,
                 minute=minute,
             )
-            performance_name = await self._parse_performance_name(event)
-            performance_stage = await self._parse_performance_stage(event)
-            with Session(engine) as session:
-                stage_id = StageService().get_stage_id_by_name(
-                    session, performance_stage
-                )
-            performance = Performance(
-                stage_id=stage_id,
-                title=performance_name,
+            performance = ParsedPerformance(
+                title=FomenkiScraper._parse_performance_name(event),
+                stage_name=FomenkiScraper._parse_performance_stage(event),
                 datetime=datetime_obj,
+                author=FomenkiScraper._parse_performance_author(event),
+                url=FomenkiScraper._parse_performance_url(event),
             )
             performances.append(performance)
 
         return performances
+
+    @staticmethod
+    def parse_show_page(html_content: str, parser: HtmlParser) -> ParsedShow:
+        """
+        Parse a show page of the Fomenki theater website, e.g.
+        https://fomenki.ru/performance/riverside/
+
+        Details are found by their labels in paragraphs, so they don't
+        depend on the layout of the page.
+
+        Args:
+            html_content: HTML content of the show page
+            parser: HTML parser backend
+
+        Returns:
+            Author, director and duration of the show, if found
+
+        Raises:
+            ValueError: If the HTML content is empty
+        """
+        if not html_content:
+            raise ValueError("Empty HTML content provided")
+
+        show = ParsedShow()
+        document = parser.parse(html_content)
+        for paragraph in document.select("p, li, dd"):
+            text = " ".join(paragraph.text.split())
+            if show.author is None and (match := AUTHOR.match(text)):
+                show.author = match.group(1)
+            elif show.director is None and (match := DIRECTOR.match(text)):
+                show.director = match.group(1)
+            elif show.duration is None and (match := DURATION.search(text)):
+                value, unit, minutes = match.groups()
+                if unit.lower() == "ч":
+                    show.duration = int(value) * 60 + int(minutes or 0)
+                else:
+                    show.duration = int(value)
+        return show
@@ -0,0 +1,95 @@
+import importlib.util
+import logging
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client for scrapers configured from settings.
+
+    The client is meant to be created once per process (or scrape run) and
+    shared by all scrapers, so connections, TLS sessions and DNS results
+    are reused between requests.
+
+    Args:
+        **kwargs: Extra arguments for httpx.AsyncClient, e.g. a transport
+
+    Returns:
+        Configured httpx.AsyncClient, to be closed by the caller
+    """
+    http2 = settings.HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+        ),
+        http2=http2,
+        follow_redirects=True,
+        **kwargs,
+    )
+
+
+class ValidatorCache:
+    """
+    Stores `ETag`/`Last-Modified` validators of fetched pages by URL,
+    used to make conditional requests.
+    """
+
+    def __init__(self):
+        self._validators: dict[str, dict[str, str]] = {}
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """
+        Get conditional request headers for a URL.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            `If-None-Match`/`If-Modified-Since` headers, empty if the page is unknown
+        """
+        validators = self._validators.get(url, {})
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last-modified" in validators:
+            headers["If-Modified-Since"] = validators["last-modified"]
+        return headers
+
+    def update(self, url: str, headers: httpx.Headers) -> None:
+        """
+        Remember validators from the response headers of a URL.
+
+        Args:
+            url: Page URL
+            headers: Response headers
+        """
+        validators = {
+            name: headers[name] for name in ("etag", "last-modified") if name in headers
+        }
+        if validators:
+            self._validators[url] = validators
+        else:
+            self._validators.pop(url, None)
+
+    def clear(self) -> None:
+        """Forget all validators."""
+        self._validators.clear()
+
+
+# Process-wide validators shared by all scrapers
+validator_cache = ValidatorCache()
@@ -1,11 +1,35 @@
+import asyncio
 import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-from sqlmodel import Session, select
+import httpx
+from sqlmodel import Session
 
+from ..cache import calendar_feeds, response_cache
+from ..changes import change_notifier
+from ..config import settings
 from ..db import engine
-from ..models import Performance
-from .fomenki import FomenkiScraper
+from ..metrics import metrics
+from ..models import (
+    ScrapedPerformance,
+    ScrapeResult,
+    ScrapeSnapshot,
+    ScrapeStatus,
+    StoreResult,
+)
+from ..services.calendar_service import CalendarService
+from ..services.show_service import ShowService
+from ..services.snapshot_service import SnapshotService
+from ..services.sync_service import SyncService
+from .http_client import create_http_client
+from .registry import get_enabled_theaters, load_scraper_class
+from .scraper import PageNotModified, Scraper
+from .show_details import ShowDetailsFetcher
+from .show_resolver import show_resolver
+from .stage_resolver import stage_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -13,59 +37,310 @@ logger = logging.getLogger(__name__)
 class ScraperManager:
     """Manages the execution of theater scrapers"""
 
+    # Result of the latest run of each theater's scraper
+    last_results: dict[str, ScrapeResult] = {}
+
+    # Worker processes parsing pages, started on first use
+    executor: ProcessPoolExecutor | None = None
+
+    @staticmethod
+    def get_executor() -> ProcessPoolExecutor | None:
+        """
+        Get the process pool parsing pages of all scrapers, so parsing
+        does not block the event loop serving the API.
+
+        Returns:
+            Pool of `settings.PARSER_PROCESSES` processes, None if it is 0
+        """
+        if settings.PARSER_PROCESSES <= 0:
+            return None
+        if ScraperManager.executor is None:
+            # Spawned workers don't inherit the parent's threads and connections
+            ScraperManager.executor = ProcessPoolExecutor(
+                max_workers=settings.PARSER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return ScraperManager.executor
+
     @staticmethod
-    async def run_all_scrapers():
-        """Run all theater scrapers and store their results"""
+    def shutdown_executor() -> None:
+        """Stop the parsing worker processes, if started."""
+        if ScraperManager.executor is not None:
+            ScraperManager.executor.shutdown(cancel_futures=True)
+            ScraperManager.executor = None
+
+    @staticmethod
+    def create_scrapers() -> list[Scraper]:
+        """
+        Create a scraper for every theater enabled in `settings.ENABLED_THEATERS`,
+        importing scraper modules on first use.
+        """
+        return [
+            load_scraper_class(theater.name)() for theater in get_enabled_theaters()
+        ]
+
+    @staticmethod
+    async def run_all_scrapers(
+        scrapers: list[Scraper] | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> list[ScrapeResult]:
+        """
+        Run all theater scrapers concurrently and store their results.
+
+        At most `settings.SCRAPER_CONCURRENCY` scrapers run at once, and each
+        theater's performances are stored as soon as its scraper finishes.
+        Show pages are fetched for missing details by a fetcher shared by
+        all scrapers, unless `settings.SHOW_DETAILS_CONCURRENCY` is 0.
+
+        Args:
+            scrapers: Scrapers to run, all known scrapers by default
+            client: Shared HTTP client for scrapers without their own,
+                a client for this run only by default
+
+        Returns:
+            List of per-scraper results
+        """
+        if client is None:
+            async with create_http_client() as client:
+                return await ScraperManager.run_all_scrapers(scrapers, client)
+
         logger.info(f"Starting scheduled scraping job at {datetime.now()}")
 
         try:
-            scrapers = [FomenkiScraper()]
-            results = []
+            # Load all stages and shows once per run instead of a query per event
+            stage_resolver.load()
+            show_resolver.load()
 
-            # Run all scrapers concurrently
+            if scrapers is None:
+                scrapers = ScraperManager.create_scrapers()
+            executor = ScraperManager.get_executor()
+            show_details = (
+                ShowDetailsFetcher(engine)
+                if settings.SHOW_DETAILS_CONCURRENCY > 0
+                else None
+            )
+            # Shared resources are only lent to scrapers for this run, as
+            # scrapers may outlive it, e.g. in the scheduler
+            own_resources = [
+                (scraper, scraper.client, scraper.executor, scraper.show_details)
+                for scraper in scrapers
+            ]
             for scraper in scrapers:
-                logger.info(f"Running scraper: {scraper.__class__.__name__}")
-                try:
-                    performances = await scraper.get_performances()
-                    results.extend(performances)
-                    logger.info(
-                        f"Scraper {scraper.__class__.__name__} found {len(performances)} performances"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error in scraper {scraper.__class__.__name__}: {str(e)}"
-                    )
+                scraper.client = scraper.client or client
+                scraper.executor = scraper.executor or executor
+                scraper.show_details = scraper.show_details or show_details
+            semaphore = asyncio.Semaphore(settings.SCRAPER_CONCURRENCY)
 
-            # Store results in database
-            with Session(engine) as session:
-                await ScraperManager.store_performances(session, results)
+            try:
+                async with asyncio.TaskGroup() as task_group:
+                    tasks = [
+                        task_group.create_task(
+                            ScraperManager.run_scraper(scraper, semaphore)
+                        )
+                        for scraper in scrapers
+                    ]
+            finally:
+                if show_details is not None:
+                    show_details.cancel()
+                for scraper, *own in own_resources:
+                    scraper.client, scraper.executor, scraper.show_details = own
+            results = [task.result() for task in tasks]
 
-            logger.info(
-                f"Scraping job completed. Total performances found: {len(results)}"
-            )
-            return len(results)
+            total = sum(result.performances_found for result in results)
+            logger.info(f"Scraping job completed. Total performances found: {total}")
+            return results
 
         except Exception as e:
             logger.error(f"Scraping job failed: {str(e)}")
-            return 0
+            return []
 
     @staticmethod
-    async def store_performances(session: Session, performances: list[Performance]):
-        """Store performances in database, avoiding duplicates"""
-        for performance in performances:
+    async def run_scraper(
+        scraper: Scraper,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> ScrapeResult:
+        """
+        Run a single scraper within its deadline and store its results.
+
+        The performances of every page are stored in their own transaction
+        as soon as the page is parsed, while other pages are still fetched.
+        Never raises, so a failing scraper does not cancel the others.
+
+        Args:
+            scraper: Scraper to run
+            semaphore: Semaphore limiting the number of concurrent scrapers
+
+        Returns:
+            Result with the scraper's outcome and duration
+        """
+        semaphore = semaphore or asyncio.Semaphore(1)
+        scraper_name = scraper.__class__.__name__
+
+        async with semaphore:
+            logger.info(f"Running scraper: {scraper_name}")
+            started_at = datetime.now()
+            start = time.perf_counter()
+            status = ScrapeStatus.success
+            performances = []
+            stored = None
+            error = None
+
             try:
-                # Check if performance already exists
-                query = select(Performance).where(
-                    (Performance.title == performance.title)
-                    & (Performance.stage_id == performance.stage_id)
-                    & (Performance.datetime == performance.datetime)
+                # Pages unchanged since the last stored run are not parsed
+                with Session(engine) as session:
+                    scraper.page_hashes = SnapshotService().get_hashes(
+                        session, scraper.theater_name
+                    )
+
+                failed_pages = 0
+                async with asyncio.timeout(settings.SCRAPER_TIMEOUT):
+                    async for url, page_performances in scraper.stream_performances():
+                        if page_performances is None:
+                            failed_pages += 1
+                            continue
+
+                        snapshot = scraper.snapshots.get(url)
+                        with (
+                            metrics.time_phase(scraper.theater_name, "store"),
+                            Session(engine) as session,
+                        ):
+                            page_stored = await ScraperManager.store_performances(
+                                session,
+                                page_performances,
+                                scraper.theater_name,
+                                [snapshot] if snapshot else [],
+                            )
+                        scraper.commit_fetched_page(url)
+
+                        performances.extend(page_performances)
+                        stored = stored or StoreResult()
+                        stored.inserted += page_stored.inserted
+                        stored.updated += page_stored.updated
+                        stored.unchanged += page_stored.unchanged
+                        stored.cancelled += page_stored.cancelled
+
+                if stored is None:
+                    if failed_pages:
+                        raise ValueError("No performances retrieved")
+                    raise PageNotModified(scraper.repertoire_url)
+                if failed_pages:
+                    error = f"Failed to scrape {failed_pages} pages"
+
+                logger.info(
+                    f"Scraper {scraper_name} found {len(performances)} performances"
                 )
-                existing_performance = session.exec(query).first()
 
-                if not existing_performance:
-                    session.add(performance)
+            except PageNotModified:
+                status = ScrapeStatus.unchanged
+                logger.info(f"Scraper {scraper_name}: repertoire not modified")
 
+            except TimeoutError:
+                status = ScrapeStatus.timeout
+                error = f"Timed out after {settings.SCRAPER_TIMEOUT} seconds"
+                logger.error(f"Scraper {scraper_name} timed out")
+
+            except Exception as e:
+                status = ScrapeStatus.failed
+                error = str(e)
+                logger.error(f"Error in scraper {scraper_name}: {error}")
+
+            # Next dates of shows and dates in feeds move on as time passes,
+            # and pages stored before a failure must be reflected too
+            try:
+                await ScraperManager.refresh_theater(
+                    scraper.theater_name,
+                    changed=stored is not None
+                    and bool(stored.inserted or stored.updated or stored.cancelled),
+                )
             except Exception as e:
-                logger.error(f"Error storing performance {performance.title}: {str(e)}")
+                logger.error(f"Failed to refresh {scraper.theater_name}: {e}")
+
+            duration = time.perf_counter() - start
+            logger.info(f"Scraper {scraper_name} finished in {duration:.2f}s")
 
+            result = ScrapeResult(
+                theater_name=scraper.theater_name,
+                status=status,
+                started_at=started_at,
+                duration=duration,
+                performances_found=len(performances),
+                stored=stored,
+                error=error,
+            )
+            ScraperManager.last_results[scraper.theater_name] = result
+            metrics.record_run(scraper.theater_name, status, len(performances), stored)
+            return result
+
+    @staticmethod
+    async def refresh_theater(theater_name: str, changed: bool = True) -> None:
+        """
+        Recompute the show aggregates and calendar feeds of a theater after
+        its pages are stored. Next dates of shows and dates in feeds move on
+        as time passes, so this runs after every scrape, even if nothing
+        changed.
+
+        Cached API responses are invalidated if the scrape or the refresh
+        changed anything.
+
+        Args:
+            theater_name: Name of the theater
+            changed: Whether the scrape changed performances
+        """
+        with Session(engine) as session:
+            aggregates_changed = ShowService().refresh_aggregates(session, theater_name)
+            feeds = CalendarService().refresh(session, theater_name)
+            session.commit()
+        calendar_feeds.update(feeds)
+        if changed or aggregates_changed:
+            await response_cache.invalidate()
+
+    @staticmethod
+    async def store_performances(
+        session: Session,
+        performances: list[ScrapedPerformance],
+        theater_name: str,
+        snapshots: list[ScrapeSnapshot] | None = None,
+    ) -> StoreResult:
+        """
+        Synchronize stored performances of a theater with scraped ones in a
+        single transaction: insert new, update changed and cancel removed ones.
+        Titles are resolved to shows through the show resolver, inserted,
+        rescheduled and removed performances are appended to the change log,
+        and their listing rows are refreshed. If anything changed, cached API
+        responses are invalidated and clients waiting for changes are woken up.
+        Show aggregates and calendar feeds are left to `refresh_theater`, once
+        all pages of a scrape are stored.
+
+        Args:
+            session: SQLModel database session
+            performances: Scraped performances
+            theater_name: Name of the scraped theater
+            snapshots: Snapshots of the scraped pages, saved in the same transaction
+
+        Returns:
+            Counts of inserted, updated, unchanged and cancelled performances
+        """
+        valid_performances = [p for p in performances if p.stage_id is not None]
+        if skipped := len(performances) - len(valid_performances):
+            logger.warning(f"Skipping {skipped} performances with unknown stage")
+
+        result = SyncService().sync(
+            session,
+            theater_name,
+            valid_performances,
+            batch_size=settings.STORE_BATCH_SIZE,
+            show_ids=show_resolver.get_show_ids(theater_name),
+        )
+        SnapshotService().save_many(session, snapshots or [])
         session.commit()
+
+        if result.inserted or result.updated or result.cancelled:
+            change_notifier.notify()
+            await response_cache.invalidate()
+
+        logger.info(
+            f"Synced {theater_name} performances: {result.inserted} inserted, "
+            f"{result.updated} updated, {result.unchanged} unchanged, "
+            f"{result.cancelled} cancelled"
+        )
+        return result
@@ -0,0 +1,235 @@
+import importlib.util
+import logging
+import re
+from abc import ABC, abstractmethod
+from functools import cache
+
+logger = logging.getLogger(__name__)
+
+# "tag.class" selectors, the only ones a SoupStrainer can be built from
+STRAINABLE_SELECTOR = re.compile(r"^(\w+)\.([\w-]+)$")
+
+
+class HtmlNode(ABC):
+    """Element of a parsed page, independent of the parser backend."""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    @abstractmethod
+    def select(self, selector: str) -> list["HtmlNode"]:
+        """Get all descendants matching a CSS selector."""
+
+    @abstractmethod
+    def select_one(self, selector: str) -> "HtmlNode | None":
+        """Get the first descendant matching a CSS selector, if any."""
+
+    @property
+    @abstractmethod
+    def text(self) -> str:
+        """Text of the element and all its descendants."""
+
+    @abstractmethod
+    def get(self, name: str) -> str | None:
+        """Get an attribute value of the element."""
+
+
+class HtmlParser(ABC):
+    """
+    HTML parser backend used by scrapers.
+
+    Selectors are plain CSS strings, compiled once per process by backends
+    that support it. Backends import their libraries on first use, so
+    processes that never scrape don't load them.
+    """
+
+    name: str
+
+    @abstractmethod
+    def parse(self, html_content: str, root: str | None = None) -> HtmlNode | None:
+        """
+        Parse a page.
+
+        Args:
+            html_content: HTML content of a page
+            root: CSS selector of the only part of the page the caller needs,
+                html.parser skips building the rest of the tree when the
+                selector is a "tag.class" one, lxml and selectolax parse the
+                whole page and select it
+
+        Returns:
+            The document, or the first element matching `root` if it is given
+            (None if there is no such element)
+        """
+
+
+@cache
+def _compile_soup_selector(selector: str):
+    """Compile a CSS selector for BeautifulSoup trees."""
+    import soupsieve
+
+    return soupsieve.compile(selector)
+
+
+class SoupNode(HtmlNode):
+    """Element of a BeautifulSoup tree."""
+
+    __slots__ = ()
+
+    def select(self, selector: str) -> list[HtmlNode]:
+        compiled = _compile_soup_selector(selector)
+        return [SoupNode(tag) for tag in compiled.select(self.element)]
+
+    def select_one(self, selector: str) -> HtmlNode | None:
+        tag = _compile_soup_selector(selector).select_one(self.element)
+        return SoupNode(tag) if tag is not None else None
+
+    @property
+    def text(self) -> str:
+        return self.element.get_text()
+
+    def get(self, name: str) -> str | None:
+        return self.element.get(name)
+
+
+class SoupParser(HtmlParser):
+    """BeautifulSoup with the pure-Python html.parser, always available."""
+
+    name = "html.parser"
+
+    def parse(self, html_content: str, root: str | None = None) -> HtmlNode | None:
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        if root is None:
+            return SoupNode(BeautifulSoup(html_content, "html.parser"))
+
+        strainer = None
+        if match := STRAINABLE_SELECTOR.match(root):
+            tag, class_name = match.groups()
+            strainer = SoupStrainer(
+                tag, class_=re.compile(rf"(^|\s){re.escape(class_name)}(\s|$)")
+            )
+        soup = BeautifulSoup(html_content, "html.parser", parse_only=strainer)
+        return SoupNode(soup).select_one(root)
+
+
+@cache
+def _compile_lxml_selector(selector: str):
+    """Compile a CSS selector to an XPath expression for lxml trees."""
+    from lxml.cssselect import CSSSelector
+
+    return CSSSelector(selector)
+
+
+class LxmlNode(HtmlNode):
+    """Element of an lxml tree."""
+
+    __slots__ = ()
+
+    def select(self, selector: str) -> list[HtmlNode]:
+        compiled = _compile_lxml_selector(selector)
+        return [LxmlNode(element) for element in compiled(self.element)]
+
+    def select_one(self, selector: str) -> HtmlNode | None:
+        elements = _compile_lxml_selector(selector)(self.element)
+        return LxmlNode(elements[0]) if elements else None
+
+    @property
+    def text(self) -> str:
+        return str(self.element.text_content())
+
+    def get(self, name: str) -> str | None:
+        return self.element.get(name)
+
+
+class LxmlParser(HtmlParser):
+    """lxml (libxml2) with selectors compiled to XPath, requires the "lxml" extra."""
+
+    name = "lxml"
+
+    def parse(self, html_content: str, root: str | None = None) -> HtmlNode | None:
+        import lxml.html
+
+        # libxml2 can't skip parts of a page, the whole tree is built
+        document = LxmlNode(lxml.html.document_fromstring(html_content))
+        return document.select_one(root) if root is not None else document
+
+
+class LexborNode(HtmlNode):
+    """Element of a selectolax (lexbor) tree."""
+
+    __slots__ = ()
+
+    def select(self, selector: str) -> list[HtmlNode]:
+        return [LexborNode(node) for node in self.element.css(selector)]
+
+    def select_one(self, selector: str) -> HtmlNode | None:
+        node = self.element.css_first(selector)
+        return LexborNode(node) if node is not None else None
+
+    @property
+    def text(self) -> str:
+        return self.element.text()
+
+    def get(self, name: str) -> str | None:
+        return self.element.attributes.get(name)
+
+
+class SelectolaxParser(HtmlParser):
+    """selectolax (lexbor), the fastest backend, requires the "selectolax" extra."""
+
+    name = "selectolax"
+
+    def parse(self, html_content: str, root: str | None = None) -> HtmlNode | None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        # lexbor can't skip parts of a page, the whole tree is built
+        document = LexborHTMLParser(html_content)
+        if root is None:
+            return LexborNode(document.root)
+        node = document.css_first(root)
+        return LexborNode(node) if node is not None else None
+
+
+# Backends by name, from the fastest one, with the modules they require
+PARSERS: dict[str, tuple[type[HtmlParser], tuple[str, ...]]] = {
+    "selectolax": (SelectolaxParser, ("selectolax",)),
+    "lxml": (LxmlParser, ("lxml", "cssselect")),
+    "html.parser": (SoupParser, ()),
+}
+
+
+def _is_available(modules: tuple[str, ...]) -> bool:
+    """Check if the modules required by a backend are installed."""
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+
+@cache
+def get_parser(name: str = "auto") -> HtmlParser:
+    """
+    Get an HTML parser backend by name.
+
+    Args:
+        name: "selectolax", "lxml" or "html.parser", or "auto" for
+            the fastest installed one
+
+    Returns:
+        Parser backend, shared by all callers
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if name == "auto":
+        name = next(
+            name for name, (_, modules) in PARSERS.items() if _is_available(modules)
+        )
+    if name not in PARSERS:
+        raise ValueError(f"Unknown HTML parser: {name}")
+
+    parser_class, modules = PARSERS[name]
+    if not _is_available(modules):
+        logger.warning(f"HTML parser {name} is not installed, using html.parser")
+        parser_class = SoupParser
+    return parser_class()
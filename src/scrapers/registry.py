@@ -0,0 +1,145 @@
+import importlib
+from functools import cache
+from typing import TYPE_CHECKING
+
+from sqlmodel import SQLModel
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .scraper import Scraper
+
+
+class StageEntry(SQLModel):
+    """Stage seeded for a registered theater."""
+
+    name: str
+    address: str | None = None
+
+
+class TheaterEntry(SQLModel):
+    """
+    Registered theater. The scraper is referenced by its import path and only
+    imported when the theater is scraped, so API-only workers never load
+    scrapers and their parser dependencies.
+    """
+
+    name: str
+    full_name: str
+    url: str
+    scraper: str | None = None  # "module:Class", None if not scraped yet
+    stages: list[StageEntry] = []
+
+
+# Every supported theater: adding one here adds it to `TheaterName`,
+# to the seeded theaters and stages and, with a scraper, to scraping runs
+THEATERS = [
+    TheaterEntry(
+        name="ramt",
+        full_name="Российский академический молодежный театр",
+        url="https://ramt.ru/",
+        stages=[
+            StageEntry(name="Большая сцена", address="Театральная площадь, 2"),
+            StageEntry(name="Маленькая сцена", address="Театральная площадь, 2"),
+            StageEntry(name="Черная комната", address="Театральная площадь, 2"),
+            StageEntry(name="Театральный двор", address="Театральная площадь, 2"),
+            StageEntry(name="Белая комната", address="Театральная площадь, 2"),
+            StageEntry(name="Большая сцена*", address="Театральная площадь, 2"),
+        ],
+    ),
+    TheaterEntry(
+        name="fomenki",
+        full_name="Мастерская Петра Фоменко",
+        url="https://fomenko.theatre.ru/",
+        scraper="src.scrapers.fomenki:FomenkiScraper",
+        stages=[
+            StageEntry(
+                name="Старая сцена, Зелёный зал",
+                address="Набережная Тараса Шевченко, 30",
+            ),
+            StageEntry(
+                name="Старая сцена, Серый зал",
+                address="Набережная Тараса Шевченко, 30",
+            ),
+            StageEntry(
+                name="Новая сцена, Малый зал",
+                address="Набережная Тараса Шевченко, 29",
+            ),
+            StageEntry(
+                name="Новая сцена, Большой зал",
+                address="Набережная Тараса Шевченко, 29",
+            ),
+            StageEntry(
+                name="Новая сцена, Фойе",
+                address="Набережная Тараса Шевченко, 29",
+            ),
+        ],
+    ),
+    TheaterEntry(
+        name="sti",
+        full_name="Студия театрального искусства",
+        url="https://sti.ru/",
+        stages=[
+            StageEntry(name="Основная сцена", address="ул. Станиславского, 21 стр. 7"),
+        ],
+    ),
+]
+
+
+def get_theater(name: str) -> TheaterEntry:
+    """
+    Get a registered theater by name.
+
+    Raises:
+        ValueError: If the theater is not registered
+    """
+    for theater in THEATERS:
+        if theater.name == name:
+            return theater
+    raise ValueError(f"Unknown theater: {name}")
+
+
+def get_enabled_theaters(
+    enabled: list[str] = settings.ENABLED_THEATERS,
+) -> list[TheaterEntry]:
+    """
+    Get the theaters scraped by this deployment.
+
+    Args:
+        enabled: Names of the scraped theaters, all theaters with a scraper
+            if empty
+
+    Returns:
+        Registered theaters with a scraper
+
+    Raises:
+        ValueError: If an enabled theater is not registered or has no scraper
+    """
+    if not enabled:
+        return [theater for theater in THEATERS if theater.scraper is not None]
+
+    theaters = [get_theater(name) for name in enabled]
+    if missing := [theater.name for theater in theaters if theater.scraper is None]:
+        raise ValueError(f"Theaters without a scraper: {', '.join(missing)}")
+    return theaters
+
+
+@cache
+def load_scraper_class(name: str) -> type["Scraper"]:
+    """
+    Import the scraper class of a theater.
+
+    Args:
+        name: Theater name
+
+    Returns:
+        Scraper class
+
+    Raises:
+        ValueError: If the theater is not registered or has no scraper
+    """
+    theater = get_theater(name)
+    if theater.scraper is None:
+        raise ValueError(f"Theater {name} has no scraper")
+    module_name, class_name = theater.scraper.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
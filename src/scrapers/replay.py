@@ -0,0 +1,166 @@
+"""
+Parse archived pages of a theater again and resync its stored performances,
+without network access:
+
+    python -m src.scrapers.replay fomenki --from 2025-01-01 --to 2026-01-01
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import batched
+
+from sqlmodel import Session
+
+from ..db import engine
+from ..models import ScrapedPerformance, StoreResult
+from .archive import PageArchive, create_page_archive, page_archive
+from .manager import ScraperManager
+from .registry import get_enabled_theaters, load_scraper_class
+from .show_resolver import show_resolver
+from .stage_resolver import stage_resolver
+
+logger = logging.getLogger(__name__)
+
+
+async def replay(
+    theater_name: str,
+    date_from: datetime.datetime | None = None,
+    date_to: datetime.datetime | None = None,
+    archive: PageArchive | None = None,
+    processes: int | None = None,
+    batch_size: int = 64,
+) -> StoreResult:
+    """
+    Parse the pages of a theater archived in a time range with its scraper's
+    `parse_repertoire` and synchronize stored performances with them.
+
+    Every distinct page content is parsed once, in a process pool on machines
+    with several CPUs, where spawning workers pays off. For every
+    month, only the performances of the latest archived page covering it are
+    stored, as they were the last ones seen on the website.
+
+    Args:
+        theater_name: Name of the theater
+        date_from: Earliest fetch time of replayed pages
+        date_to: Fetch time replayed pages are before
+        archive: Page archive, the one in `settings.ARCHIVE_DIR` by default
+        processes: Number of parsing processes, one per CPU by default,
+            pages are parsed in this process if it is 0 or 1
+        batch_size: Maximum number of pages held in memory at once
+
+    Returns:
+        Counts of inserted, updated, unchanged and cancelled performances
+
+    Raises:
+        ValueError: If the archive is not configured or the theater has no scraper
+    """
+    archive = archive or page_archive
+    if archive is None:
+        raise ValueError("Page archive is not configured, set ARCHIVE_DIR")
+
+    pages = list(archive.get_pages(theater_name, date_from, date_to))
+    content_hashes = list(dict.fromkeys(page.content_hash for page in pages))
+    logger.info(
+        f"Replaying {len(pages)} archived {theater_name} pages "
+        f"with {len(content_hashes)} distinct contents"
+    )
+
+    stage_resolver.load()
+    show_resolver.load()
+    processes = os.cpu_count() if processes is None else processes
+    pool = (
+        ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+        if processes > 1
+        else nullcontext()
+    )
+    parsed: dict[str, list[ScrapedPerformance]] = {}
+    with pool as executor:
+        scraper = load_scraper_class(theater_name)(executor=executor)
+        for batch in batched(content_hashes, batch_size):
+            results = await asyncio.gather(
+                *(scraper.parse_repertoire(archive.load(h)) for h in batch),
+                return_exceptions=True,
+            )
+            for content_hash, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to parse page {content_hash}: {result}")
+                    continue
+                parsed[content_hash] = result
+
+    # Pages are listed in fetch order, so later versions of a month win
+    latest: dict[tuple[int, int], list[ScrapedPerformance]] = {}
+    for page in pages:
+        months = defaultdict(list)
+        for performance in parsed.get(page.content_hash, []):
+            months[performance.datetime.year, performance.datetime.month].append(
+                performance
+            )
+        latest.update(months)
+
+    stored = StoreResult()
+    for month in sorted(latest):
+        with Session(engine) as session:
+            month_stored = await ScraperManager.store_performances(
+                session, latest[month], theater_name
+            )
+        stored.inserted += month_stored.inserted
+        stored.updated += month_stored.updated
+        stored.unchanged += month_stored.unchanged
+        stored.cancelled += month_stored.cancelled
+    await ScraperManager.refresh_theater(theater_name)
+    return stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "theater_name",
+        choices=[theater.name for theater in get_enabled_theaters([])],
+    )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=datetime.datetime.fromisoformat,
+        help="Earliest fetch time of replayed pages, e.g. 2025-01-01",
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=datetime.datetime.fromisoformat,
+        help="Fetch time replayed pages are before",
+    )
+    parser.add_argument(
+        "--processes", type=int, help="Parsing processes, one per CPU by default"
+    )
+    parser.add_argument(
+        "--archive-dir", help="Archive directory, ARCHIVE_DIR by default"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    archive = create_page_archive(args.archive_dir) if args.archive_dir else None
+    stored = asyncio.run(
+        replay(
+            args.theater_name,
+            args.date_from,
+            args.date_to,
+            archive=archive,
+            processes=args.processes,
+        )
+    )
+    print(
+        f"Replayed {args.theater_name}: {stored.inserted} inserted, "
+        f"{stored.updated} updated, {stored.unchanged} unchanged, "
+        f"{stored.cancelled} cancelled"
+    )
+
+
+if __name__ == "__main__":
+    main()
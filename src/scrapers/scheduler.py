@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import logging
+import random
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import Engine
+from sqlmodel import Session, func, select
+
+from ..config import settings
+from ..db import engine
+from ..models import ScrapeSchedule, ScrapeStatus
+from ..services.schedule_service import ScheduleService
+from .manager import ScraperManager
+from .scraper import Scraper
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeLock:
+    """
+    Single-flight lock for scraping a theater, shared by all workers and
+    replicas through PostgreSQL advisory locks. Falls back to a per-process
+    lock for other databases.
+    """
+
+    def __init__(self, bind: Engine = engine):
+        """
+        Initialize the lock.
+
+        Args:
+            bind: Engine used for advisory locks
+        """
+        self.bind = bind
+        self._local_locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _lock_key(name: str) -> int:
+        """Get a stable 64-bit advisory lock key for a name."""
+        digest = hashlib.sha256(f"theater-scraper:{name}".encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    @asynccontextmanager
+    async def acquire(self, name: str) -> AsyncIterator[bool]:
+        """
+        Try to acquire the lock without waiting.
+
+        Args:
+            name: Name of the locked resource, e.g. a theater name
+
+        Yields:
+            True if the lock is held, False if someone else holds it
+        """
+        if self.bind.dialect.name != "postgresql":
+            lock = self._local_locks.setdefault(name, asyncio.Lock())
+            if lock.locked():
+                yield False
+                return
+            async with lock:
+                yield True
+            return
+
+        key = self._lock_key(name)
+        # Advisory locks belong to the connection, so it is kept open while held
+        with self.bind.connect() as connection:
+            acquired = connection.execute(select(func.pg_try_advisory_lock(key)))
+            if not acquired.scalar():
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                connection.execute(select(func.pg_advisory_unlock(key)))
+                connection.commit()
+
+
+class ScrapeScheduler:
+    """
+    Runs theater scrapers periodically in the background.
+
+    Every theater runs on its own interval with random jitter, failed runs are
+    retried with exponential backoff, and the schedule is persisted, so
+    multiple workers and replicas scrape each theater once per interval.
+    """
+
+    def __init__(
+        self,
+        scrapers: list[Scraper] | None = None,
+        client: httpx.AsyncClient | None = None,
+        lock: ScrapeLock | None = None,
+        bind: Engine = engine,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            scrapers: Scrapers to schedule, all known scrapers by default
+            client: Shared HTTP client for the scrapers
+            lock: Single-flight lock, an advisory lock on `bind` by default
+            bind: Engine used to persist the schedule
+        """
+        if scrapers is None:
+            scrapers = ScraperManager.create_scrapers()
+        self.scrapers = {scraper.theater_name: scraper for scraper in scrapers}
+        self.client = client
+        self.lock = lock or ScrapeLock(bind)
+        self.bind = bind
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start a background scraping loop for every theater."""
+        for theater_name, scraper in self.scrapers.items():
+            task = asyncio.create_task(
+                self._run_loop(scraper), name=f"scrape-{theater_name}"
+            )
+            self._tasks.append(task)
+        logger.info(f"Scheduler started for {', '.join(self.scrapers)}")
+
+    async def stop(self) -> None:
+        """Cancel all scraping loops and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("Scheduler stopped")
+
+    def get_interval(self, theater_name: str) -> float:
+        """Get the scraping interval of a theater in seconds."""
+        return settings.SCRAPE_INTERVALS.get(theater_name, settings.SCRAPE_INTERVAL)
+
+    @staticmethod
+    def get_backoff(consecutive_failures: int) -> float:
+        """Get the retry delay in seconds after a number of failed runs."""
+        delay = settings.SCRAPE_BACKOFF_BASE * 2 ** (consecutive_failures - 1)
+        return min(delay, settings.SCRAPE_BACKOFF_MAX)
+
+    @staticmethod
+    def add_jitter(delay: float) -> float:
+        """Randomly spread a delay by up to `settings.SCRAPE_JITTER` of its length."""
+        return delay * (
+            1 + random.uniform(-settings.SCRAPE_JITTER, settings.SCRAPE_JITTER)
+        )
+
+    async def _run_loop(self, scraper: Scraper) -> None:
+        """Scrape a theater whenever it is due, forever."""
+        delay = 0.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                delay = await self.run_if_due(scraper)
+            except Exception as e:
+                delay = self.add_jitter(self.get_backoff(1))
+                logger.error(f"Scheduling {scraper.theater_name} failed: {e}")
+
+    async def run_if_due(self, scraper: Scraper) -> float:
+        """
+        Run a scraper unless another worker is running it or already ran it
+        within its interval, and persist its next run time.
+
+        Args:
+            scraper: Scraper to run
+
+        Returns:
+            Delay until the scraper should be checked again, in seconds
+        """
+        theater_name = scraper.theater_name
+        service = ScheduleService()
+
+        async with self.lock.acquire(theater_name) as acquired:
+            if not acquired:
+                logger.info(f"Scraping {theater_name} is already in progress")
+                return self.add_jitter(self.get_interval(theater_name))
+
+            with Session(self.bind) as session:
+                schedule = service.get_by_id(session, theater_name)
+            schedule = schedule or ScrapeSchedule(theater_name=theater_name)
+
+            now = datetime.now()
+            if schedule.next_run_at is not None and schedule.next_run_at > now:
+                return (schedule.next_run_at - now).total_seconds()
+
+            results = await ScraperManager.run_all_scrapers([scraper], self.client)
+            status = results[0].status if results else ScrapeStatus.failed
+
+            if status in (ScrapeStatus.failed, ScrapeStatus.timeout):
+                schedule.consecutive_failures += 1
+                delay = self.get_backoff(schedule.consecutive_failures)
+            else:
+                schedule.consecutive_failures = 0
+                delay = self.get_interval(theater_name)
+            delay = self.add_jitter(delay)
+
+            schedule.last_run_at = now
+            schedule.last_status = status
+            schedule.next_run_at = datetime.now() + timedelta(seconds=delay)
+            with Session(self.bind) as session:
+                service.save(session, schedule)
+
+            logger.info(f"Next {theater_name} scrape at {schedule.next_run_at}")
+            return delay
@@ -1,9 +1,44 @@
+import asyncio
+import hashlib
 import logging
+import re
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import TYPE_CHECKING, TypeVar
 
 import httpx
 
+from ..config import settings
+from ..metrics import metrics
+from ..models import (
+    ParsedPerformance,
+    ParsedShow,
+    ScrapedPerformance,
+    ScrapeSnapshot,
+)
+from .archive import PageArchive, page_archive
+from .http_client import ValidatorCache, create_http_client, validator_cache
+from .parsers import HtmlParser, get_parser
+from .stage_resolver import StageResolver, stage_resolver
+
+if TYPE_CHECKING:
+    from .show_details import ShowDetailsFetcher
+
+T = TypeVar("T")
+
+# Markup that may change between requests without changing the repertoire
+VOLATILE_MARKUP = re.compile(r"<!--.*?-->|<script\b.*?</script>", re.DOTALL | re.I)
+
+
+class PageNotModified(Exception):
+    """Raised when a fetched page has not changed since the last scrape."""
+
+
+class PageNotFound(Exception):
+    """Raised when a page does not exist, e.g. a month not published yet."""
+
 
 class Scraper(ABC):
     """Base scraper class for theater repertoire data."""
@@ -17,6 +52,13 @@ class Scraper(ABC):
         self,
         repertoire_url: str,
         theater_name: str,
+        resolver: StageResolver | None = None,
+        client: httpx.AsyncClient | None = None,
+        validators: ValidatorCache | None = None,
+        parser: HtmlParser | None = None,
+        executor: Executor | None = None,
+        archive: PageArchive | None = None,
+        show_details: "ShowDetailsFetcher | None" = None,
     ):
         """
         Initialize the scraper with configurable URL and theater name.
@@ -24,23 +66,70 @@ class Scraper(ABC):
         Args:
             repertoire_url: URL to the theater's repertoire page
             theater_name: Name identifier for the theater
+            resolver: Stage lookup cache, the process-wide one by default
+            client: Shared HTTP client, a short-lived one per request by default
+            validators: Conditional request cache, the process-wide one by default
+            parser: HTML parser backend, the one set in `settings.HTML_PARSER` by default
+            executor: Process pool to parse pages in, the event loop by default
+            archive: Archive of fetched pages, the process-wide one by default
+                (None if `settings.ARCHIVE_DIR` is not set)
+            show_details: Fetcher of show details missing from repertoire
+                pages, set by the manager, shows are not fetched by default
         """
         self.repertoire_url = repertoire_url
         self.theater_name = theater_name
+        self.stage_resolver = resolver or stage_resolver
+        self.client = client
+        self.validators = validators or validator_cache
+        self.parser = parser or get_parser(settings.HTML_PARSER)
+        self.executor = executor
+        self.archive = archive or page_archive
+        self.show_details = show_details
+        self.fetched_pages: dict[str, httpx.Headers] = {}
+        # Content hashes of the pages stored by the last run, set by the manager
+        self.page_hashes: dict[str, str] = {}
+        # Snapshots of the pages fetched by this run, saved by the manager
+        self.snapshots: dict[str, ScrapeSnapshot] = {}
         self.logger = logging.getLogger(f"scraper.{self.theater_name}")
 
-    async def scrape_repertoire(self) -> str | None:
+    async def fetch_page(self, url: str) -> str | None:
         """
-        Fetches HTML content from theater repertoire page.
+        Fetches HTML content from a page using a conditional request.
+
+        Args:
+            url: Page URL
 
         Returns:
             HTML content as string if successful, None otherwise
+
+        Raises:
+            PageNotModified: If the page has not changed since the last stored scrape
+            PageNotFound: If the page does not exist
         """
+        headers = {**self.HEADERS, **self.validators.request_headers(url)}
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.repertoire_url, headers=self.HEADERS)
-                response.raise_for_status()
-                return response.text
+            response = await self.get(url, headers)
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                raise PageNotModified(url)
+            if response.status_code == httpx.codes.NOT_FOUND:
+                raise PageNotFound(url)
+            response.raise_for_status()
+
+            content_hash = self.hash_page(response.text)
+            if self.page_hashes.get(url) == content_hash:
+                self.validators.update(url, response.headers)
+                raise PageNotModified(url)
+
+            self.fetched_pages[url] = response.headers
+            snapshot = ScrapeSnapshot(
+                theater_name=self.theater_name,
+                url=url,
+                content_hash=content_hash,
+                fetched_at=datetime.now(),
+            )
+            self.snapshots[url] = snapshot
+            await self.archive_page(url, response.text, snapshot.fetched_at)
+            return response.text
 
         except httpx.HTTPError as e:
             self.logger.error(
@@ -48,43 +137,299 @@ class Scraper(ABC):
             )
             return None
 
+    async def get(self, url: str, headers: dict[str, str]) -> httpx.Response:
+        """Send a GET request with the shared client, if any."""
+        if self.client is None:
+            async with create_http_client() as client:
+                return await client.get(url, headers=headers)
+        return await self.client.get(url, headers=headers)
+
+    async def fetch_show_page(self, url: str) -> str:
+        """
+        Fetch the page of a show. Show pages are cached by the show details
+        fetcher, so they are requested unconditionally and not archived.
+
+        Args:
+            url: Show page URL
+
+        Returns:
+            HTML content of the page
+
+        Raises:
+            httpx.HTTPError: If the page could not be fetched
+        """
+        response = await self.get(url, self.HEADERS)
+        response.raise_for_status()
+        return response.text
+
+    async def archive_page(
+        self, url: str, html_content: str, fetched_at: datetime
+    ) -> None:
+        """
+        Save a changed page to the archive, if any, so it can be parsed again
+        offline. Failures are logged and do not fail the scrape.
+
+        Args:
+            url: Page URL
+            html_content: HTML content of the page
+            fetched_at: Time the page was fetched
+        """
+        if self.archive is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.archive.save, self.theater_name, url, html_content, fetched_at
+            )
+        except (OSError, ImportError) as e:
+            self.logger.error(f"Failed to archive {url}: {e}")
+
+    def normalize_page(self, html_content: str) -> str:
+        """
+        Strip comments, scripts and whitespace differences from a page,
+        so that only meaningful changes change its hash.
+        Override this if a theater's pages contain other volatile markup.
+
+        Args:
+            html_content: HTML content of a page
+
+        Returns:
+            Normalized page content
+        """
+        return " ".join(VOLATILE_MARKUP.sub("", html_content).split())
+
+    def hash_page(self, html_content: str) -> str:
+        """
+        Get the content hash of a normalized page.
+
+        Args:
+            html_content: HTML content of a page
+
+        Returns:
+            Hex digest of the SHA-256 hash
+        """
+        normalized = self.normalize_page(html_content)
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def scrape_repertoire(self) -> str | None:
+        """
+        Fetches HTML content from theater repertoire page.
+
+        Returns:
+            HTML content as string if successful, None otherwise
+
+        Raises:
+            PageNotModified: If the page has not changed since the last stored scrape
+        """
+        return await self.fetch_page(self.repertoire_url)
+
+    def get_page_urls(self) -> list[str]:
+        """
+        Get the URLs of all repertoire pages to scrape.
+        Override this if a theater's repertoire spans multiple pages.
+
+        Returns:
+            List of page URLs, only the repertoire URL by default
+        """
+        return [self.repertoire_url]
+
+    def commit_fetched_page(self, url: str) -> None:
+        """
+        Remember the validators and the hash of a page fetched by this scraper.
+        Call this once its performances and snapshot are stored, so a
+        failed run is not skipped as unchanged next time.
+
+        Args:
+            url: Page URL
+        """
+        if (headers := self.fetched_pages.pop(url, None)) is not None:
+            self.validators.update(url, headers)
+        if (snapshot := self.snapshots.pop(url, None)) is not None:
+            self.page_hashes[url] = snapshot.content_hash
+
+    def commit_fetched_pages(self) -> None:
+        """Remember validators and hashes of all pages fetched by this scraper."""
+        for url in list(self.fetched_pages.keys() | self.snapshots.keys()):
+            self.commit_fetched_page(url)
+
+    def resolve_stage_id(self, stage_name: str) -> int | None:
+        """
+        Get stage ID for a stage of this theater from the shared stage cache.
+
+        Args:
+            stage_name: Stage name as found on the theater's website
+
+        Returns:
+            Stage ID if found, None otherwise
+        """
+        return self.stage_resolver.resolve(self.theater_name, stage_name)
+
+    @staticmethod
     @abstractmethod
-    async def parse_repertoire(self, html_content: str) -> Any:
+    def parse_page(html_content: str, parser: HtmlParser) -> list[ParsedPerformance]:
+        """
+        Parse a repertoire page. Implement this in every scraper.
+
+        This runs in a worker process, so it must be a pure function of its
+        arguments: no database or network access and no scraper state.
+
+        Args:
+            html_content: HTML content of a repertoire page
+            parser: HTML parser backend
+
+        Returns:
+            Performances found on the page
+
+        Raises:
+            ValueError: If the HTML content cannot be parsed correctly
+        """
+
+    @staticmethod
+    def parse_show_page(html_content: str, parser: HtmlParser) -> ParsedShow:
+        """
+        Parse the page of a show. Override this in scrapers whose parsed
+        performances link to show pages with their `url`, the default finds
+        no details.
+
+        Like `parse_page`, this runs in a worker process.
+
+        Args:
+            html_content: HTML content of a show page
+            parser: HTML parser backend
+
+        Returns:
+            Details of the show, None for details not found on the page
+
+        Raises:
+            ValueError: If the HTML content cannot be parsed correctly
+        """
+        return ParsedShow()
+
+    async def run_parser(
+        self, function: Callable[[str, HtmlParser], T], html_content: str
+    ) -> T:
+        """
+        Run a parsing function in the executor, if any, so parsing does not
+        block the event loop.
+
+        Args:
+            function: Static parsing method, e.g. `parse_page`
+            html_content: HTML content of a page
+
+        Returns:
+            Result of the function
+        """
+        if self.executor is None:
+            return function(html_content, self.parser)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, function, html_content, self.parser
+        )
+
+    def create_performance(self, parsed: ParsedPerformance) -> ScrapedPerformance:
+        """
+        Create a performance from a parsed one, resolving its stage.
+
+        Args:
+            parsed: Performance as found on a page
+
+        Returns:
+            Performance with the stage ID, or no stage ID if the stage is unknown
+        """
+        return ScrapedPerformance(
+            title=parsed.title,
+            stage_id=self.resolve_stage_id(parsed.stage_name),
+            datetime=parsed.datetime,
+            director=parsed.director,
+            author=parsed.author,
+        )
+
+    async def parse_repertoire(self, html_content: str) -> list[ScrapedPerformance]:
         """
         Parse the HTML content and extract performance information.
 
+        The page is parsed by `parse_page` in the executor, if any, so parsing
+        does not block the event loop. Details missing from the page are then
+        filled in from show pages, if a show details fetcher is set, and
+        stages are resolved here.
+
         Args:
             html_content: HTML content from the theater's repertoire page
 
         Returns:
-            Parsed performance data in the format specific to each theater
+            List of scraped performances
 
         Raises:
             ValueError: If the HTML content cannot be parsed correctly
         """
-        pass
+        with metrics.time_phase(self.theater_name, "parse"):
+            parsed = await self.run_parser(self.parse_page, html_content)
+        if self.show_details is not None:
+            with metrics.time_phase(self.theater_name, "enrich"):
+                await self.show_details.enrich(self, parsed)
+        with metrics.time_phase(self.theater_name, "resolve"):
+            return [self.create_performance(performance) for performance in parsed]
 
-    async def get_performances(self) -> Any:
+    async def scrape_page(self, url: str) -> list[ScrapedPerformance] | None:
         """
-        Performs the full scraping workflow: fetch and parse.
+        Fetch and parse a single repertoire page.
+
+        Args:
+            url: Page URL
 
         Returns:
-            Parsed performance data or None if scraping failed
+            Performances found on the page or None if scraping failed
+
+        Raises:
+            PageNotModified: If the page has not changed since the last stored scrape
+            PageNotFound: If the page does not exist
         """
-        html_content = await self.scrape_repertoire()
+        with metrics.time_phase(self.theater_name, "fetch"):
+            html_content = await self.fetch_page(url)
         if not html_content:
-            self.logger.warning(
-                f"Failed to retrieve HTML content for {self.theater_name}"
-            )
+            self.logger.warning(f"Failed to retrieve HTML content from {url}")
             return None
 
         try:
-            return await self.parse_repertoire(html_content)
+            performances = await self.parse_repertoire(html_content)
+            if snapshot := self.snapshots.get(url):
+                snapshot.parsed_count = len(performances)
+            return performances
         except ValueError as e:
-            self.logger.error(f"Error parsing {self.theater_name} content: {e}")
+            self.logger.error(f"Error parsing {url}: {e}")
             return None
         except Exception as e:
-            self.logger.exception(
-                f"Unexpected error while parsing {self.theater_name} content: {e}"
-            )
+            self.logger.exception(f"Unexpected error while parsing {url}: {e}")
             return None
+
+    async def stream_performances(
+        self,
+    ) -> AsyncIterator[tuple[str, list[ScrapedPerformance] | None]]:
+        """
+        Fetch and parse all repertoire pages concurrently, yielding the
+        performances of each page as soon as it is parsed.
+        Pages that have not changed since the last stored scrape or do not
+        exist are skipped.
+
+        Yields:
+            Tuples of (page URL, performances found on the page),
+            performances are None if scraping the page failed
+        """
+        tasks = {
+            asyncio.create_task(self.scrape_page(url)): url
+            for url in self.get_page_urls()
+        }
+        try:
+            async for task in asyncio.as_completed(tasks):
+                url = tasks[task]
+                try:
+                    performances = task.result()
+                except PageNotModified:
+                    self.logger.info(f"Page {url} not modified")
+                    continue
+                except PageNotFound:
+                    self.logger.info(f"Page {url} not found")
+                    continue
+                yield url, performances
+        finally:
+            for task in tasks:
+                task.cancel()
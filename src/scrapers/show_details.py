@@ -0,0 +1,151 @@
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin
+
+import httpx
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from ..config import settings
+from ..db import engine
+from ..models import ParsedPerformance, ShowDetails
+from ..services.show_details_service import ShowDetailsService
+
+if TYPE_CHECKING:
+    from .scraper import Scraper
+
+logger = logging.getLogger(__name__)
+
+
+class ShowDetailsFetcher:
+    """
+    Fills in details missing from repertoire pages, such as directors, from
+    the pages of the shows performances link to.
+
+    A show is performed on many dates, so its page is fetched at most once
+    per TTL: fetched details are kept in the database, concurrent lookups of
+    a show share a single request, and at most `concurrency` show pages are
+    fetched at once. Create one fetcher per scrape run.
+    """
+
+    def __init__(
+        self,
+        bind: Engine = engine,
+        ttl: float = settings.SHOW_DETAILS_TTL,
+        concurrency: int = settings.SHOW_DETAILS_CONCURRENCY,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            bind: Engine storing show details
+            ttl: Seconds fetched show details are reused
+            concurrency: Maximum number of show pages fetched at once
+        """
+        self.bind = bind
+        self.ttl = ttl
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: dict[str, asyncio.Task[ShowDetails | None]] = {}
+
+    async def enrich(
+        self, scraper: "Scraper", performances: list[ParsedPerformance]
+    ) -> None:
+        """
+        Fill in authors and directors of performances from their show pages.
+        Performances without a show page or whose page failed are left as is.
+
+        Args:
+            scraper: Scraper that found the performances, used to fetch and
+                parse show pages
+            performances: Parsed performances, updated in place
+        """
+        for performance in performances:
+            if performance.url:
+                performance.url = urljoin(scraper.repertoire_url, performance.url)
+        urls = list(dict.fromkeys(p.url for p in performances if p.url))
+        if not urls:
+            return
+
+        details = await self.get_details(scraper, urls)
+        for performance in performances:
+            if show := details.get(performance.url):
+                performance.author = show.author or performance.author
+                performance.director = show.director or performance.director
+
+    async def get_details(
+        self, scraper: "Scraper", urls: list[str]
+    ) -> dict[str, ShowDetails]:
+        """
+        Get details of shows, fetching pages without fresh stored details.
+        Newly fetched details are stored for later runs.
+
+        Args:
+            scraper: Scraper of the shows' theater
+            urls: Absolute show page URLs
+
+        Returns:
+            Mapping of show page URL to its details, without failed pages
+        """
+        fetched_after = datetime.datetime.now() - datetime.timedelta(seconds=self.ttl)
+        with Session(self.bind) as session:
+            details = ShowDetailsService().get_fresh(
+                session, scraper.theater_name, urls, fetched_after
+            )
+
+        missing = [url for url in urls if url not in details]
+        started = {}
+        for url in missing:
+            if url not in self._tasks:
+                task = asyncio.create_task(self.fetch(scraper, url))
+                self._tasks[url] = started[url] = task
+        # Shielded, so a cancelled page does not cancel fetches other pages await
+        results = await asyncio.gather(
+            *(asyncio.shield(self._tasks[url]) for url in missing)
+        )
+        details.update((show.url, show) for show in results if show is not None)
+
+        if fetched := [details[url] for url in started if url in details]:
+            with Session(self.bind) as session:
+                ShowDetailsService().save_many(session, fetched)
+                session.commit()
+        return details
+
+    async def fetch(self, scraper: "Scraper", url: str) -> ShowDetails | None:
+        """
+        Fetch and parse a show page.
+
+        Args:
+            scraper: Scraper of the show's theater
+            url: Absolute show page URL
+
+        Returns:
+            Details of the show, None if the page could not be fetched or parsed
+        """
+        try:
+            async with self._semaphore:
+                html_content = await scraper.fetch_show_page(url)
+            parsed = await scraper.run_parser(scraper.parse_show_page, html_content)
+        except (httpx.HTTPError, ValueError) as e:
+            scraper.logger.error(f"Error fetching show details from {url}: {e}")
+            return None
+
+        return ShowDetails(
+            theater_name=scraper.theater_name,
+            url=url,
+            author=parsed.author,
+            director=parsed.director,
+            duration=parsed.duration,
+            fetched_at=datetime.datetime.now(),
+        )
+
+    def cancel(self) -> None:
+        """
+        Cancel unfinished fetches, e.g. of scrapers that timed out, and forget
+        all fetches at the end of a run, so failed pages are fetched again
+        by later runs.
+        """
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
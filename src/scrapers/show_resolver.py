@@ -0,0 +1,59 @@
+import logging
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from ..db import engine
+from ..services.show_service import ShowService
+from .stage_resolver import _theater_key
+
+logger = logging.getLogger(__name__)
+
+
+class ShowResolver:
+    """
+    In-memory (theater name, title) -> show ID lookup shared by scrapers.
+
+    All shows are loaded with a single query at the start of a scrape run,
+    so storing a page does not look titles up. Shows of new titles are
+    created by the sync storing their performances and loaded on the next run.
+    """
+
+    def __init__(self, bind: Engine = engine):
+        """
+        Initialize the resolver.
+
+        Args:
+            bind: Engine used to load shows
+        """
+        self.bind = bind
+        self._show_ids: dict[str, dict[str, int]] = {}
+
+    def load(self) -> None:
+        """
+        (Re)load all show IDs from the database in a single query.
+        Call this at the start of a scrape run.
+        """
+        with Session(self.bind) as session:
+            rows = ShowService().get_show_ids_by_theater(session)
+
+        self._show_ids = {}
+        for theater_name, title, show_id in rows:
+            self._show_ids.setdefault(_theater_key(theater_name), {})[title] = show_id
+        logger.debug(f"Loaded {len(rows)} shows")
+
+    def get_show_ids(self, theater_name: str) -> dict[str, int]:
+        """
+        Get the known show IDs of a theater.
+
+        Args:
+            theater_name: Name identifier of the theater
+
+        Returns:
+            Mapping of title to show ID, empty until shows are loaded
+        """
+        return self._show_ids.get(_theater_key(theater_name), {})
+
+
+# Process-wide resolver shared by all scrapers
+show_resolver = ShowResolver()
@@ -0,0 +1,104 @@
+import logging
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from ..db import engine
+from ..services.stage_service import StageService
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_stage_name(name: str) -> str:
+    """
+    Normalize a stage name for lookups.
+
+    Collapses whitespace, lowercases the name and folds "ё" into "е", so
+    "Старая сцена, Зелёный зал " and "старая сцена,  зеленый зал" match.
+
+    Args:
+        name: Stage name as found on a website or in the database
+
+    Returns:
+        Normalized stage name
+    """
+    return " ".join(name.split()).lower().replace("ё", "е")
+
+
+def _theater_key(theater_name: str) -> str:
+    """Get plain string key for a theater name or TheaterName member."""
+    return getattr(theater_name, "value", theater_name)
+
+
+class StageResolver:
+    """
+    In-memory (theater name, stage name) -> stage ID lookup shared by scrapers.
+
+    All stages are loaded with a single query at the start of a scrape run;
+    the cache is reloaded only when a stage cannot be found.
+    """
+
+    def __init__(self, bind: Engine = engine):
+        """
+        Initialize the resolver.
+
+        Args:
+            bind: Engine used to load stages
+        """
+        self.bind = bind
+        self._stage_ids: dict[tuple[str, str], int] = {}
+        self._missing: set[tuple[str, str]] = set()
+        self._loaded = False
+
+    def load(self) -> None:
+        """
+        (Re)load all stage IDs and forget previously missing stages.
+        Call this at the start of a scrape run.
+        """
+        self._missing.clear()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Load all stage IDs from the database in a single query."""
+        with Session(self.bind) as session:
+            rows = StageService().get_stage_ids_by_theater(session)
+
+        self._stage_ids = {
+            (_theater_key(theater_name), normalize_stage_name(stage_name)): stage_id
+            for theater_name, stage_name, stage_id in rows
+        }
+        self._loaded = True
+        logger.debug(f"Loaded {len(self._stage_ids)} stages")
+
+    def resolve(self, theater_name: str, stage_name: str) -> int | None:
+        """
+        Get stage ID by theater and stage name.
+
+        Reloads the cache once per unknown stage, so stages added after the
+        cache was loaded are still found without a query per event.
+
+        Args:
+            theater_name: Name identifier of the theater
+            stage_name: Stage name as found on the theater's website
+
+        Returns:
+            Stage ID if found, None otherwise
+        """
+        key = (_theater_key(theater_name), normalize_stage_name(stage_name))
+
+        if not self._loaded:
+            self._refresh()
+
+        stage_id = self._stage_ids.get(key)
+        if stage_id is None and key not in self._missing:
+            self._refresh()
+            stage_id = self._stage_ids.get(key)
+            if stage_id is None:
+                self._missing.add(key)
+                logger.warning(f"Unknown stage {stage_name!r} for {theater_name}")
+
+        return stage_id
+
+
+# Process-wide resolver shared by all scrapers
+stage_resolver = StageResolver()
@@ -0,0 +1,183 @@
+import csv
+import datetime
+import importlib.util
+import io
+import json
+from collections.abc import Sequence
+from enum import Enum
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import Row
+
+from .config import settings
+
+# orjson is optional, it serializes several times faster than json
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+
+# Default response class of the API, ORJSONResponse with the "orjson" extra
+FastJSONResponse = ORJSONResponse if HAS_ORJSON else JSONResponse
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "ics": "text/calendar; charset=utf-8",
+    "sse": "text/event-stream",
+}
+
+# Content lines longer than this many octets are folded (RFC 5545, 3.1)
+ICALENDAR_LINE_LENGTH = 75
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert a value to one that JSON and CSV writers support."""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+if HAS_ORJSON:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        """Serialize a value to compact JSON."""
+        return orjson.dumps(value, default=_to_plain)
+
+else:
+
+    def dumps(value: Any) -> bytes:
+        """Serialize a value to compact JSON."""
+        return json.dumps(
+            value, default=_to_plain, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON, one object per row.
+
+    Args:
+        rows: Rows with named columns
+
+    Returns:
+        Encoded rows, each ending with a newline
+    """
+    return b"".join(dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[Row], header: Sequence[str] | None = None) -> bytes:
+    """
+    Encode rows as CSV.
+
+    Args:
+        rows: Rows to encode
+        header: Column names to write before the rows
+
+    Returns:
+        Encoded rows
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows([_to_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _escape_ical(value: str) -> str:
+    """Escape an iCalendar TEXT value."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _format_ical_datetime(value: datetime.datetime) -> str:
+    """Format a local date of `settings.CALENDAR_TIMEZONE` as UTC."""
+    value = value.replace(tzinfo=ZoneInfo(settings.CALENDAR_TIMEZONE))
+    return value.astimezone(datetime.UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _fold_ical_line(line: str) -> bytes:
+    """Fold a content line, without splitting UTF-8 characters."""
+    encoded = line.encode()
+    parts = []
+    # Continuation lines start with a space
+    start, length = 0, ICALENDAR_LINE_LENGTH
+    while len(encoded) - start > length:
+        end = start + length
+        while encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end])
+        start, length = end, ICALENDAR_LINE_LENGTH - 1
+    parts.append(encoded[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def encode_icalendar(name: str, rows: Sequence[Row], stamp: datetime.datetime) -> bytes:
+    """
+    Encode performance listing rows as an iCalendar feed, one event per
+    performance. Cancelled performances are kept with a cancelled status,
+    so calendar apps remove them.
+
+    Args:
+        name: Name of the calendar shown by calendar apps
+        rows: Listing rows with performance, show and stage columns
+        stamp: Local time the events were last changed
+
+    Returns:
+        Encoded feed
+    """
+    duration = datetime.timedelta(seconds=settings.CALENDAR_EVENT_DURATION)
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//theater-scraper//Performances//RU",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape_ical(name)}",
+    ]
+    for row in rows:
+        location = ", ".join(filter(None, [row.stage_name, row.stage_address]))
+        description = "\n".join(
+            f"{label}: {value}"
+            for label, value in (("Режиссёр", row.director), ("Автор", row.author))
+            if value
+        )
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:performance-{row.performance_id}@theater-scraper",
+            f"DTSTAMP:{_format_ical_datetime(stamp)}",
+            f"DTSTART:{_format_ical_datetime(row.datetime)}",
+            f"DTEND:{_format_ical_datetime(row.datetime + duration)}",
+            f"SUMMARY:{_escape_ical(row.title)}",
+            f"LOCATION:{_escape_ical(location)}",
+        ]
+        if description:
+            lines.append(f"DESCRIPTION:{_escape_ical(description)}")
+        lines.append(
+            "STATUS:CANCELLED" if row.cancelled_at is not None else "STATUS:CONFIRMED"
+        )
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return b"".join(_fold_ical_line(line) for line in lines)
+
+
+def encode_server_sent_event(event_id: int, event: str, data: Any) -> bytes:
+    """
+    Encode a Server-Sent Event with JSON data.
+
+    Args:
+        event_id: ID clients send back in `Last-Event-ID` when reconnecting
+        event: Event type
+        data: Value serialized as JSON
+
+    Returns:
+        Encoded event, ending with a blank line
+    """
+    return f"id: {event_id}\nevent: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
@@ -0,0 +1,179 @@
+import datetime
+import gzip
+import hashlib
+from collections import defaultdict
+
+from sqlalchemy import Row
+from sqlmodel import Session, delete, select
+
+from ..config import settings
+from ..models import CalendarFeed, PerformanceListing, Show, Stage, Theater
+from ..serialization import dumps, encode_icalendar
+from .service import Service
+
+# Listing columns rendered as events
+EVENT_COLUMNS = (
+    PerformanceListing.performance_id,
+    PerformanceListing.show_id,
+    PerformanceListing.stage_id,
+    PerformanceListing.title,
+    PerformanceListing.datetime,
+    PerformanceListing.director,
+    PerformanceListing.author,
+    PerformanceListing.cancelled_at,
+    PerformanceListing.stage_name,
+    PerformanceListing.stage_address,
+)
+
+
+def get_feed_key(kind: str, value: str | int) -> str:
+    """
+    Get the key of a calendar feed.
+
+    Args:
+        kind: "theater", "stage" or "show"
+        value: Name of the theater, or ID of the stage or show
+
+    Returns:
+        Feed key, e.g. "stage/1"
+    """
+    return f"{kind}/{value}"
+
+
+class CalendarService(Service[CalendarFeed]):
+    """Service for pre-rendered iCalendar feeds of theaters, stages and shows"""
+
+    def __init__(self):
+        super().__init__(CalendarFeed)
+
+    def _get_id_field(self):
+        """Override to use feed_key instead of id"""
+        return CalendarFeed.feed_key
+
+    def refresh(
+        self,
+        session: Session,
+        theater_name: str,
+        now: datetime.datetime | None = None,
+    ) -> list[CalendarFeed]:
+        """
+        Render the feeds of a theater, each of its stages and each of its
+        shows from the performance listing, with performances of the last
+        `settings.CALENDAR_PAST_DAYS` days and later. Feeds whose events did
+        not change are left alone, so their ETags stay the same.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater
+            now: Time the feeds are rendered at, current time by default
+
+        Returns:
+            Feeds rendered again, none if the theater is not stored
+        """
+        now = now or datetime.datetime.now()
+        theater = session.exec(
+            select(Theater).where(Theater.name == theater_name)
+        ).first()
+        if theater is None:
+            return []
+        stages = session.exec(
+            select(Stage).where(Stage.theater_id == theater.theater_id)
+        ).all()
+        shows = session.exec(
+            select(Show).where(Show.theater_id == theater.theater_id)
+        ).all()
+        rows = session.exec(
+            select(*EVENT_COLUMNS)
+            .where(
+                PerformanceListing.theater_name == theater_name,
+                PerformanceListing.datetime
+                >= now - datetime.timedelta(days=settings.CALENDAR_PAST_DAYS),
+            )
+            .order_by(PerformanceListing.datetime, PerformanceListing.performance_id)
+        ).all()
+
+        rows_by_stage = defaultdict(list)
+        rows_by_show = defaultdict(list)
+        for row in rows:
+            rows_by_stage[row.stage_id].append(row)
+            rows_by_show[row.show_id].append(row)
+
+        theater_title = theater.full_name or theater_name
+        feeds = {get_feed_key("theater", theater_name): (theater_title, rows)}
+        for stage in stages:
+            feeds[get_feed_key("stage", stage.stage_id)] = (
+                f"{stage.name} — {theater_title}",
+                rows_by_stage[stage.stage_id],
+            )
+        for show in shows:
+            feeds[get_feed_key("show", show.show_id)] = (
+                f"{show.title} — {theater_title}",
+                rows_by_show[show.show_id],
+            )
+
+        stored = dict(
+            session.exec(
+                select(CalendarFeed.feed_key, CalendarFeed.content_hash).where(
+                    CalendarFeed.theater_name == theater_name
+                )
+            ).all()
+        )
+        rendered = []
+        for feed_key, (name, feed_rows) in feeds.items():
+            content_hash = self.get_content_hash(name, feed_rows)
+            if stored.get(feed_key) == content_hash:
+                continue
+            body = encode_icalendar(name, feed_rows, now)
+            rendered.append(
+                CalendarFeed(
+                    feed_key=feed_key,
+                    theater_name=theater_name,
+                    content_hash=content_hash,
+                    etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                    body=body,
+                    gzip_body=gzip.compress(
+                        body, compresslevel=settings.CALENDAR_GZIP_LEVEL, mtime=0
+                    ),
+                    generated_at=now,
+                )
+            )
+
+        if stale := set(stored) - set(feeds):
+            session.execute(
+                delete(CalendarFeed).where(CalendarFeed.feed_key.in_(stale))
+            )
+        self.save_many(session, rendered)
+        return rendered
+
+    @staticmethod
+    def get_content_hash(name: str, rows: list[Row]) -> str:
+        """Get a hash of the name and events of a feed."""
+        content = dumps([name, *(row._asdict() for row in rows)])
+        return hashlib.sha256(content).hexdigest()
+
+    def save_many(self, session: Session, feeds: list[CalendarFeed]) -> None:
+        """
+        Insert or replace feeds by key.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            feeds: Rendered feeds
+        """
+        if not feeds:
+            return
+
+        insert = self._get_insert(session)
+        statement = insert(CalendarFeed).values([feed.model_dump() for feed in feeds])
+        statement = statement.on_conflict_do_update(
+            index_elements=[CalendarFeed.feed_key],
+            set_={
+                "content_hash": statement.excluded.content_hash,
+                "etag": statement.excluded.etag,
+                "body": statement.excluded.body,
+                "gzip_body": statement.excluded.gzip_body,
+                "generated_at": statement.excluded.generated_at,
+            },
+        )
+        session.execute(statement)
@@ -0,0 +1,181 @@
+import datetime
+import hashlib
+from collections import defaultdict
+from typing import Protocol
+
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from ..models import ChangeType, PerformanceChange, Show
+from .service import Service
+
+# Transaction-level advisory lock serializing change log writers on
+# PostgreSQL, so sequence numbers are committed in increasing order
+CHANGE_LOG_LOCK = int.from_bytes(
+    hashlib.sha256(b"theater-scraper:change-log").digest()[:8], "big", signed=True
+)
+
+
+class PerformanceKey(Protocol):
+    """Identity of a stored performance, e.g. a `Performance` or a row."""
+
+    performance_id: int
+    show_id: int
+    stage_id: int
+    datetime: datetime.datetime
+
+
+class ChangeService(Service[PerformanceChange]):
+    """Service for the change log of stored performances"""
+
+    def __init__(self):
+        super().__init__(PerformanceChange)
+
+    def _get_id_field(self):
+        """Override to use sequence instead of id"""
+        return PerformanceChange.sequence
+
+    def record(
+        self,
+        session: Session,
+        theater_name: str,
+        added: list[PerformanceKey],
+        removed: list[PerformanceKey],
+        now: datetime.datetime | None = None,
+    ) -> list[PerformanceChange]:
+        """
+        Append the changes of a sync to the change log.
+
+        Within every show, removed and added dates are paired in date order
+        and logged as rescheduled performances; the rest are logged as
+        inserted or removed. The caller is responsible for committing the
+        session, so changes are logged in the same transaction as the sync.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the synced theater
+            added: Inserted and restored performances
+            removed: Cancelled performances
+            now: Time of the changes, current time by default
+
+        Returns:
+            Logged changes, ordered by sequence number
+        """
+        if not added and not removed:
+            return []
+        now = now or datetime.datetime.now()
+
+        show_ids = {p.show_id for p in [*added, *removed]}
+        titles = dict(
+            session.exec(
+                select(Show.show_id, Show.title).where(Show.show_id.in_(show_ids))
+            ).all()
+        )
+        added_by_show = defaultdict(list)
+        removed_by_show = defaultdict(list)
+        for p in sorted(added, key=lambda p: p.datetime):
+            added_by_show[p.show_id].append(p)
+        for p in sorted(removed, key=lambda p: p.datetime):
+            removed_by_show[p.show_id].append(p)
+
+        changes = []
+        for show_id in show_ids:
+            show_added = added_by_show[show_id]
+            show_removed = removed_by_show[show_id]
+            rescheduled = min(len(show_added), len(show_removed))
+            entries = [
+                *(
+                    (ChangeType.rescheduled, performance, previous)
+                    for performance, previous in zip(show_added, show_removed)
+                ),
+                *((ChangeType.inserted, p, None) for p in show_added[rescheduled:]),
+                *((ChangeType.removed, p, None) for p in show_removed[rescheduled:]),
+            ]
+            changes += [
+                PerformanceChange(
+                    change_type=change_type,
+                    performance_id=performance.performance_id,
+                    previous_performance_id=previous and previous.performance_id,
+                    theater_name=theater_name,
+                    show_id=show_id,
+                    title=titles[show_id],
+                    stage_id=performance.stage_id,
+                    datetime=performance.datetime,
+                    previous_datetime=previous and previous.datetime,
+                    changed_at=now,
+                )
+                for change_type, performance, previous in entries
+            ]
+        changes.sort(key=lambda change: (change.datetime, change.performance_id))
+
+        if session.get_bind().dialect.name == "postgresql":
+            session.exec(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK)))
+        session.add_all(changes)
+        session.flush()
+        return changes
+
+    def _get_since_query(
+        self, since: int, theater_name: str | None, limit: int
+    ) -> SelectOfScalar[PerformanceChange]:
+        """Build the query for `get_since`."""
+        query = select(PerformanceChange).where(PerformanceChange.sequence > since)
+        if theater_name is not None:
+            query = query.where(PerformanceChange.theater_name == theater_name)
+        return query.order_by(PerformanceChange.sequence).limit(limit)
+
+    def get_since(
+        self,
+        session: Session,
+        since: int = 0,
+        theater_name: str | None = None,
+        limit: int = 100,
+    ) -> list[PerformanceChange]:
+        """
+        Get changes logged after a sequence number.
+
+        Args:
+            session: SQLModel database session
+            since: Last sequence number seen by the client
+            theater_name: Name of the theater to filter by
+            limit: Maximum number of changes to return
+
+        Returns:
+            Changes ordered by sequence number
+        """
+        return session.exec(self._get_since_query(since, theater_name, limit)).all()
+
+    async def aget_since(
+        self,
+        session: AsyncSession,
+        since: int = 0,
+        theater_name: str | None = None,
+        limit: int = 100,
+    ) -> list[PerformanceChange]:
+        """
+        Get changes logged after a sequence number.
+
+        Args:
+            session: SQLModel async database session
+            since: Last sequence number seen by the client
+            theater_name: Name of the theater to filter by
+            limit: Maximum number of changes to return
+
+        Returns:
+            Changes ordered by sequence number
+        """
+        query = self._get_since_query(since, theater_name, limit)
+        return (await session.exec(query)).all()
+
+    def get_last_sequence(self, session: Session) -> int:
+        """
+        Get the sequence number of the latest change.
+
+        Args:
+            session: SQLModel database session
+
+        Returns:
+            Latest sequence number, 0 if no change was logged
+        """
+        query = select(func.max(PerformanceChange.sequence))
+        return session.exec(query).one() or 0
@@ -0,0 +1,88 @@
+from collections.abc import Collection
+
+from sqlmodel import Session, delete, insert, or_, select
+
+from ..models import Performance, PerformanceListing, Show, Stage, Theater
+from .service import Service
+
+# Listing columns and the columns they are copied from
+LISTING_SOURCE = {
+    "performance_id": Performance.performance_id,
+    "show_id": Show.show_id,
+    "title": Show.title,
+    "datetime": Performance.datetime,
+    "director": Show.director,
+    "author": Show.author,
+    "cancelled_at": Performance.cancelled_at,
+    "stage_id": Stage.stage_id,
+    "stage_name": Stage.name,
+    "stage_address": Stage.address,
+    "theater_id": Theater.theater_id,
+    "theater_name": Theater.name,
+    "theater_full_name": Theater.full_name,
+    "theater_url": Theater.url,
+}
+
+
+class ListingService(Service[PerformanceListing]):
+    """Service for the denormalized performance listing"""
+
+    def __init__(self):
+        super().__init__(PerformanceListing)
+
+    def _get_id_field(self):
+        return PerformanceListing.performance_id
+
+    def refresh(
+        self,
+        session: Session,
+        theater_name: str | None = None,
+        performance_ids: Collection[int] | None = None,
+        show_ids: Collection[int] | None = None,
+    ) -> None:
+        """
+        Rebuild listing rows from their performances, shows, stages and
+        theater with a single INSERT ... SELECT. The caller is responsible
+        for committing the session, so the listing changes in the same
+        transaction as the performances.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater to refresh, all theaters by default
+            performance_ids: IDs of the only performances to refresh, e.g.
+                the ones changed by a sync
+            show_ids: IDs of shows whose performances are all refreshed, e.g.
+                shows with a changed director
+        """
+        source = (
+            select(*LISTING_SOURCE.values())
+            .join(Performance.show)
+            .join(Performance.stage)
+            .join(Stage.theater)
+        )
+        stale = delete(PerformanceListing)
+        if theater_name is not None:
+            source = source.where(Theater.name == theater_name)
+            stale = stale.where(PerformanceListing.theater_name == theater_name)
+        if performance_ids is not None or show_ids is not None:
+            performance_ids = list(performance_ids or [])
+            show_ids = list(show_ids or [])
+            if not performance_ids and not show_ids:
+                return
+            source = source.where(
+                or_(
+                    Performance.performance_id.in_(performance_ids),
+                    Performance.show_id.in_(show_ids),
+                )
+            )
+            stale = stale.where(
+                or_(
+                    PerformanceListing.performance_id.in_(performance_ids),
+                    PerformanceListing.show_id.in_(show_ids),
+                )
+            )
+
+        session.execute(stale)
+        session.execute(
+            insert(PerformanceListing).from_select(list(LISTING_SOURCE), source)
+        )
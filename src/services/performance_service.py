@@ -1,8 +1,17 @@
-from sqlalchemy.orm import joinedload
-from sqlmodel import Session, select
+import base64
+import binascii
+import datetime
+from collections.abc import AsyncIterator, Sequence
+from itertools import batched
+
+from sqlalchemy import Row, Select
+from sqlmodel import Session, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 from ..models import (
     Performance,
+    PerformanceListing,
     PerformanceResponse,
     Stage,
     StageResponse,
@@ -11,6 +20,47 @@ from ..models import (
 )
 from .service import Service
 
+# Columns identifying a performance, covered by a unique index
+PERFORMANCE_KEY = (Performance.show_id, Performance.stage_id, Performance.datetime)
+
+# Listing order, covered by an index and used as the pagination key
+PERFORMANCE_ORDER = (PerformanceListing.datetime, PerformanceListing.performance_id)
+
+
+def encode_cursor(performance: PerformanceResponse) -> str:
+    """
+    Encode the pagination cursor pointing after a performance.
+
+    Args:
+        performance: Last performance of a page
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    value = f"{performance.datetime.isoformat()}|{performance.performance_id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """
+    Decode a pagination cursor.
+
+    Args:
+        cursor: Cursor returned by `encode_cursor`
+
+    Returns:
+        Tuple of (datetime, performance_id) of the last performance of a page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+        datetime_value, performance_id = value.split("|")
+        return datetime.datetime.fromisoformat(datetime_value), int(performance_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
 
 class PerformanceService(Service[Performance]):
     """Service for handling performance-related database operations"""
@@ -22,6 +72,17 @@ class PerformanceService(Service[Performance]):
         """Override to use performance_id instead of id"""
         return Performance.performance_id
 
+    def _get_by_theater_name_query(
+        self, theater_name: str
+    ) -> SelectOfScalar[Performance]:
+        """Build the query for `get_by_theater_name`."""
+        return (
+            select(Performance)
+            .join(Performance.stage)
+            .join(Stage.theater)
+            .where(Theater.name == theater_name)
+        )
+
     def get_by_theater_name(
         self,
         session: Session,
@@ -37,42 +98,159 @@ class PerformanceService(Service[Performance]):
         Returns:
             List of objects matching the theater name
         """
-        query = (
-            select(Performance)
-            .join(Performance.stage)
-            .join(Stage.theater)
-            .where(Theater.name == theater_name)
-        )
-        return session.exec(query).all()
+        return session.exec(self._get_by_theater_name_query(theater_name)).all()
+
+    async def aget_by_theater_name(
+        self,
+        session: AsyncSession,
+        theater_name: str,
+    ) -> list[Performance]:
+        """
+        Get objects filtered by theater name.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+
+        Returns:
+            List of objects matching the theater name
+        """
+        query = self._get_by_theater_name_query(theater_name)
+        return (await session.exec(query)).all()
+
+    def insert_many(
+        self,
+        session: Session,
+        performances: list[Performance],
+        batch_size: int = 500,
+    ) -> list[Row]:
+        """
+        Insert performances in batches, skipping existing ones with
+        `INSERT ... ON CONFLICT DO NOTHING`.
+
+        Duplicates are detected by the unique (show_id, stage_id, datetime)
+        index, so concurrent writers cannot insert the same performance twice.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            performances: Performances to store
+            batch_size: Maximum number of performances per statement
+
+        Returns:
+            IDs and keys of inserted performances
+        """
+        insert = self._get_insert(session)
+
+        # Deduplicate by key
+        rows = {}
+        for performance in performances:
+            row = performance.model_dump(include={"show_id", "stage_id", "datetime"})
+            rows[(row["show_id"], row["stage_id"], row["datetime"])] = row
+
+        inserted = []
+        for batch in batched(rows.values(), batch_size):
+            statement = (
+                insert(Performance)
+                .values(list(batch))
+                .on_conflict_do_nothing(index_elements=PERFORMANCE_KEY)
+                .returning(Performance.performance_id, *PERFORMANCE_KEY)
+            )
+            inserted += session.execute(statement).all()
+
+        return inserted
 
 
 class PerformanceResponseService:
-    """Service for handling performance responses with related data"""
+    """
+    Service for handling performance responses with related data.
+    Reads plain rows from the denormalized performance listing.
+    """
 
-    def _create_performance_response(
-        self, performance: Performance
-    ) -> PerformanceResponse:
+    def _create_performance_response(self, row: Row) -> PerformanceResponse:
         """
-        Convert a Performance object to a PerformanceResponse with related data.
+        Convert a listing row to a PerformanceResponse with related data.
         """
         return PerformanceResponse(
-            performance_id=performance.performance_id,
-            title=performance.title,
-            datetime=performance.datetime,
-            director=performance.director,
-            author=performance.author,
+            performance_id=row.performance_id,
+            title=row.title,
+            datetime=row.datetime,
+            director=row.director,
+            author=row.author,
+            cancelled_at=row.cancelled_at,
             stage=StageResponse(
-                stage_id=performance.stage.stage_id,
-                name=performance.stage.name,
-                address=performance.stage.address,
+                stage_id=row.stage_id,
+                name=row.stage_name,
+                address=row.stage_address,
             ),
             theater=TheaterResponse(
-                theater_id=performance.stage.theater.theater_id,
-                full_name=performance.stage.theater.full_name,
-                url=performance.stage.theater.url,
+                theater_id=row.theater_id,
+                full_name=row.theater_full_name,
+                url=row.theater_url,
             ),
         )
 
+    def _select_rows(self) -> Select:
+        """Select listing columns as plain rows, bypassing the ORM."""
+        return select(*PerformanceListing.__table__.columns)
+
+    def _get_by_id_query(self, performance_id: int) -> Select:
+        """Build the query for `get_by_id`."""
+        return self._select_rows().where(
+            PerformanceListing.performance_id == performance_id
+        )
+
+    def _get_all_query(self, skip: int, limit: int) -> Select:
+        """Build the query for `get_all`."""
+        return (
+            self._select_rows()
+            .where(PerformanceListing.cancelled_at.is_(None))
+            .offset(skip)
+            .limit(limit)
+        )
+
+    def _get_by_theater_name_query(self, theater_name: str) -> Select:
+        """Build the query for `get_by_theater_name`."""
+        return (
+            self._select_rows()
+            .where(PerformanceListing.theater_name == theater_name)
+            .where(PerformanceListing.cancelled_at.is_(None))
+        )
+
+    def _get_filtered_query(
+        self,
+        theater_name: str | None,
+        stage_id: int | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+    ) -> Select:
+        """Build a query of performances, except cancelled ones, in listing order."""
+        query = self._select_rows().where(PerformanceListing.cancelled_at.is_(None))
+        if theater_name is not None:
+            query = query.where(PerformanceListing.theater_name == theater_name)
+        if stage_id is not None:
+            query = query.where(PerformanceListing.stage_id == stage_id)
+        if date_from is not None:
+            query = query.where(PerformanceListing.datetime >= date_from)
+        if date_to is not None:
+            query = query.where(PerformanceListing.datetime < date_to)
+        return query.order_by(*PERFORMANCE_ORDER)
+
+    def _get_page_query(
+        self,
+        theater_name: str | None,
+        stage_id: int | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+        cursor: str | None,
+        limit: int,
+    ) -> Select:
+        """Build the query for `get_page`."""
+        query = self._get_filtered_query(theater_name, stage_id, date_from, date_to)
+        if cursor is not None:
+            query = query.where(tuple_(*PERFORMANCE_ORDER) > decode_cursor(cursor))
+        return query.limit(limit)
+
     def get_by_id(
         self,
         session: Session,
@@ -88,12 +266,30 @@ class PerformanceResponseService:
         Returns:
             Performance response with related data or None if not found
         """
-        query = (
-            select(Performance)
-            .options(joinedload(Performance.stage).joinedload(Stage.theater))
-            .where(Performance.performance_id == performance_id)
-        )
-        result = session.exec(query).first()
+        result = session.exec(self._get_by_id_query(performance_id)).first()
+
+        if not result:
+            return None
+
+        return self._create_performance_response(result)
+
+    async def aget_by_id(
+        self,
+        session: AsyncSession,
+        performance_id: int,
+    ) -> PerformanceResponse | None:
+        """
+        Get a performance by ID with stage and theater data.
+
+        Args:
+            session: SQLModel async database session
+            performance_id: ID of the performance to retrieve
+
+        Returns:
+            Performance response with related data or None if not found
+        """
+        query = self._get_by_id_query(performance_id)
+        result = (await session.exec(query)).first()
 
         if not result:
             return None
@@ -104,7 +300,7 @@ class PerformanceResponseService:
         self, session: Session, skip: int = 0, limit: int = 100
     ) -> list[PerformanceResponse]:
         """
-        Get all performances with stage and theater data.
+        Get all performances with stage and theater data, except cancelled ones.
 
         Args:
             session: SQLModel database session
@@ -114,23 +310,141 @@ class PerformanceResponseService:
         Returns:
             List of performance responses with related data
         """
-        query = (
-            select(Performance)
-            .options(joinedload(Performance.stage).joinedload(Stage.theater))
-            .offset(skip)
-            .limit(limit)
+        results = session.exec(self._get_all_query(skip, limit)).all()
+
+        return [self._create_performance_response(perf) for perf in results]
+
+    async def aget_all(
+        self, session: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> list[PerformanceResponse]:
+        """
+        Get all performances with stage and theater data, except cancelled ones.
+
+        Args:
+            session: SQLModel async database session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List of performance responses with related data
+        """
+        results = (await session.exec(self._get_all_query(skip, limit))).all()
+
+        return [self._create_performance_response(perf) for perf in results]
+
+    def get_page(
+        self,
+        session: Session,
+        theater_name: str | None = None,
+        stage_id: int | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> list[PerformanceResponse]:
+        """
+        Get a page of performances with stage and theater data, except
+        cancelled ones, optionally filtered by theater, stage and dates.
+        Uses keyset pagination on (datetime, performance_id), so every page is
+        an index range scan regardless of how many performances are stored.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater to filter by
+            stage_id: ID of the stage to filter by
+            date_from: Earliest performance datetime, inclusive
+            date_to: Latest performance datetime, exclusive
+            cursor: Cursor of the previous page, first page if not provided
+            limit: Maximum number of records to return
+
+        Returns:
+            List of performance responses ordered by datetime
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._get_page_query(
+            theater_name, stage_id, date_from, date_to, cursor, limit
         )
         results = session.exec(query).all()
 
         return [self._create_performance_response(perf) for perf in results]
 
+    async def aget_page(
+        self,
+        session: AsyncSession,
+        theater_name: str | None = None,
+        stage_id: int | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> list[PerformanceResponse]:
+        """
+        Get a page of performances with stage and theater data, except
+        cancelled ones, optionally filtered by theater, stage and dates.
+        Uses keyset pagination on (datetime, performance_id), so every page is
+        an index range scan regardless of how many performances are stored.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+            stage_id: ID of the stage to filter by
+            date_from: Earliest performance datetime, inclusive
+            date_to: Latest performance datetime, exclusive
+            cursor: Cursor of the previous page, first page if not provided
+            limit: Maximum number of records to return
+
+        Returns:
+            List of performance responses ordered by datetime
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._get_page_query(
+            theater_name, stage_id, date_from, date_to, cursor, limit
+        )
+        results = (await session.exec(query)).all()
+
+        return [self._create_performance_response(perf) for perf in results]
+
+    async def astream_rows(
+        self,
+        session: AsyncSession,
+        theater_name: str | None = None,
+        stage_id: int | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream all performances, except cancelled ones, as plain listing rows
+        from a server-side cursor, so memory use does not depend on their number.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+            stage_id: ID of the stage to filter by
+            date_from: Earliest performance datetime, inclusive
+            date_to: Latest performance datetime, exclusive
+            batch_size: Number of rows fetched at once
+
+        Yields:
+            Batches of rows ordered by datetime
+        """
+        query = self._get_filtered_query(theater_name, stage_id, date_from, date_to)
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
     def get_by_theater_name(
         self,
         session: Session,
         theater_name: str,
     ) -> list[PerformanceResponse]:
         """
-        Get performances by theater name with stage and theater data.
+        Get performances by theater name with stage and theater data,
+        except cancelled ones.
 
         Args:
             session: SQLModel database session
@@ -139,13 +453,27 @@ class PerformanceResponseService:
         Returns:
             List of performance responses matching the theater name
         """
-        query = (
-            select(Performance)
-            .options(joinedload(Performance.stage).joinedload(Stage.theater))
-            .join(Performance.stage)
-            .join(Stage.theater)
-            .where(Theater.name == theater_name)
-        )
-        results = session.exec(query).all()
+        results = session.exec(self._get_by_theater_name_query(theater_name)).all()
+
+        return [self._create_performance_response(perf) for perf in results]
+
+    async def aget_by_theater_name(
+        self,
+        session: AsyncSession,
+        theater_name: str,
+    ) -> list[PerformanceResponse]:
+        """
+        Get performances by theater name with stage and theater data,
+        except cancelled ones.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+
+        Returns:
+            List of performance responses matching the theater name
+        """
+        query = self._get_by_theater_name_query(theater_name)
+        results = (await session.exec(query)).all()
 
         return [self._create_performance_response(perf) for perf in results]
@@ -0,0 +1,31 @@
+from sqlmodel import Session
+
+from ..models import ScrapeSchedule
+from .service import Service
+
+
+class ScheduleService(Service[ScrapeSchedule]):
+    """Service for handling scrape schedule state"""
+
+    def __init__(self):
+        super().__init__(ScrapeSchedule)
+
+    def _get_id_field(self):
+        """Override to use theater_name instead of id"""
+        return ScrapeSchedule.theater_name
+
+    def save(self, session: Session, schedule: ScrapeSchedule) -> ScrapeSchedule:
+        """
+        Insert or update schedule state of a theater and commit it.
+
+        Args:
+            session: SQLModel database session
+            schedule: Schedule state to save
+
+        Returns:
+            Saved schedule state
+        """
+        schedule = session.merge(schedule)
+        session.commit()
+        session.refresh(schedule)
+        return schedule
@@ -0,0 +1,250 @@
+import datetime
+import re
+
+from sqlalchemy import Row, Select
+from sqlmodel import Session, case, func, literal, or_, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import (
+    FOLDED_TITLE,
+    TITLE_TSVECTOR,
+    PerformanceListing,
+    PerformanceResponse,
+)
+from .performance_service import PERFORMANCE_ORDER, PerformanceResponseService
+
+# Default threshold of pg_trgm's word similarity operator, used by the fallback
+SIMILARITY_THRESHOLD = 0.6
+
+WORD = re.compile(r"\w+")
+
+# Common Russian inflectional endings, longest first, stripped by the fallback
+# in place of full-text stemming
+ENDINGS = (
+    "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "иях", "ах", "ях",
+    "ой", "ей", "ая", "яя", "ое", "ее", "ые", "ие", "ый", "ий", "ую", "юю",
+    "ом", "ем", "ов", "ев", "а", "я", "ы", "и", "у", "ю", "е", "о", "ь",
+)  # fmt: skip
+
+
+def fold(value: str) -> str:
+    """Fold text for search: lower case with "ё" read as "е"."""
+    return value.lower().replace("ё", "е")
+
+
+def _stem(word: str) -> str:
+    """Strip a common inflectional ending, keeping at least three letters."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[: -len(ending)]
+    return word
+
+
+def _get_words(value: str) -> list[str]:
+    """Split text into folded and stemmed words."""
+    return [_stem(word) for word in WORD.findall(fold(value))]
+
+
+def _get_trigrams(words: list[str]) -> set[str]:
+    """Get trigrams of words padded like pg_trgm does."""
+    trigrams = set()
+    for word in words:
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def word_similarity(query: str, value: str) -> float:
+    """
+    Pure-Python counterpart of pg_trgm's `word_similarity` with stemming:
+    the greatest share of the query's trigrams found in a run of as many
+    words of the value as the query has.
+
+    Args:
+        query: Search query
+        value: Searched text, e.g. a title
+
+    Returns:
+        Similarity from 0 to 1
+    """
+    query_words = _get_words(query)
+    value_words = _get_words(value)
+    query_trigrams = _get_trigrams(query_words)
+    if not query_trigrams:
+        return 0.0
+
+    best = 0
+    for start in range(max(len(value_words) - len(query_words), 0) + 1):
+        trigrams = _get_trigrams(value_words[start : start + len(query_words)])
+        best = max(best, len(query_trigrams & trigrams))
+    return best / len(query_trigrams)
+
+
+class SearchService:
+    """
+    Service for searching performances by title, ranked by relevance.
+
+    PostgreSQL uses the trigram and full-text indexes of the listing, other
+    databases rank distinct titles in Python.
+    """
+
+    def _get_filtered_query(
+        self,
+        theater_name: str | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+    ) -> Select:
+        """Build a query of performances, except cancelled ones, without order."""
+        return (
+            PerformanceResponseService()
+            ._get_filtered_query(theater_name, None, date_from, date_to)
+            .order_by(None)
+        )
+
+    def _get_postgresql_query(
+        self,
+        query: str,
+        theater_name: str | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+        skip: int,
+        limit: int,
+    ) -> Select:
+        """Build a search query using the trigram and full-text indexes."""
+        folded = fold(query)
+        tsquery = func.plainto_tsquery(text("'russian'"), folded)
+        score = func.greatest(
+            func.word_similarity(folded, FOLDED_TITLE),
+            func.ts_rank(TITLE_TSVECTOR, tsquery),
+        )
+        return (
+            self._get_filtered_query(theater_name, date_from, date_to)
+            .where(
+                or_(
+                    literal(folded).op("<%")(FOLDED_TITLE),
+                    TITLE_TSVECTOR.bool_op("@@")(tsquery),
+                )
+            )
+            .order_by(score.desc(), *PERFORMANCE_ORDER)
+            .offset(skip)
+            .limit(limit)
+        )
+
+    def _get_titles_query(
+        self,
+        theater_name: str | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+    ) -> Select:
+        """Build the query of distinct titles ranked by the fallback."""
+        return (
+            self._get_filtered_query(theater_name, date_from, date_to)
+            .with_only_columns(PerformanceListing.title)
+            .distinct()
+        )
+
+    def _rank_titles(self, query: str, titles: list[str]) -> dict[str, float]:
+        """Score titles similar to the query."""
+        scores = {title: word_similarity(query, title) for title in titles}
+        return {
+            title: score
+            for title, score in scores.items()
+            if score >= SIMILARITY_THRESHOLD
+        }
+
+    def _get_fallback_query(
+        self,
+        scores: dict[str, float],
+        theater_name: str | None,
+        date_from: datetime.datetime | None,
+        date_to: datetime.datetime | None,
+        skip: int,
+        limit: int,
+    ) -> Select:
+        """Build a search query of performances with titles ranked in Python."""
+        score = case(scores, value=PerformanceListing.title, else_=0.0)
+        return (
+            self._get_filtered_query(theater_name, date_from, date_to)
+            .where(PerformanceListing.title.in_(scores))
+            .order_by(score.desc(), *PERFORMANCE_ORDER)
+            .offset(skip)
+            .limit(limit)
+        )
+
+    def _create_responses(self, rows: list[Row]) -> list[PerformanceResponse]:
+        service = PerformanceResponseService()
+        return [service._create_performance_response(row) for row in rows]
+
+    def search(
+        self,
+        session: Session,
+        query: str,
+        theater_name: str | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> list[PerformanceResponse]:
+        """
+        Search performances, except cancelled ones, by title. Misspelled
+        titles and other forms of their words match as well.
+
+        Args:
+            session: SQLModel database session
+            query: Search query
+            theater_name: Name of the theater to search in
+            date_from: Earliest datetime of performances
+            date_to: Datetime performances are before
+            skip: Number of results to skip
+            limit: Maximum number of results to return
+
+        Returns:
+            Performances ordered by relevance, then by datetime
+        """
+        filters = (theater_name, date_from, date_to)
+        if session.get_bind().dialect.name == "postgresql":
+            statement = self._get_postgresql_query(query, *filters, skip, limit)
+        else:
+            titles = session.exec(self._get_titles_query(*filters)).scalars().all()
+            scores = self._rank_titles(query, titles)
+            if not scores:
+                return []
+            statement = self._get_fallback_query(scores, *filters, skip, limit)
+        return self._create_responses(session.exec(statement).all())
+
+    async def asearch(
+        self,
+        session: AsyncSession,
+        query: str,
+        theater_name: str | None = None,
+        date_from: datetime.datetime | None = None,
+        date_to: datetime.datetime | None = None,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> list[PerformanceResponse]:
+        """
+        Search performances, except cancelled ones, by title. Misspelled
+        titles and other forms of their words match as well.
+
+        Args:
+            session: SQLModel async database session
+            query: Search query
+            theater_name: Name of the theater to search in
+            date_from: Earliest datetime of performances
+            date_to: Datetime performances are before
+            skip: Number of results to skip
+            limit: Maximum number of results to return
+
+        Returns:
+            Performances ordered by relevance, then by datetime
+        """
+        filters = (theater_name, date_from, date_to)
+        if session.get_bind().dialect.name == "postgresql":
+            statement = self._get_postgresql_query(query, *filters, skip, limit)
+        else:
+            result = await session.exec(self._get_titles_query(*filters))
+            scores = self._rank_titles(query, result.scalars().all())
+            if not scores:
+                return []
+            statement = self._get_fallback_query(scores, *filters, skip, limit)
+        return self._create_responses((await session.exec(statement)).all())
@@ -1,16 +1,26 @@
 from typing import Generic, Type, TypeVar
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 from ..models import Stage, Theater, TheaterName
 
 # Create a generic type variable bound to SQLModel
 T = TypeVar("T", bound=SQLModel)
 
+# Dialect-specific INSERT constructs supporting ON CONFLICT
+INSERT_BY_DIALECT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class Service(Generic[T]):
     """
     Generic base service class providing common database operations.
+    Query methods come in pairs: `get_*` for a Session and `aget_*` for an AsyncSession.
     """
 
     def __init__(self, model_class: Type[T]):
@@ -29,6 +39,29 @@ class Service(Generic[T]):
         """
         return getattr(self.model_class, "id", None)
 
+    def _get_insert(self, session: Session):
+        """
+        Get the INSERT construct supporting ON CONFLICT for the session's database.
+
+        Raises:
+            NotImplementedError: If the database does not support upserts
+        """
+        dialect = session.get_bind().dialect.name
+        insert = INSERT_BY_DIALECT.get(dialect)
+        if insert is None:
+            raise NotImplementedError(f"Upsert is not supported for {dialect}")
+        return insert
+
+    def _get_by_id_query(self, id_value: int) -> SelectOfScalar[T]:
+        """Build the query for `get_by_id`."""
+        # Try to use "id" as the default ID column, but allow subclasses to override
+        id_field = self._get_id_field()
+        return select(self.model_class).where(id_field == id_value)
+
+    def _get_all_query(self, skip: int, limit: int) -> SelectOfScalar[T]:
+        """Build the query for `get_all`."""
+        return select(self.model_class).offset(skip).limit(limit)
+
     def get_by_id(self, session: Session, id_value: int) -> T | None:
         """
         Get an object by its ID.
@@ -40,10 +73,20 @@ class Service(Generic[T]):
         Returns:
             The object if found, None otherwise
         """
-        # Try to use "id" as the default ID column, but allow subclasses to override
-        id_field = self._get_id_field()
-        query = select(self.model_class).where(id_field == id_value)
-        return session.exec(query).first()
+        return session.exec(self._get_by_id_query(id_value)).first()
+
+    async def aget_by_id(self, session: AsyncSession, id_value: int) -> T | None:
+        """
+        Get an object by its ID.
+
+        Args:
+            session: SQLModel async database session
+            id_value: Primary key value to look up
+
+        Returns:
+            The object if found, None otherwise
+        """
+        return (await session.exec(self._get_by_id_query(id_value))).first()
 
     def get_all(self, session: Session, skip: int = 0, limit: int = 100) -> list[T]:
         """
@@ -57,5 +100,20 @@ class Service(Generic[T]):
         Returns:
             List of objects
         """
-        query = select(self.model_class).offset(skip).limit(limit)
-        return session.exec(query).all()
+        return session.exec(self._get_all_query(skip, limit)).all()
+
+    async def aget_all(
+        self, session: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> list[T]:
+        """
+        Get all objects, with optional pagination.
+
+        Args:
+            session: SQLModel async database session
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List of objects
+        """
+        return (await session.exec(self._get_all_query(skip, limit))).all()
@@ -0,0 +1,72 @@
+import datetime
+
+from sqlmodel import Session, select
+
+from ..models import ShowDetails
+from .service import Service
+
+
+class ShowDetailsService(Service[ShowDetails]):
+    """Service for handling details of shows fetched from their pages"""
+
+    def __init__(self):
+        super().__init__(ShowDetails)
+
+    def _get_id_field(self):
+        """Override to use show_details_id instead of id"""
+        return ShowDetails.show_details_id
+
+    def get_fresh(
+        self,
+        session: Session,
+        theater_name: str,
+        urls: list[str],
+        fetched_after: datetime.datetime,
+    ) -> dict[str, ShowDetails]:
+        """
+        Get details of shows of a theater fetched recently enough to be reused.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater
+            urls: Show page URLs
+            fetched_after: Details fetched before this moment are stale
+
+        Returns:
+            Mapping of show page URL to its details
+        """
+        if not urls:
+            return {}
+        query = select(ShowDetails).where(
+            ShowDetails.theater_name == theater_name,
+            ShowDetails.url.in_(urls),
+            ShowDetails.fetched_at >= fetched_after,
+        )
+        return {details.url: details for details in session.exec(query).all()}
+
+    def save_many(self, session: Session, details: list[ShowDetails]) -> None:
+        """
+        Insert or replace show details by theater name and URL.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            details: Freshly fetched show details
+        """
+        if not details:
+            return
+
+        insert = self._get_insert(session)
+        statement = insert(ShowDetails).values(
+            [item.model_dump(exclude={"show_details_id"}) for item in details]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ShowDetails.theater_name, ShowDetails.url],
+            set_={
+                "author": statement.excluded.author,
+                "director": statement.excluded.director,
+                "duration": statement.excluded.duration,
+                "fetched_at": statement.excluded.fetched_at,
+            },
+        )
+        session.execute(statement)
@@ -0,0 +1,362 @@
+import datetime
+from collections import defaultdict
+
+from sqlalchemy import Row, Select
+from sqlmodel import Session, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import (
+    Performance,
+    Show,
+    ShowResponse,
+    Stage,
+    StageResponse,
+    Theater,
+    TheaterName,
+    TheaterResponse,
+)
+from .service import Service
+
+
+class ShowService(Service[Show]):
+    """Service for handling show-related database operations"""
+
+    def __init__(self):
+        super().__init__(Show)
+
+    def _get_id_field(self):
+        """Override to use show_id instead of id"""
+        return Show.show_id
+
+    def get_show_ids_by_theater(
+        self,
+        session: Session,
+    ) -> list[tuple[TheaterName, str, int]]:
+        """
+        Get all show IDs together with their theater names and titles.
+
+        Args:
+            session: SQLModel database session
+
+        Returns:
+            List of (theater name, title, show ID) tuples
+        """
+        query = select(Theater.name, Show.title, Show.show_id).join(Show.theater)
+        return session.exec(query).all()
+
+    def create_many(
+        self, session: Session, theater_name: str, titles: list[str]
+    ) -> dict[str, int]:
+        """
+        Create shows of a theater with `INSERT ... ON CONFLICT DO NOTHING`,
+        so shows created concurrently are not duplicated.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater
+            titles: Titles of the shows, existing ones are left alone
+
+        Returns:
+            Mapping of title to show ID, for new and existing shows
+        """
+        if not titles:
+            return {}
+        theater_id = session.exec(
+            select(Theater.theater_id).where(Theater.name == theater_name)
+        ).one()
+
+        insert = self._get_insert(session)
+        statement = insert(Show).values(
+            [{"title": title, "theater_id": theater_id} for title in titles]
+        )
+        session.execute(statement.on_conflict_do_nothing())
+
+        query = select(Show.title, Show.show_id).where(
+            Show.theater_id == theater_id, Show.title.in_(titles)
+        )
+        return dict(session.exec(query).all())
+
+    def update_details(
+        self, session: Session, details: dict[int, tuple[str | None, str | None]]
+    ) -> set[int]:
+        """
+        Update directors and authors of shows. Only known values overwrite
+        stored ones. The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            details: Mapping of show ID to its (director, author)
+
+        Returns:
+            IDs of changed shows
+        """
+        details = {
+            show_id: (director, author)
+            for show_id, (director, author) in details.items()
+            if director is not None or author is not None
+        }
+        if not details:
+            return set()
+
+        query = select(Show.show_id, Show.director, Show.author).where(
+            Show.show_id.in_(details)
+        )
+        changes = []
+        for show_id, stored_director, stored_author in session.exec(query).all():
+            director, author = details[show_id]
+            director = director or stored_director
+            author = author or stored_author
+            if (director, author) != (stored_director, stored_author):
+                changes.append(
+                    {"show_id": show_id, "director": director, "author": author}
+                )
+        if changes:
+            session.execute(update(Show), changes)
+        return {change["show_id"] for change in changes}
+
+    def refresh_aggregates(
+        self,
+        session: Session,
+        theater_name: str | None = None,
+        now: datetime.datetime | None = None,
+    ) -> bool:
+        """
+        Recompute the next date, the number of upcoming dates and the stages
+        of every show of a theater from its upcoming performances, except
+        cancelled ones, with two grouping queries. Only shows whose
+        aggregates changed are updated.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater to refresh, all theaters by default
+            now: Performances before this moment are not upcoming,
+                current time by default
+
+        Returns:
+            True if the aggregates of any show changed
+        """
+        now = now or datetime.datetime.now()
+        shows = select(Show.show_id).join(Show.theater)
+        if theater_name is not None:
+            shows = shows.where(Theater.name == theater_name)
+        stored = {
+            show_id: tuple(values)
+            for show_id, *values in session.execute(
+                shows.add_columns(
+                    Show.next_datetime, Show.upcoming_count, Show.stage_ids
+                )
+            ).all()
+        }
+        if not stored:
+            return False
+
+        upcoming = (
+            Performance.show_id.in_(shows),
+            Performance.cancelled_at.is_(None),
+            Performance.datetime >= now,
+        )
+        dates = (
+            select(Performance.show_id, func.min(Performance.datetime), func.count())
+            .where(*upcoming)
+            .group_by(Performance.show_id)
+        )
+        stages = (
+            select(Performance.show_id, Performance.stage_id)
+            .where(*upcoming)
+            .distinct()
+            .order_by(Performance.stage_id)
+        )
+
+        aggregates = {
+            show_id: (next_datetime, count)
+            for show_id, next_datetime, count in session.exec(dates).all()
+        }
+        stage_ids = defaultdict(list)
+        for show_id, stage_id in session.exec(stages).all():
+            stage_ids[show_id].append(stage_id)
+
+        changes = []
+        for show_id, values in stored.items():
+            next_datetime, upcoming_count = aggregates.get(show_id, (None, 0))
+            refreshed = (next_datetime, upcoming_count, stage_ids.get(show_id, []))
+            if refreshed != values:
+                changes.append(
+                    {
+                        "show_id": show_id,
+                        "next_datetime": next_datetime,
+                        "upcoming_count": upcoming_count,
+                        "stage_ids": refreshed[2],
+                    }
+                )
+        if changes:
+            session.execute(update(Show), changes)
+        return bool(changes)
+
+
+class ShowResponseService:
+    """
+    Service for handling show responses with their precomputed aggregates,
+    stages and theater.
+    """
+
+    def _select_rows(self) -> Select:
+        """Select show and theater columns as plain rows, bypassing the ORM."""
+        return select(
+            *Show.__table__.columns,
+            Theater.full_name.label("theater_full_name"),
+            Theater.url.label("theater_url"),
+        ).join(Theater, Show.theater_id == Theater.theater_id)
+
+    def _get_shows_query(
+        self,
+        theater_name: str | None,
+        upcoming: bool,
+        skip: int,
+        limit: int,
+    ) -> Select:
+        """Build the query for `get_shows`."""
+        query = self._select_rows()
+        if theater_name is not None:
+            query = query.where(Theater.name == theater_name)
+        if upcoming:
+            query = query.where(Show.upcoming_count > 0)
+        return (
+            query.order_by(
+                Show.next_datetime.is_(None), Show.next_datetime, Show.show_id
+            )
+            .offset(skip)
+            .limit(limit)
+        )
+
+    def _get_by_id_query(self, show_id: int) -> Select:
+        """Build the query for `get_by_id`."""
+        return self._select_rows().where(Show.show_id == show_id)
+
+    def _get_stages_query(self, rows: list[Row]) -> Select:
+        """Build the query of the stages of shows."""
+        stage_ids = {stage_id for row in rows for stage_id in row.stage_ids}
+        return select(Stage).where(Stage.stage_id.in_(stage_ids))
+
+    def _create_show_responses(
+        self, rows: list[Row], stages: list[Stage]
+    ) -> list[ShowResponse]:
+        """Convert show rows to responses with their stages and theater."""
+        stages_by_id = {
+            stage.stage_id: StageResponse(
+                stage_id=stage.stage_id, name=stage.name, address=stage.address
+            )
+            for stage in stages
+        }
+        return [
+            ShowResponse(
+                show_id=row.show_id,
+                title=row.title,
+                director=row.director,
+                author=row.author,
+                next_datetime=row.next_datetime,
+                upcoming_count=row.upcoming_count,
+                stages=[
+                    stages_by_id[stage_id]
+                    for stage_id in row.stage_ids
+                    if stage_id in stages_by_id
+                ],
+                theater=TheaterResponse(
+                    theater_id=row.theater_id,
+                    full_name=row.theater_full_name,
+                    url=row.theater_url,
+                ),
+            )
+            for row in rows
+        ]
+
+    def get_shows(
+        self,
+        session: Session,
+        theater_name: str | None = None,
+        upcoming: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[ShowResponse]:
+        """
+        Get shows with their next date, number of upcoming dates and stages,
+        ordered by their next date.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater to filter by
+            upcoming: Whether to skip shows without upcoming dates
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List of show responses
+        """
+        query = self._get_shows_query(theater_name, upcoming, skip, limit)
+        rows = session.exec(query).all()
+        stages = session.exec(self._get_stages_query(rows)).all()
+        return self._create_show_responses(rows, stages)
+
+    async def aget_shows(
+        self,
+        session: AsyncSession,
+        theater_name: str | None = None,
+        upcoming: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[ShowResponse]:
+        """
+        Get shows with their next date, number of upcoming dates and stages,
+        ordered by their next date.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+            upcoming: Whether to skip shows without upcoming dates
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List of show responses
+        """
+        query = self._get_shows_query(theater_name, upcoming, skip, limit)
+        rows = (await session.exec(query)).all()
+        stages = (await session.exec(self._get_stages_query(rows))).all()
+        return self._create_show_responses(rows, stages)
+
+    def get_by_id(self, session: Session, show_id: int) -> ShowResponse | None:
+        """
+        Get a show by ID with its aggregates, stages and theater.
+
+        Args:
+            session: SQLModel database session
+            show_id: ID of the show to retrieve
+
+        Returns:
+            Show response or None if not found
+        """
+        rows = session.exec(self._get_by_id_query(show_id)).all()
+        if not rows:
+            return None
+        stages = session.exec(self._get_stages_query(rows)).all()
+        return self._create_show_responses(rows, stages)[0]
+
+    async def aget_by_id(
+        self, session: AsyncSession, show_id: int
+    ) -> ShowResponse | None:
+        """
+        Get a show by ID with its aggregates, stages and theater.
+
+        Args:
+            session: SQLModel async database session
+            show_id: ID of the show to retrieve
+
+        Returns:
+            Show response or None if not found
+        """
+        rows = (await session.exec(self._get_by_id_query(show_id))).all()
+        if not rows:
+            return None
+        stages = (await session.exec(self._get_stages_query(rows))).all()
+        return self._create_show_responses(rows, stages)[0]
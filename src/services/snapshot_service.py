@@ -0,0 +1,57 @@
+from sqlmodel import Session, select
+
+from ..models import ScrapeSnapshot
+from .service import Service
+
+
+class SnapshotService(Service[ScrapeSnapshot]):
+    """Service for handling snapshots of scraped pages"""
+
+    def __init__(self):
+        super().__init__(ScrapeSnapshot)
+
+    def _get_id_field(self):
+        """Override to use snapshot_id instead of id"""
+        return ScrapeSnapshot.snapshot_id
+
+    def get_hashes(self, session: Session, theater_name: str) -> dict[str, str]:
+        """
+        Get content hashes of the last stored pages of a theater.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the theater
+
+        Returns:
+            Mapping of page URL to content hash
+        """
+        query = select(ScrapeSnapshot.url, ScrapeSnapshot.content_hash).where(
+            ScrapeSnapshot.theater_name == theater_name
+        )
+        return dict(session.exec(query).all())
+
+    def save_many(self, session: Session, snapshots: list[ScrapeSnapshot]) -> None:
+        """
+        Insert or replace snapshots by theater name and URL.
+        The caller is responsible for committing the session.
+
+        Args:
+            session: SQLModel database session
+            snapshots: Snapshots of freshly stored pages
+        """
+        if not snapshots:
+            return
+
+        insert = self._get_insert(session)
+        statement = insert(ScrapeSnapshot).values(
+            [snapshot.model_dump(exclude={"snapshot_id"}) for snapshot in snapshots]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ScrapeSnapshot.theater_name, ScrapeSnapshot.url],
+            set_={
+                "content_hash": statement.excluded.content_hash,
+                "fetched_at": statement.excluded.fetched_at,
+                "parsed_count": statement.excluded.parsed_count,
+            },
+        )
+        session.execute(statement)
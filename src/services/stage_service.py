@@ -1,4 +1,6 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 from ..models import Stage, Theater, TheaterName
 from .service import Service
@@ -14,6 +16,18 @@ class StageService(Service[Stage]):
         """Override to use stage_id instead of id"""
         return Stage.stage_id
 
+    def _get_by_theater_name_query(
+        self, theater_name: TheaterName, skip: int, limit: int
+    ) -> SelectOfScalar[Stage]:
+        """Build the query for `get_by_theater_name`."""
+        return (
+            select(Stage)
+            .join(Stage.theater)
+            .where(Theater.name == theater_name)
+            .offset(skip)
+            .limit(limit)
+        )
+
     def get_by_theater_name(
         self,
         session: Session,
@@ -33,15 +47,31 @@ class StageService(Service[Stage]):
         Returns:
             List of objects matching the theater name
         """
-        query = (
-            select(Stage)
-            .join(Stage.theater)
-            .where(Theater.name == theater_name)
-            .offset(skip)
-            .limit(limit)
-        )
+        query = self._get_by_theater_name_query(theater_name, skip, limit)
         return session.exec(query).all()
 
+    async def aget_by_theater_name(
+        self,
+        session: AsyncSession,
+        theater_name: TheaterName,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[Stage]:
+        """
+        Get objects filtered by theater name.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to filter by
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+
+        Returns:
+            List of objects matching the theater name
+        """
+        query = self._get_by_theater_name_query(theater_name, skip, limit)
+        return (await session.exec(query)).all()
+
     def get_stage_id_by_name(
         self,
         session: Session,
@@ -59,3 +89,19 @@ class StageService(Service[Stage]):
         """
         query = select(Stage.stage_id).where(Stage.name == stage_name)
         return session.exec(query).first()
+
+    def get_stage_ids_by_theater(
+        self,
+        session: Session,
+    ) -> list[tuple[TheaterName, str, int]]:
+        """
+        Get all stage IDs together with their theater and stage names.
+
+        Args:
+            session: SQLModel database session
+
+        Returns:
+            List of (theater name, stage name, stage ID) tuples
+        """
+        query = select(Theater.name, Stage.name, Stage.stage_id).join(Stage.theater)
+        return session.exec(query).all()
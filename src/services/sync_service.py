@@ -0,0 +1,162 @@
+import datetime
+from itertools import batched
+
+from sqlmodel import Session, and_, or_, select, update
+
+from ..models import Performance, ScrapedPerformance, Stage, StoreResult, Theater
+from .change_service import ChangeService
+from .listing_service import ListingService
+from .performance_service import PerformanceService
+from .show_service import ShowService
+
+
+def _month_window(
+    value: datetime.datetime,
+) -> tuple[datetime.datetime, datetime.datetime]:
+    """
+    Get the start and the end (exclusive) of the month containing a datetime.
+    """
+    start = datetime.datetime(value.year, value.month, 1)
+    if value.month == 12:
+        end = datetime.datetime(value.year + 1, 1, 1)
+    else:
+        end = datetime.datetime(value.year, value.month + 1, 1)
+    return start, end
+
+
+class SyncService:
+    """Service for synchronizing stored performances with scraped ones"""
+
+    def sync(
+        self,
+        session: Session,
+        theater_name: str,
+        performances: list[ScrapedPerformance],
+        now: datetime.datetime | None = None,
+        batch_size: int = 500,
+        show_ids: dict[str, int] | None = None,
+    ) -> StoreResult:
+        """
+        Synchronize stored performances of a theater with a fresh scrape.
+
+        Titles are resolved to shows first: known ones through `show_ids`,
+        the others are looked up and created, and directors and authors of
+        shows are updated. Stored performances of the theater in every month
+        present in the scrape are then loaded with a single query and compared
+        in memory. New performances are inserted, reappearing ones are
+        restored, and upcoming ones missing from the scrape are marked as
+        cancelled. These changes are appended to the change log, and the
+        listing rows of changed performances and of all performances of
+        changed shows are refreshed. Months without scraped performances are
+        left untouched.
+        The caller is responsible for committing the session, so all changes
+        are applied in one transaction.
+
+        Args:
+            session: SQLModel database session
+            theater_name: Name of the scraped theater
+            performances: Scraped performances with resolved stages
+            now: Performances before this moment are never cancelled,
+                current time by default
+            batch_size: Maximum number of performances per statement
+            show_ids: Known show IDs of the theater by title, e.g. from the
+                show resolver
+
+        Returns:
+            Counts of inserted, updated, unchanged and cancelled performances,
+            performances of shows with a changed director or author are updated
+        """
+        now = now or datetime.datetime.now()
+        if not performances:
+            return StoreResult()
+
+        show_service = ShowService()
+        show_ids = dict(show_ids or {})
+        titles = list(dict.fromkeys(p.title for p in performances))
+        if missing := [title for title in titles if title not in show_ids]:
+            show_ids.update(show_service.create_many(session, theater_name, missing))
+
+        # Known details of every show, the last scraped values win
+        details: dict[int, tuple[str | None, str | None]] = {}
+        for p in performances:
+            show_id = show_ids[p.title]
+            director, author = details.get(show_id, (None, None))
+            details[show_id] = (p.director or director, p.author or author)
+        changed_show_ids = show_service.update_details(session, details)
+
+        scraped = {(show_ids[p.title], p.stage_id, p.datetime): p for p in performances}
+        windows = {_month_window(p.datetime) for p in performances}
+
+        query = (
+            select(Performance)
+            .join(Performance.stage)
+            .join(Stage.theater)
+            .where(Theater.name == theater_name)
+            .where(
+                or_(
+                    *(
+                        and_(Performance.datetime >= start, Performance.datetime < end)
+                        for start, end in windows
+                    )
+                )
+            )
+        )
+        stored = {
+            (p.show_id, p.stage_id, p.datetime): p for p in session.exec(query).all()
+        }
+
+        new_performances = [
+            Performance(show_id=show_id, stage_id=stage_id, datetime=value)
+            for (show_id, stage_id, value) in scraped
+            if (show_id, stage_id, value) not in stored
+        ]
+        existing = [stored[key] for key in scraped if key in stored]
+        restored = [p for p in existing if p.cancelled_at is not None]
+        updated = len(restored) + sum(
+            1
+            for p in existing
+            if p.cancelled_at is None and p.show_id in changed_show_ids
+        )
+        cancelled = [
+            p
+            for key, p in stored.items()
+            if key not in scraped and p.cancelled_at is None and p.datetime >= now
+        ]
+        restored_ids = [p.performance_id for p in restored]
+        cancelled_ids = [p.performance_id for p in cancelled]
+
+        inserted = PerformanceService().insert_many(
+            session, new_performances, batch_size
+        )
+        for batch in batched(restored_ids, batch_size):
+            session.execute(
+                update(Performance)
+                .where(Performance.performance_id.in_(batch))
+                .values(cancelled_at=None)
+            )
+        for batch in batched(cancelled_ids, batch_size):
+            session.execute(
+                update(Performance)
+                .where(Performance.performance_id.in_(batch))
+                .values(cancelled_at=now)
+            )
+
+        ChangeService().record(
+            session, theater_name, [*inserted, *restored], cancelled, now
+        )
+
+        listing_service = ListingService()
+        changed_ids = (
+            [p.performance_id for p in inserted] + restored_ids + cancelled_ids
+        )
+        for batch in batched(changed_ids, batch_size):
+            listing_service.refresh(session, performance_ids=batch)
+        if changed_show_ids:
+            listing_service.refresh(session, show_ids=changed_show_ids)
+
+        return StoreResult(
+            inserted=len(inserted),
+            updated=updated,
+            unchanged=len(scraped) - len(inserted) - updated,
+            cancelled=len(cancelled),
+        )
@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..models import Theater, TheaterName
 from .service import Service
@@ -31,3 +32,21 @@ class TheaterService(Service[Theater]):
         """
         query = select(Theater).where(Theater.name == theater_name)
         return session.exec(query).one()
+
+    async def aget_by_theater_name(
+        self,
+        session: AsyncSession,
+        theater_name: TheaterName,
+    ) -> Theater | None:
+        """
+        Get theater by name.
+
+        Args:
+            session: SQLModel async database session
+            theater_name: Name of the theater to look up
+
+        Returns:
+            The theater if found, None otherwise
+        """
+        query = select(Theater).where(Theater.name == theater_name)
+        return (await session.exec(query)).first()
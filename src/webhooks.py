@@ -0,0 +1,190 @@
+import asyncio
+import datetime
+import hashlib
+import hmac
+import logging
+
+import httpx
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from .changes import ChangeNotifier, change_notifier
+from .config import settings
+from .db import engine
+from .models import WebhookCursor
+from .scrapers.http_client import create_http_client
+from .scrapers.scheduler import ScrapeLock
+from .serialization import dumps
+from .services.change_service import ChangeService
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    """
+    Delivers logged changes to every URL of `settings.WEBHOOK_URLS` as POSTed
+    JSON batches in sequence order.
+
+    Every URL has a cursor stored in the database, so deliveries resume
+    after restarts, and a failed batch is retried with exponential backoff
+    until it is delivered. Delivery is at least once: receivers should skip
+    sequence numbers they already processed. With several workers, batches
+    of a URL are read by one worker at a time, but the lock is released
+    while the URL answers, so another worker may POST the same batch again.
+    """
+
+    def __init__(
+        self,
+        urls: list[str] | None = None,
+        client: httpx.AsyncClient | None = None,
+        bind: Engine = engine,
+        lock: ScrapeLock | None = None,
+        notifier: ChangeNotifier = change_notifier,
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            urls: Webhook URLs, `settings.WEBHOOK_URLS` by default
+            client: Shared HTTP client, if None one is created from settings
+                and closed by `stop`
+            bind: Engine storing changes and cursors
+            lock: Single-flight lock, an advisory lock on `bind` by default
+            notifier: Notifier waking deliveries up when changes are stored
+        """
+        self.urls = settings.WEBHOOK_URLS if urls is None else urls
+        self._owns_client = client is None
+        self.client = client or create_http_client()
+        self.bind = bind
+        self.lock = lock or ScrapeLock(bind)
+        self.notifier = notifier
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start delivering to every URL in the background."""
+        self._tasks = [
+            asyncio.create_task(self._run_loop(url), name=f"webhook:{url}")
+            for url in self.urls
+        ]
+
+    async def stop(self) -> None:
+        """Stop all deliveries."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._owns_client:
+            await self.client.aclose()
+
+    @staticmethod
+    def get_backoff(consecutive_failures: int) -> float:
+        """Get the delay before retrying after consecutive failed deliveries."""
+        delay = settings.WEBHOOK_RETRY_BASE * 2 ** (consecutive_failures - 1)
+        return min(delay, settings.WEBHOOK_RETRY_MAX)
+
+    async def _run_loop(self, url: str) -> None:
+        """Deliver to a URL until stopped, waiting for changes in between."""
+        while True:
+            try:
+                delay = await self.deliver(url)
+            except Exception as e:
+                logger.error(f"Webhook delivery to {url} crashed: {e}")
+                delay = settings.WEBHOOK_RETRY_MAX
+            if delay is None:
+                await self.notifier.wait(settings.CHANGES_POLL_TIMEOUT)
+            elif delay > 0:
+                await asyncio.sleep(delay)
+
+    def _load_cursor(self, session: Session, url: str) -> WebhookCursor:
+        """
+        Load the cursor of a URL. New URLs start after the latest change
+        instead of receiving the whole change log.
+        """
+        cursor = session.get(WebhookCursor, url)
+        if cursor is None:
+            cursor = WebhookCursor(
+                url=url, last_sequence=ChangeService().get_last_sequence(session)
+            )
+            session.add(cursor)
+            session.commit()
+        return cursor
+
+    def sign(self, body: bytes) -> str:
+        """Get the `X-Webhook-Signature` header value of a body."""
+        digest = hmac.new(settings.WEBHOOK_SECRET.encode(), body, hashlib.sha256)
+        return f"sha256={digest.hexdigest()}"
+
+    async def deliver(self, url: str) -> float | None:
+        """
+        Deliver the next batch of undelivered changes to a URL and move its
+        cursor past them if the URL answers with a success status.
+
+        Args:
+            url: Webhook URL
+
+        Returns:
+            Seconds to wait before the next attempt: 0 after a delivered batch,
+            the backoff after a failure, None if there was nothing to deliver
+        """
+        async with self.lock.acquire(f"webhook:{url}") as acquired:
+            if not acquired:
+                return settings.CHANGES_POLL_TIMEOUT
+
+            with Session(self.bind) as session:
+                cursor = self._load_cursor(session, url)
+                changes = ChangeService().get_since(
+                    session, cursor.last_sequence, limit=settings.WEBHOOK_BATCH_SIZE
+                )
+        if not changes:
+            return None
+
+        last_sequence = changes[-1].sequence
+        body = dumps(
+            {
+                "changes": [change.model_dump() for change in changes],
+                "last_sequence": last_sequence,
+            }
+        )
+        headers = {"Content-Type": "application/json"}
+        if settings.WEBHOOK_SECRET:
+            headers["X-Webhook-Signature"] = self.sign(body)
+
+        error = None
+        try:
+            # The lock and its connection are released while the URL answers
+            response = await self.client.post(
+                url, content=body, headers=headers, timeout=settings.WEBHOOK_TIMEOUT
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            error = str(e) or e.__class__.__name__
+
+        with Session(self.bind) as session:
+            # Locks the row on PostgreSQL until the commit, so workers that
+            # POSTed the same batch update the cursor one after the other
+            cursor = session.exec(
+                select(WebhookCursor).where(WebhookCursor.url == url).with_for_update()
+            ).one()
+            cursor.last_attempt_at = datetime.datetime.now()
+            if error is None:
+                cursor.last_sequence = max(cursor.last_sequence, last_sequence)
+                cursor.consecutive_failures = 0
+                cursor.last_error = None
+            else:
+                cursor.consecutive_failures += 1
+                cursor.last_error = error
+            session.add(cursor)
+            session.commit()
+            consecutive_failures = cursor.consecutive_failures
+
+        if error is not None:
+            delay = self.get_backoff(consecutive_failures)
+            logger.warning(
+                f"Webhook delivery to {url} failed, retrying in {delay:.0f}s: {error}"
+            )
+            return delay
+
+        logger.info(
+            f"Delivered {len(changes)} changes to {url} up to sequence {last_sequence}"
+        )
+        return 0
@@ -0,0 +1,224 @@
+import csv
+import datetime
+import io
+import json
+
+from src.services.calendar_service import CalendarService
+from src.services.change_service import ChangeService
+from src.services.listing_service import ListingService
+from src.services.show_service import ShowService
+
+
+def test_get_performances(client, session, fomenki_stage, add_performance):
+    add_performance(
+        "Приречная страна",
+        fomenki_stage,
+        datetime.datetime(2025, 5, 1, 14, 0),
+    )
+    ListingService().refresh(session)
+    session.commit()
+
+    response = client.get("/performances/", params={"theater_name": "fomenki"})
+    assert response.status_code == 200
+    [performance] = response.json()
+    assert performance["title"] == "Приречная страна"
+    assert performance["stage"]["name"] == "Старая сцена, Зелёный зал"
+    assert performance["theater"]["full_name"] == "Мастерская Петра Фоменко"
+
+    response = client.get(f"/performances/{performance['performance_id']}")
+    assert response.json() == performance
+
+    assert client.get("/performances/0").status_code == 404
+
+
+def test_get_shows(client, session, fomenki_stage, add_performance):
+    for day in (1, 2, 3):
+        add_performance(
+            "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, day, 19, 0)
+        )
+    add_performance(
+        "Приречная страна",
+        fomenki_stage,
+        datetime.datetime(2025, 5, 4, 19, 0),
+        cancelled_at=datetime.datetime(2025, 4, 1),
+    )
+    add_performance("Война и мир", fomenki_stage, datetime.datetime(2025, 4, 1, 19, 0))
+    session.commit()
+    now = datetime.datetime(2025, 5, 2)
+    assert ShowService().refresh_aggregates(session, now=now)
+    session.commit()
+    # Unchanged aggregates are not written again
+    assert not ShowService().refresh_aggregates(session, now=now)
+
+    response = client.get("/shows/", params={"theater_name": "fomenki"})
+    assert response.status_code == 200
+    [show] = response.json()
+    assert show["title"] == "Приречная страна"
+    assert show["next_datetime"] == "2025-05-02T19:00:00"
+    assert show["upcoming_count"] == 2
+    assert [stage["name"] for stage in show["stages"]] == ["Старая сцена, Зелёный зал"]
+
+    response = client.get("/shows/", params={"upcoming": False})
+    assert [show["title"] for show in response.json()] == [
+        "Приречная страна",
+        "Война и мир",
+    ]
+
+    assert client.get(f"/shows/{show['show_id']}").json() == show
+    assert client.get("/shows/0").status_code == 404
+
+
+def test_get_calendar_feeds(client, session, fomenki_stage, add_performance):
+    performance = add_performance(
+        "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, 1, 19, 0)
+    )
+    ListingService().refresh(session)
+    CalendarService().refresh(session, "fomenki", now=datetime.datetime(2025, 4, 1))
+    session.commit()
+
+    response = client.get("/theaters/fomenki/calendar.ics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert response.headers["content-encoding"] == "gzip"
+    assert "SUMMARY:Приречная страна" in response.text
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+    response = client.get(
+        "/theaters/fomenki/calendar.ics", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        f"/shows/{performance.show_id}/calendar.ics",
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in response.headers
+    assert "SUMMARY:Приречная страна" in response.text
+    assert not response.headers["etag"].endswith('-gzip"')
+
+    response = client.get(f"/stages/{fomenki_stage.stage_id}/calendar.ics")
+    assert "SUMMARY:Приречная страна" in response.text
+    assert client.get("/shows/0/calendar.ics").status_code == 404
+
+
+def test_get_changes(client, session, fomenki_stage, add_performance):
+    performance = add_performance(
+        "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, 1, 19, 0)
+    )
+    session.commit()
+    ChangeService().record(session, "fomenki", [], [performance])
+    session.commit()
+
+    response = client.get("/changes/", params={"theater_name": "fomenki"})
+    assert response.status_code == 200
+    [change] = response.json()
+    assert change["change_type"] == "removed"
+    assert change["performance_id"] == performance.performance_id
+
+    response = client.get(
+        "/changes/", params={"since": change["sequence"], "timeout": 0}
+    )
+    assert response.json() == []
+
+
+def test_get_stages_and_theaters(client, fomenki_stage):
+    assert [stage["name"] for stage in client.get("/stages/").json()] == [
+        "Старая сцена, Зелёный зал"
+    ]
+    assert client.get("/stages/", params={"theater_name": "ramt"}).json() == []
+    assert client.get("/theaters/name/fomenki").json()["theater_id"] == 1
+    assert client.get("/theaters/name/ramt").status_code == 404
+
+
+def test_get_performances_pages(client, session, fomenki_stage, add_performance):
+    for day in range(1, 6):
+        add_performance(
+            f"Спектакль {day}",
+            fomenki_stage,
+            datetime.datetime(2025, 5, day, 19, 0),
+        )
+    ListingService().refresh(session)
+    session.commit()
+
+    response = client.get("/performances/", params={"limit": 2})
+    assert [p["title"] for p in response.json()] == ["Спектакль 1", "Спектакль 2"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/performances/", params={"limit": 2, "cursor": cursor})
+    assert [p["title"] for p in response.json()] == ["Спектакль 3", "Спектакль 4"]
+
+    response = client.get(
+        "/performances/",
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert [p["title"] for p in response.json()] == ["Спектакль 5"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(
+        "/performances/",
+        params={
+            "from": "2025-05-02T00:00:00",
+            "to": "2025-05-04T00:00:00",
+            "stage_id": fomenki_stage.stage_id,
+        },
+    )
+    assert [p["title"] for p in response.json()] == ["Спектакль 2", "Спектакль 3"]
+
+    assert client.get("/performances/", params={"stage_id": 0}).json() == []
+    assert client.get("/performances/", params={"cursor": "bad"}).status_code == 400
+
+
+def test_export_performances(client, session, fomenki_stage, add_performance):
+    for day in (2, 1):
+        add_performance(
+            f"Спектакль {day}",
+            fomenki_stage,
+            datetime.datetime(2025, 5, day, 19, 0),
+        )
+    ListingService().refresh(session)
+    session.commit()
+
+    response = client.get("/performances/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Спектакль 1", "Спектакль 2"]
+    assert rows[0]["datetime"] == "2025-05-01T19:00:00"
+    assert rows[0]["theater_name"] == "fomenki"
+    assert rows[0]["stage_name"] == "Старая сцена, Зелёный зал"
+
+    response = client.get(
+        "/performances/export", params={"format": "csv", "from": "2025-05-02"}
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    [row] = csv.DictReader(io.StringIO(response.text))
+    assert row["title"] == "Спектакль 2"
+    assert row["theater_name"] == "fomenki"
+    assert row["director"] == ""
+
+    response = client.get(
+        "/performances/export", params={"format": "csv", "stage_id": 0}
+    )
+    assert response.text.splitlines() == [
+        "performance_id,show_id,title,datetime,director,author,cancelled_at,stage_id,"
+        "stage_name,stage_address,theater_id,theater_name,theater_full_name,theater_url"
+    ]
+
+
+def test_search_performances(client, session, fomenki_stage, add_performance):
+    add_performance(
+        "Ёлка у Ивановых",
+        fomenki_stage,
+        datetime.datetime(2025, 5, 1, 19, 0),
+    )
+    ListingService().refresh(session)
+    session.commit()
+
+    response = client.get("/performances/search", params={"q": "елка"})
+    assert response.status_code == 200
+    assert [p["title"] for p in response.json()] == ["Ёлка у Ивановых"]
+
+    response = client.get(
+        "/performances/search", params={"q": "елка", "theater_name": "ramt"}
+    )
+    assert response.json() == []
+    assert client.get("/performances/search", params={"q": "е"}).status_code == 422
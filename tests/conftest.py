@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.cache import FeedCache, MemoryCache, response_cache
+from src.db import get_session_factory
+from src.main import app
+from src.models import Performance, Show, Stage, Theater
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "theater.db"
+
+
+@pytest.fixture
+def engine(database_path):
+    engine = create_engine(
+        f"sqlite:///{database_path}",
+        connect_args={"check_same_thread": False},
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine, database_path, monkeypatch):
+    # Connections are not reused, as every request runs in its own event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    backend, response_cache.backend = response_cache.backend, MemoryCache()
+    monkeypatch.setattr("src.api.feeds.calendar_feeds", FeedCache())
+    yield TestClient(app)
+    response_cache.backend = backend
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def fomenki_stage(session):
+    theater = Theater(name="fomenki", full_name="Мастерская Петра Фоменко")
+    stage = Stage(name="Старая сцена, Зелёный зал", theater=theater)
+    session.add(stage)
+    session.commit()
+    session.refresh(stage)
+    return stage
+
+
+@pytest.fixture
+def add_performance(session):
+    def _add_performance(title, stage, datetime, **kwargs):
+        # Performances of the same title share their show
+        show = session.exec(
+            select(Show).where(Show.theater_id == stage.theater_id, Show.title == title)
+        ).first() or Show(title=title, theater_id=stage.theater_id)
+        performance = Performance(
+            show=show, stage_id=stage.stage_id, datetime=datetime, **kwargs
+        )
+        session.add(performance)
+        return performance
+
+    return _add_performance
@@ -4,9 +4,7 @@ import logging
 import os
 from pathlib import Path
 
-# explicitly import scrapers for subclasses to be recognized
-from scrapers.fomenki import FomenkiScraper
-from scrapers.scraper import Scraper
+from src.scrapers.registry import get_enabled_theaters, load_scraper_class
 
 # Configure logging
 logging.basicConfig(
@@ -21,9 +19,10 @@ async def save_html():
 
     results = []
 
-    for scraper_class in Scraper.__subclasses__():
-        scraper = scraper_class()
-        class_name = scraper_class.__name__.lower().replace("scraper", "")
+    # Scraper modules are imported from the registry, enabled ones only
+    for theater in get_enabled_theaters():
+        scraper = load_scraper_class(theater.name)()
+        class_name = theater.name
         filename = f"{class_name}_sample.html"
         file_path = fixtures_dir / filename
 
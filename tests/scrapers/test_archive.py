@@ -0,0 +1,92 @@
+import datetime
+
+import httpx
+import pytest
+from sqlmodel import select
+
+from src.models import Show
+from src.scrapers.archive import PageArchive
+from src.scrapers.fomenki import FomenkiScraper
+from src.scrapers.http_client import ValidatorCache, create_http_client
+from src.scrapers.replay import replay
+
+
+@pytest.fixture
+def archive(tmp_path):
+    pytest.importorskip("zstandard")
+    return PageArchive(tmp_path / "archive")
+
+
+def test_pages_are_stored_once_per_content(archive):
+    first = archive.save(
+        "fomenki", "http://a/", "<p>1</p>", datetime.datetime(2025, 1, 1)
+    )
+    archive.save("fomenki", "http://a/", "<p>1</p>", datetime.datetime(2025, 2, 1))
+    archive.save("ramt", "http://b/", "<p>2</p>", datetime.datetime(2025, 3, 1))
+
+    assert archive.load(first.content_hash) == "<p>1</p>"
+    assert len(list(archive.root.glob("blobs/*/*.zst"))) == 2
+    pages = archive.get_pages("fomenki", date_from=datetime.datetime(2025, 1, 15))
+    assert [page.fetched_at.month for page in pages] == [2]
+
+
+@pytest.mark.anyio
+async def test_fetched_pages_are_archived(archive):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<html/>"))
+    async with create_http_client(transport=transport) as client:
+        scraper = FomenkiScraper(
+            client=client, validators=ValidatorCache(), archive=archive
+        )
+        await scraper.fetch_page(scraper.repertoire_url)
+
+    [page] = archive.get_pages()
+    assert page.url == scraper.repertoire_url
+    assert archive.load(page.content_hash) == "<html/>"
+
+
+@pytest.mark.anyio
+async def test_archive_failures_do_not_fail_the_scrape(tmp_path, mocker):
+    # Archives passed explicitly are used even without zstandard
+    mocker.patch.dict("sys.modules", {"zstandard": None})
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<html/>"))
+    async with create_http_client(transport=transport) as client:
+        scraper = FomenkiScraper(
+            client=client,
+            validators=ValidatorCache(),
+            archive=PageArchive(tmp_path / "archive"),
+        )
+        assert await scraper.fetch_page(scraper.repertoire_url) == "<html/>"
+
+
+@pytest.mark.anyio
+async def test_replay_stores_latest_archived_pages(
+    archive, engine, fomenki_stage, html_content, mocker
+):
+    mocker.patch("src.scrapers.replay.engine", engine)
+    mocker.patch("src.scrapers.manager.engine", engine)
+    mocker.patch("src.scrapers.replay.stage_resolver.load")
+    mocker.patch("src.scrapers.replay.show_resolver.load")
+    mocker.patch(
+        "src.scrapers.stage_resolver.StageResolver.resolve",
+        return_value=fomenki_stage.stage_id,
+    )
+    html = html_content("fomenki")
+    url = "https://fomenki.ru/timetable/"
+    archive.save("fomenki", url, html, datetime.datetime(2025, 4, 20))
+    archive.save(
+        "fomenki",
+        url,
+        html.replace("Приречная страна", "Приречная страна (новая)", 1),
+        datetime.datetime(2025, 4, 25),
+    )
+
+    stored = await replay(
+        "fomenki", date_to=datetime.datetime(2025, 4, 21), archive=archive, processes=0
+    )
+    assert stored.inserted > 0
+    stored = await replay("fomenki", archive=archive, processes=0)
+    assert stored.inserted == 1
+
+    with engine.connect() as connection:
+        titles = connection.execute(select(Show.title)).scalars().all()
+    assert "Приречная страна (новая)" in titles
@@ -1,15 +1,13 @@
 import datetime
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
 
 import pytest
 
 from src.scrapers.fomenki import FomenkiScraper
 
 
-@pytest.fixture
-def anyio_backend():
-    return "asyncio"
-
-
 @pytest.fixture
 def fomenki_scraper():
     return FomenkiScraper()
@@ -23,9 +21,9 @@ async def test_get_performances(fomenki_scraper, html_content, mocker):
             "No HTML content available for Fomenki. Use save_sample_html.py to fetch it."
         )
 
-    # Mock db call
+    # Mock stage lookup
     mock_get_stage_id = mocker.patch(
-        "src.services.stage_service.StageService.get_stage_id_by_name"
+        "src.scrapers.stage_resolver.StageResolver.resolve"
     )
     mock_get_stage_id.return_value = 1
 
@@ -37,3 +35,37 @@ async def test_get_performances(fomenki_scraper, html_content, mocker):
     assert performances[0].datetime == datetime.datetime(
         year=2025, month=5, day=1, hour=14, minute=0
     )
+
+
+@pytest.mark.anyio
+async def test_parse_in_process_pool(html_content, mocker):
+    # Stages are resolved in this process, after parsing
+    mocker.patch(
+        "src.scrapers.stage_resolver.StageResolver.resolve",
+        side_effect=lambda theater_name, stage_name: len(stage_name),
+    )
+    html = html_content("fomenki")
+    expected = await FomenkiScraper().parse_repertoire(html)
+
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        performances = await FomenkiScraper(executor=pool).parse_repertoire(html)
+
+    assert [p.model_dump() for p in performances] == [p.model_dump() for p in expected]
+    assert performances[0].stage_id == len("Новая сцена, Малый\xa0зал")
+
+
+def test_page_urls_follow_timetable_links(fomenki_scraper, html_content, mocker):
+    mocker.patch("src.scrapers.fomenki.settings.SCRAPE_MONTHS", 3)
+    links = re.findall(r'href="(/timetable/\d{2}-\d{4}/)"', html_content("fomenki"))
+
+    urls = fomenki_scraper.get_page_urls(today=datetime.date(2025, 5, 1))
+    assert urls[0] == "https://fomenki.ru/timetable/"
+    assert urls[1:] == [f"https://fomenki.ru{link}" for link in dict.fromkeys(links)]
+
+    urls = fomenki_scraper.get_page_urls(today=datetime.date(2025, 12, 1))
+    assert urls[1:] == [
+        "https://fomenki.ru/timetable/01-2026/",
+        "https://fomenki.ru/timetable/02-2026/",
+    ]
@@ -0,0 +1,181 @@
+import asyncio
+import datetime
+import time
+
+import httpx
+import pytest
+from sqlmodel import select
+
+from src.models import (
+    PerformanceListing,
+    ScrapedPerformance,
+    ScrapeSnapshot,
+    ScrapeStatus,
+    Theater,
+)
+from src.scrapers.manager import ScraperManager
+from src.scrapers.scraper import Scraper
+
+
+class FakeScraper(Scraper):
+    def __init__(self, theater_name, delay=0.0, error=None):
+        super().__init__(repertoire_url="http://test/", theater_name=theater_name)
+        self.delay = delay
+        self.error = error
+
+    @staticmethod
+    def parse_page(html_content, parser):
+        return []
+
+    async def parse_repertoire(self, html_content):
+        return []
+
+    async def scrape_page(self, url):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            ScrapedPerformance(
+                title=f"{self.theater_name} show",
+                stage_id=1,
+                datetime=datetime.datetime(2025, 5, 1, 19, 0),
+            )
+        ]
+
+
+@pytest.fixture
+def manager_db(engine, session, fomenki_stage, mocker):
+    # Shows of the fake scrapers belong to their theaters
+    session.add(Theater(name="ramt"))
+    session.commit()
+    mocker.patch("src.scrapers.manager.engine", engine)
+    mocker.patch("src.scrapers.manager.stage_resolver.load")
+    mocker.patch("src.scrapers.manager.show_resolver.load")
+    return engine
+
+
+@pytest.mark.anyio
+async def test_run_all_scrapers_runs_concurrently(manager_db, mocker):
+    mocker.patch("src.scrapers.manager.settings.SCRAPER_TIMEOUT", 0.5)
+    scrapers = [
+        FakeScraper("fomenki", delay=0.2),
+        FakeScraper("ramt", delay=0.2),
+        FakeScraper("sti", delay=5),
+        FakeScraper("broken", error=RuntimeError("boom")),
+    ]
+
+    start = time.perf_counter()
+    results = await ScraperManager.run_all_scrapers(scrapers)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1
+    assert [result.status for result in results] == [
+        ScrapeStatus.success,
+        ScrapeStatus.success,
+        ScrapeStatus.timeout,
+        ScrapeStatus.failed,
+    ]
+    assert results[0].performances_found == 1
+    assert results[3].error == "boom"
+
+
+@pytest.mark.anyio
+async def test_run_all_scrapers_respects_concurrency_limit(manager_db, mocker):
+    mocker.patch("src.scrapers.manager.settings.SCRAPER_CONCURRENCY", 1)
+    scrapers = [FakeScraper("fomenki", delay=0.1), FakeScraper("ramt", delay=0.1)]
+
+    results = await ScraperManager.run_all_scrapers(scrapers)
+
+    assert results[1].started_at - results[0].started_at >= datetime.timedelta(
+        seconds=0.1
+    )
+
+
+class PageScraper(Scraper):
+    @staticmethod
+    def parse_page(html_content, parser):
+        return []
+
+    async def parse_repertoire(self, html_content):
+        return [
+            ScrapedPerformance(
+                title="Приречная страна",
+                stage_id=1,
+                datetime=datetime.datetime(2025, 5, 1, 14, 0),
+            )
+        ]
+
+
+@pytest.mark.anyio
+async def test_unchanged_page_is_not_parsed_again(manager_db, session):
+    pages = iter(["<p>Май</p>", "<p>Май</p>\n<!-- 12:00 -->", "<p>Июнь</p>"])
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text=next(pages))
+    )
+
+    statuses = []
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(3):
+            scraper = PageScraper(
+                repertoire_url="http://theater.test/", theater_name="fomenki"
+            )
+            scraper.client = client
+            result = await ScraperManager.run_scraper(scraper)
+            statuses.append(result.status)
+
+    assert statuses == [
+        ScrapeStatus.success,
+        ScrapeStatus.unchanged,
+        ScrapeStatus.success,
+    ]
+    snapshot = session.exec(select(ScrapeSnapshot)).one()
+    assert snapshot.url == "http://theater.test/"
+    assert snapshot.parsed_count == 1
+
+
+@pytest.mark.anyio
+async def test_run_clients_are_not_kept_by_scrapers(manager_db, mocker):
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<p>Май</p>")
+    )
+    mocker.patch(
+        "src.scrapers.manager.create_http_client",
+        side_effect=lambda: httpx.AsyncClient(transport=transport),
+    )
+    # Scrapers of the scheduler are reused by every run
+    scraper = PageScraper(repertoire_url="http://theater.test/", theater_name="fomenki")
+
+    first = await ScraperManager.run_all_scrapers([scraper])
+    second = await ScraperManager.run_all_scrapers([scraper])
+
+    assert [first[0].status, second[0].status] == [
+        ScrapeStatus.success,
+        ScrapeStatus.unchanged,
+    ]
+    assert scraper.client is None
+    assert scraper.show_details is None
+
+
+@pytest.mark.anyio
+async def test_pages_are_stored_separately(manager_db, session):
+    class MonthsScraper(PageScraper):
+        def get_page_urls(self):
+            return ["http://theater.test/05/", "http://theater.test/06/"]
+
+    def handler(request):
+        if request.url.path == "/06/":
+            return httpx.Response(500)
+        return httpx.Response(200, text="<p>Май</p>")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        scraper = MonthsScraper(
+            repertoire_url="http://theater.test/", theater_name="fomenki"
+        )
+        scraper.client = client
+        result = await ScraperManager.run_scraper(scraper)
+
+    assert result.status == ScrapeStatus.success
+    assert result.stored.inserted == 1
+    assert result.error == "Failed to scrape 1 pages"
+    assert session.exec(select(ScrapeSnapshot.url)).all() == ["http://theater.test/05/"]
+    assert session.exec(select(PerformanceListing.title)).all() == ["Приречная страна"]
@@ -0,0 +1,61 @@
+import pytest
+
+from src.scrapers.fomenki import FomenkiScraper
+from src.scrapers.parsers import PARSERS, get_parser
+
+
+@pytest.fixture
+def stage_names(mocker):
+    # Resolve every stage name to its own ID to compare stages as well
+    stage_ids = {}
+    mocker.patch(
+        "src.scrapers.stage_resolver.StageResolver.resolve",
+        side_effect=lambda theater_name, stage_name: stage_ids.setdefault(
+            stage_name, len(stage_ids) + 1
+        ),
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("parser_name", ["lxml", "selectolax"])
+async def test_parsers_give_identical_performances(
+    parser_name, html_content, stage_names
+):
+    for module in PARSERS[parser_name][1]:
+        pytest.importorskip(module)
+
+    html = html_content("fomenki")
+    expected = await FomenkiScraper(parser=get_parser("html.parser")).parse_repertoire(
+        html
+    )
+    performances = await FomenkiScraper(
+        parser=get_parser(parser_name)
+    ).parse_repertoire(html)
+
+    assert len(expected) > 0
+    assert [(p.title, p.stage_id, p.datetime) for p in performances] == [
+        (p.title, p.stage_id, p.datetime) for p in expected
+    ]
+
+
+@pytest.mark.parametrize("parser_name", list(PARSERS))
+def test_parse_root_only(parser_name):
+    for module in PARSERS[parser_name][1]:
+        pytest.importorskip(module)
+
+    parser = get_parser(parser_name)
+    html = (
+        "<html><head><title>Title</title></head><body>"
+        '<div class="events"><p class="time">19:00</p><a title="Name">x</a></div>'
+        "</body></html>"
+    )
+    events = parser.parse(html, root="div.events")
+    assert events.select_one("p.time").text == "19:00"
+    assert events.select_one("a").get("title") == "Name"
+    assert events.select("p.place") == []
+    assert parser.parse(html, root="div.missing") is None
+
+
+def test_get_unknown_parser():
+    with pytest.raises(ValueError):
+        get_parser("unknown")
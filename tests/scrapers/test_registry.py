@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+from sqlmodel import select
+
+from src.db_init import seed_theaters_and_stages
+from src.models import Stage, Theater, TheaterName
+from src.scrapers.fomenki import FomenkiScraper
+from src.scrapers.registry import (
+    THEATERS,
+    get_enabled_theaters,
+    load_scraper_class,
+)
+
+
+def test_theater_names_come_from_registry():
+    assert [name.value for name in TheaterName] == [t.name for t in THEATERS]
+
+
+def test_enabled_theaters():
+    assert [t.name for t in get_enabled_theaters([])] == ["fomenki"]
+    assert [t.name for t in get_enabled_theaters(["fomenki"])] == ["fomenki"]
+    with pytest.raises(ValueError, match="Unknown theater"):
+        get_enabled_theaters(["bolshoi"])
+    with pytest.raises(ValueError, match="without a scraper"):
+        get_enabled_theaters(["ramt"])
+
+
+def test_scrapers_are_imported_on_first_use():
+    code = (
+        "import sys\n"
+        "import src.main\n"
+        "assert 'src.scrapers.fomenki' not in sys.modules\n"
+        "assert 'bs4' not in sys.modules\n"
+        "from src.scrapers.manager import ScraperManager\n"
+        "ScraperManager.create_scrapers()\n"
+        "assert 'src.scrapers.fomenki' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+    assert load_scraper_class("fomenki") is FomenkiScraper
+
+
+def test_seeding_adds_missing_theaters_and_stages(session, fomenki_stage):
+    seed_theaters_and_stages(session)
+    seed_theaters_and_stages(session)
+
+    theaters = session.exec(select(Theater)).all()
+    assert sorted(t.name for t in theaters) == sorted(t.name for t in THEATERS)
+    stages = session.exec(select(Stage)).all()
+    assert len(stages) == sum(len(t.stages) for t in THEATERS)
+    assert fomenki_stage in stages
@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from src.models import ScrapedPerformance, ScrapeStatus
+from src.scrapers.scheduler import ScrapeLock, ScrapeScheduler
+from src.scrapers.scraper import Scraper
+from src.services.schedule_service import ScheduleService
+
+
+class FakeScraper(Scraper):
+    def __init__(self, fail=False):
+        super().__init__(repertoire_url="http://test/", theater_name="fomenki")
+        self.fail = fail
+        self.runs = 0
+
+    @staticmethod
+    def parse_page(html_content, parser):
+        return []
+
+    async def parse_repertoire(self, html_content):
+        return []
+
+    async def scrape_page(self, url):
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("Site is down")
+        return [
+            ScrapedPerformance(
+                title="Приречная страна",
+                stage_id=1,
+                datetime=datetime.datetime(2025, 5, 1, 14, 0),
+            )
+        ]
+
+
+@pytest.fixture
+def scheduler_settings(engine, fomenki_stage, mocker):
+    mocker.patch("src.scrapers.manager.engine", engine)
+    mocker.patch("src.scrapers.manager.stage_resolver.load")
+    mocker.patch("src.scrapers.manager.show_resolver.load")
+    mocker.patch("src.scrapers.scheduler.settings.SCRAPE_INTERVAL", 3600)
+    mocker.patch("src.scrapers.scheduler.settings.SCRAPE_JITTER", 0)
+    mocker.patch("src.scrapers.scheduler.settings.SCRAPE_BACKOFF_BASE", 60)
+    return engine
+
+
+@pytest.mark.anyio
+async def test_run_if_due_runs_once_per_interval(scheduler_settings, session):
+    scraper = FakeScraper()
+    scheduler = ScrapeScheduler([scraper], bind=scheduler_settings)
+
+    assert await scheduler.run_if_due(scraper) == 3600
+    assert 3500 < await scheduler.run_if_due(scraper) <= 3600
+    assert scraper.runs == 1
+
+    schedule = ScheduleService().get_by_id(session, "fomenki")
+    assert schedule.last_status == ScrapeStatus.success
+    assert schedule.next_run_at > schedule.last_run_at
+
+
+@pytest.mark.anyio
+async def test_failed_runs_back_off_exponentially(scheduler_settings, session):
+    scraper = FakeScraper(fail=True)
+    scheduler = ScrapeScheduler([scraper], bind=scheduler_settings)
+
+    delays = []
+    for _ in range(3):
+        delays.append(await scheduler.run_if_due(scraper))
+        session.expire_all()
+        schedule = ScheduleService().get_by_id(session, "fomenki")
+        schedule.next_run_at = None
+        ScheduleService().save(session, schedule)
+
+    assert delays == [60, 120, 240]
+    assert schedule.consecutive_failures == 3
+
+
+@pytest.mark.anyio
+async def test_lock_is_single_flight(engine):
+    lock = ScrapeLock(engine)
+
+    async with lock.acquire("fomenki") as acquired:
+        assert acquired
+        async with lock.acquire("fomenki") as acquired_again:
+            assert not acquired_again
+        async with lock.acquire("ramt") as other_acquired:
+            assert other_acquired
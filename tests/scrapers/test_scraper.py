@@ -0,0 +1,83 @@
+import httpx
+import pytest
+
+from src.scrapers.http_client import ValidatorCache, create_http_client
+from src.scrapers.scraper import PageNotModified, Scraper
+
+
+class PageScraper(Scraper):
+    @staticmethod
+    def parse_page(html_content, parser):
+        return []
+
+    async def parse_repertoire(self, html_content):
+        return [html_content]
+
+
+@pytest.fixture
+def site():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="<html></html>", headers={"ETag": '"v1"'})
+
+    return requests, httpx.MockTransport(handler)
+
+
+@pytest.mark.anyio
+async def test_client_is_reused_and_unchanged_page_is_skipped(site):
+    requests, transport = site
+    validators = ValidatorCache()
+
+    async with create_http_client(transport=transport) as client:
+        scraper = PageScraper(
+            repertoire_url="http://theater.test/timetable/",
+            theater_name="test",
+            client=client,
+            validators=validators,
+        )
+
+        url = scraper.repertoire_url
+        assert await scraper.scrape_page(url) == ["<html></html>"]
+        # Validators are only used once the results are stored
+        assert await scraper.scrape_page(url) == ["<html></html>"]
+        scraper.commit_fetched_pages()
+
+        with pytest.raises(PageNotModified):
+            await scraper.scrape_page(url)
+
+    assert "If-None-Match" not in requests[1].headers
+    assert requests[2].headers["If-None-Match"] == '"v1"'
+
+
+class MonthsScraper(PageScraper):
+    def get_page_urls(self):
+        return [f"{self.repertoire_url}{month}/" for month in ("05", "06", "07")]
+
+
+@pytest.mark.anyio
+async def test_pages_are_streamed_as_they_are_parsed():
+    def handler(request):
+        if request.url.path.endswith("/06/"):
+            return httpx.Response(404)
+        return httpx.Response(200, text=f"<p>{request.url.path}</p>")
+
+    async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+        scraper = MonthsScraper(
+            repertoire_url="http://theater.test/timetable/",
+            theater_name="test",
+            client=client,
+            validators=ValidatorCache(),
+        )
+        pages = dict([page async for page in scraper.stream_performances()])
+        assert pages == {
+            "http://theater.test/timetable/05/": ["<p>/timetable/05/</p>"],
+            "http://theater.test/timetable/07/": ["<p>/timetable/07/</p>"],
+        }
+
+        scraper.commit_fetched_page("http://theater.test/timetable/05/")
+        pages = [url async for url, _ in scraper.stream_performances()]
+        assert pages == ["http://theater.test/timetable/07/"]
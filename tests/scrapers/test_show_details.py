@@ -0,0 +1,119 @@
+import asyncio
+import datetime
+
+import httpx
+import pytest
+
+from src.models import ParsedPerformance
+from src.scrapers.fomenki import FomenkiScraper
+from src.scrapers.http_client import create_http_client
+from src.scrapers.parsers import get_parser
+from src.scrapers.scraper import Scraper
+from src.scrapers.show_details import ShowDetailsFetcher
+
+SHOW_PAGE = """
+<html><body><h1>Приречная страна</h1>
+<p>Режиссёр по пластике — Иван Иванов</p>
+<p>Режиссёр — Полина Агуреева</p>
+<p>Продолжительность спектакля 2 часа 30 минут с одним антрактом</p>
+</body></html>
+"""
+
+
+def test_parse_show_page():
+    show = FomenkiScraper.parse_show_page(SHOW_PAGE, get_parser("html.parser"))
+    assert show.director == "Полина Агуреева"
+    assert show.duration == 150
+    assert show.author is None
+
+
+@pytest.mark.anyio
+async def test_show_pages_are_fetched_once_per_ttl(engine, html_content, mocker):
+    mocker.patch("src.scrapers.stage_resolver.StageResolver.resolve", return_value=1)
+    requests = []
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        requests.append(request.url.path)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, text=SHOW_PAGE)
+
+    html = html_content("fomenki")
+    async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+        fetcher = ShowDetailsFetcher(engine, concurrency=2)
+        scraper = FomenkiScraper(client=client, show_details=fetcher)
+        # Pages of a run share requests for shows they both list
+        first, _ = await asyncio.gather(
+            scraper.parse_repertoire(html), scraper.parse_repertoire(html)
+        )
+        shows = len(requests)
+        assert shows == len(set(requests)) > 1
+        assert peak == 2
+
+        # Later runs reuse stored details until they expire
+        scraper.show_details = ShowDetailsFetcher(engine)
+        await scraper.parse_repertoire(html)
+        assert len(requests) == shows
+        scraper.show_details = ShowDetailsFetcher(engine, ttl=0)
+        await scraper.parse_repertoire(html)
+        assert len(requests) == 2 * shows
+
+    assert first[0].author == "Руне Белсвик"
+    assert first[0].director == "Полина Агуреева"
+    assert requests[0].startswith("/performance/")
+
+
+@pytest.mark.anyio
+async def test_failed_show_pages_are_fetched_again_after_a_run(
+    engine, html_content, mocker
+):
+    mocker.patch("src.scrapers.stage_resolver.StageResolver.resolve", return_value=1)
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        return httpx.Response(500 if len(requests) == 1 else 200, text=SHOW_PAGE)
+
+    html = html_content("fomenki")
+    async with create_http_client(transport=httpx.MockTransport(handler)) as client:
+        fetcher = ShowDetailsFetcher(engine, concurrency=1)
+        scraper = FomenkiScraper(client=client, show_details=fetcher)
+        first = await scraper.parse_repertoire(html)
+        shows = len(requests)
+        fetcher.cancel()
+        second = await scraper.parse_repertoire(html)
+
+    # Only the failed page is fetched again, the others are stored
+    assert len(requests) == shows + 1
+    assert requests[shows] == requests[0]
+    assert first[0].director is None
+    assert second[0].director == "Полина Агуреева"
+
+
+class LinkingScraper(Scraper):
+    @staticmethod
+    def parse_page(html_content, parser):
+        return []
+
+
+@pytest.mark.anyio
+async def test_show_pages_without_a_parser_add_no_details(engine):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=SHOW_PAGE))
+    performance = ParsedPerformance(
+        title="Приречная страна",
+        stage_name="Новая сцена",
+        datetime=datetime.datetime(2025, 5, 1, 19, 0),
+        director="Режиссёр",
+        url="/performance/riverside/",
+    )
+    async with create_http_client(transport=transport) as client:
+        scraper = LinkingScraper(
+            repertoire_url="http://theater.test/", theater_name="fomenki", client=client
+        )
+        await ShowDetailsFetcher(engine).enrich(scraper, [performance])
+
+    assert performance.director == "Режиссёр"
@@ -0,0 +1,26 @@
+from src.models import Stage
+from src.scrapers.stage_resolver import StageResolver
+
+
+def test_resolve_normalizes_names(engine, fomenki_stage):
+    resolver = StageResolver(engine)
+
+    assert resolver.resolve("fomenki", "Старая сцена, Зелёный зал") == 1
+    assert resolver.resolve("fomenki", "Старая  сцена, Зеленый зал ") == 1
+    assert resolver.resolve("ramt", "Старая сцена, Зелёный зал") is None
+
+
+def test_resolve_reloads_once_for_unknown_stage(engine, session, fomenki_stage, mocker):
+    resolver = StageResolver(engine)
+    resolver.load()
+    refresh = mocker.spy(resolver, "_refresh")
+
+    assert resolver.resolve("fomenki", "Новая сцена, Фойе") is None
+    assert resolver.resolve("fomenki", "Новая сцена, Фойе") is None
+    assert refresh.call_count == 1
+
+    session.add(Stage(name="Новая сцена, Фойе", theater_id=fomenki_stage.theater_id))
+    session.commit()
+    resolver.load()
+
+    assert resolver.resolve("fomenki", "Новая сцена, Фойе") == 2
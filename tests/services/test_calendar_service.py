@@ -0,0 +1,59 @@
+import datetime
+import gzip
+
+from src.models import CalendarFeed, Stage
+from src.services.calendar_service import CalendarService
+from src.services.listing_service import ListingService
+
+NOW = datetime.datetime(2025, 5, 1)
+
+
+def test_refresh_renders_changed_feeds(session, fomenki_stage, add_performance):
+    new_stage = Stage(
+        name="Новая сцена",
+        address="Кутузовский проспект, 30",
+        theater_id=fomenki_stage.theater_id,
+    )
+    session.add(new_stage)
+    performance = add_performance(
+        "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, 2, 19, 0)
+    )
+    performance.show.director = "Пётр Фоменко"
+    add_performance("Война и мир", new_stage, datetime.datetime(2025, 5, 3, 19, 0))
+    add_performance("Бесы", new_stage, datetime.datetime(2025, 1, 1, 19, 0))
+    ListingService().refresh(session)
+    service = CalendarService()
+
+    feeds = {feed.feed_key: feed for feed in service.refresh(session, "fomenki", NOW)}
+    session.commit()
+    assert len(feeds) == 6
+    body = feeds["theater/fomenki"].body.decode()
+    assert "X-WR-CALNAME:Мастерская Петра Фоменко" in body
+    assert "SUMMARY:Приречная страна" in body
+    # Moscow time is UTC+3
+    assert "DTSTART:20250502T160000Z" in body
+    assert "DESCRIPTION:Режиссёр: Пётр Фоменко" in body
+    assert "Бесы" not in body
+    # Long lines are folded
+    assert all(len(line.encode()) <= 75 for line in body.split("\r\n"))
+    assert "LOCATION:Новая сцена\\, Кутузовский проспект\\, 30" in body.replace(
+        "\r\n ", ""
+    )
+    assert gzip.decompress(feeds["theater/fomenki"].gzip_body) == body.encode()
+    assert "Война и мир" not in feeds[f"stage/{fomenki_stage.stage_id}"].body.decode()
+
+    assert service.refresh(session, "fomenki", NOW) == []
+
+    performance.cancelled_at = NOW
+    session.add(performance)
+    ListingService().refresh(session)
+    rendered = service.refresh(session, "fomenki", NOW)
+    session.commit()
+    assert {feed.feed_key for feed in rendered} == {
+        "theater/fomenki",
+        f"stage/{fomenki_stage.stage_id}",
+        f"show/{performance.show_id}",
+    }
+    assert "STATUS:CANCELLED" in rendered[0].body.decode()
+    stored = session.get(CalendarFeed, "theater/fomenki")
+    assert stored.etag == rendered[0].etag != feeds["theater/fomenki"].etag
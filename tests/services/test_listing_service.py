@@ -0,0 +1,37 @@
+import datetime
+
+from sqlmodel import select
+
+from src.models import Performance, PerformanceListing, Show, Stage, Theater
+from src.services.listing_service import ListingService
+from src.services.performance_service import PerformanceResponseService
+
+
+def test_refresh_rebuilds_theater_listing(session, fomenki_stage, add_performance):
+    ramt_stage = Stage(name="Большая сцена", theater=Theater(name="ramt"))
+    session.add(ramt_stage)
+    session.commit()
+    for title, stage in [("Приречная страна", fomenki_stage), ("Бесы", ramt_stage)]:
+        add_performance(title, stage, datetime.datetime(2025, 5, 1, 19, 0))
+    service = ListingService()
+    service.refresh(session)
+    session.commit()
+
+    performance = session.exec(
+        select(Performance).join(Performance.show).where(Show.title == "Бесы")
+    ).one()
+    performance.cancelled_at = datetime.datetime(2025, 4, 1)
+    fomenki_stage.address = "Кутузовский проспект, 30"
+    session.add_all([performance, fomenki_stage])
+    service.refresh(session, "fomenki")
+    session.commit()
+
+    listing = {row.title: row for row in session.exec(select(PerformanceListing))}
+    assert listing["Приречная страна"].stage_address == "Кутузовский проспект, 30"
+    assert listing["Приречная страна"].theater_full_name == "Мастерская Петра Фоменко"
+    # Other theaters are left as they were
+    assert listing["Бесы"].cancelled_at is None
+
+    [response] = PerformanceResponseService().get_by_theater_name(session, "fomenki")
+    assert response.stage.address == "Кутузовский проспект, 30"
+    assert response.theater.full_name == "Мастерская Петра Фоменко"
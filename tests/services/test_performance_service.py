@@ -0,0 +1,47 @@
+import datetime
+
+from sqlmodel import select
+
+from src.models import Performance
+from src.services.performance_service import PerformanceService
+from src.services.show_service import ShowService
+
+
+def make_performance(show_id, day):
+    return Performance(
+        show_id=show_id,
+        stage_id=1,
+        datetime=datetime.datetime(2025, 5, day, 19, 0),
+    )
+
+
+def test_insert_many_skips_existing(session, fomenki_stage):
+    show_ids = ShowService().create_many(session, "fomenki", ["Одна", "Две"])
+    assert ShowService().create_many(session, "fomenki", ["Две"]) == {
+        "Две": show_ids["Две"]
+    }
+
+    service = PerformanceService()
+    first = service.insert_many(
+        session,
+        [make_performance(show_ids["Одна"], 1), make_performance(show_ids["Две"], 2)],
+    )
+    session.commit()
+    assert len(first) == 2
+
+    second = service.insert_many(
+        session,
+        [
+            make_performance(show_ids["Одна"], 1),
+            make_performance(show_ids["Две"], 3),
+            make_performance(show_ids["Две"], 3),
+        ],
+        batch_size=1,
+    )
+    session.commit()
+    [inserted] = second
+    assert (inserted.show_id, inserted.datetime.day) == (show_ids["Две"], 3)
+
+    performances = session.exec(select(Performance)).all()
+    assert len(performances) == 3
+    assert {p.show.title for p in performances} == {"Одна", "Две"}
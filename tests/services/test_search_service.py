@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+from src.services.listing_service import ListingService
+from src.services.search_service import SearchService, word_similarity
+
+
+@pytest.mark.parametrize(
+    ("query", "title"),
+    [
+        ("приречная", "Приречная страна"),
+        ("Страна", "Приречная страна"),
+        ("приреная", "Приречная страна"),  # Typo
+        ("приречной", "Приречная страна"),  # Other word form
+        ("елка", "Ёлка у Ивановых"),
+    ],
+)
+def test_similar_titles_match(query, title):
+    assert word_similarity(query, title) >= 0.6
+
+
+def test_different_titles_do_not_match():
+    assert word_similarity("Бесы", "Приречная страна") < 0.6
+    assert word_similarity("!", "Приречная страна") == 0
+
+
+def test_search_ranks_and_paginates(session, fomenki_stage, add_performance):
+    titles = ["Приречная страна", "Прикрепленная страница", "Бесы", "Страна"]
+    for day, title in enumerate(titles * 2, start=1):
+        add_performance(
+            title,
+            fomenki_stage,
+            datetime.datetime(2025, 5, day, 19, 0),
+            cancelled_at=datetime.datetime(2025, 4, 1) if day == 1 else None,
+        )
+    ListingService().refresh(session)
+    session.commit()
+
+    service = SearchService()
+    results = service.search(session, "страна")
+    assert [(p.title, p.datetime.day) for p in results] == [
+        ("Страна", 4),
+        ("Приречная страна", 5),
+        ("Страна", 8),
+        ("Прикрепленная страница", 2),
+        ("Прикрепленная страница", 6),
+    ]
+
+    results = service.search(session, "Страна", skip=1, limit=1)
+    assert [(p.title, p.datetime.day) for p in results] == [("Приречная страна", 5)]
+    assert service.search(session, "Гамлет") == []
@@ -0,0 +1,136 @@
+import datetime
+
+from sqlmodel import select
+
+from src.models import ChangeType, Performance, PerformanceListing, ScrapedPerformance
+from src.services.change_service import ChangeService
+from src.services.sync_service import SyncService
+
+NOW = datetime.datetime(2025, 5, 10)
+
+
+def make_performance(title, day, month=5, director=None):
+    return ScrapedPerformance(
+        title=title,
+        stage_id=1,
+        datetime=datetime.datetime(2025, month, day, 19, 0),
+        director=director,
+    )
+
+
+def stored_performances(session):
+    session.expire_all()
+    return {p.show.title: p for p in session.exec(select(Performance)).all()}
+
+
+def test_sync_inserts_updates_and_cancels(session, fomenki_stage):
+    service = SyncService()
+    first = service.sync(
+        session,
+        "fomenki",
+        [
+            make_performance("Прошедший", 2),
+            make_performance("Отменённый", 20),
+            make_performance("Изменённый", 21),
+            make_performance("Прежний", 22),
+            make_performance("Июньский", 5, month=6),
+        ],
+        now=NOW,
+    )
+    session.commit()
+    assert first.inserted == 5
+
+    second = service.sync(
+        session,
+        "fomenki",
+        [
+            make_performance("Изменённый", 21, director="Режиссёр"),
+            make_performance("Прежний", 22),
+            make_performance("Новый", 23),
+        ],
+        now=NOW,
+    )
+    session.commit()
+
+    assert (second.inserted, second.updated, second.unchanged, second.cancelled) == (
+        1,
+        1,
+        1,
+        1,
+    )
+    performances = stored_performances(session)
+    assert performances["Отменённый"].cancelled_at == NOW
+    assert performances["Изменённый"].show.director == "Режиссёр"
+    # Past performances and months missing from the scrape are kept
+    assert performances["Прошедший"].cancelled_at is None
+    assert performances["Июньский"].cancelled_at is None
+
+    third = service.sync(
+        session, "fomenki", [make_performance("Отменённый", 20)], now=NOW
+    )
+    session.commit()
+    assert third.updated == 1
+    assert stored_performances(session)["Отменённый"].cancelled_at is None
+
+
+def test_sync_logs_changes(session, fomenki_stage):
+    service = SyncService()
+    service.sync(
+        session,
+        "fomenki",
+        [make_performance("Перенесённый", 20), make_performance("Снятый", 21)],
+        now=NOW,
+    )
+    session.commit()
+    inserted = ChangeService().get_since(session)
+    assert [change.change_type for change in inserted] == [ChangeType.inserted] * 2
+
+    service.sync(
+        session,
+        "fomenki",
+        [make_performance("Перенесённый", 25), make_performance("Новый", 23)],
+        now=NOW,
+    )
+    session.commit()
+
+    changes = ChangeService().get_since(session, since=inserted[-1].sequence)
+    assert [(c.change_type, c.title, c.datetime.day) for c in changes] == [
+        (ChangeType.removed, "Снятый", 21),
+        (ChangeType.inserted, "Новый", 23),
+        (ChangeType.rescheduled, "Перенесённый", 25),
+    ]
+    assert changes[2].previous_datetime.day == 20
+    assert changes[2].previous_performance_id == inserted[0].performance_id
+    assert [c.sequence for c in changes] == sorted(c.sequence for c in changes)
+
+
+def test_sync_refreshes_listing_of_changed_performances(session, fomenki_stage):
+    service = SyncService()
+    service.sync(
+        session,
+        "fomenki",
+        [make_performance("Изменённый", 20), make_performance("Изменённый", 5, 6)],
+        now=NOW,
+    )
+    session.commit()
+
+    service.sync(
+        session,
+        "fomenki",
+        [
+            make_performance("Изменённый", 20, director="Режиссёр"),
+            make_performance("Новый", 23),
+        ],
+        now=NOW,
+    )
+    session.commit()
+
+    listing = session.exec(
+        select(PerformanceListing).order_by(PerformanceListing.datetime)
+    ).all()
+    assert [(row.title, row.datetime.day, row.director) for row in listing] == [
+        ("Изменённый", 20, "Режиссёр"),
+        ("Новый", 23, None),
+        # Months missing from the scrape are refreshed for changed shows
+        ("Изменённый", 5, "Режиссёр"),
+    ]
@@ -0,0 +1,16 @@
+from benchmarks import api, parse, store
+
+
+def test_synthetic_page_has_requested_events():
+    [*_, result] = parse.run(rounds=1, sizes=(120,))
+    assert result["params"]["page"] == "synthetic-120"
+    assert result["performances"] == 120
+    assert result["identical"]
+
+
+def test_store_and_api_benchmarks_run():
+    results = store.run(rounds=1, sizes=(100,)) + api.run(
+        rounds=1, sizes=(100,), requests=1
+    )
+    assert {result["benchmark"] for result in results} == {"store", "api"}
+    assert all(result["min"] > 0 for result in results)
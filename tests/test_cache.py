@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlmodel import Session
+
+from src.cache import MemoryCache, RedisCache, response_cache
+from src.models import CachedResponse, ScrapedPerformance
+from src.scrapers.manager import ScraperManager
+from src.services.listing_service import ListingService
+
+
+class FakeRedis:
+    """Local stand-in for a Redis client"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, px=None):
+        self.values[key] = value.encode()
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+
+
+def add_listed_performance(session, add_performance, stage, day):
+    add_performance("Приречная страна", stage, datetime.datetime(2025, 5, day, 19, 0))
+    ListingService().refresh(session)
+    session.commit()
+
+
+@pytest.mark.parametrize(
+    "backend", [MemoryCache(), RedisCache(client=FakeRedis())], ids=["memory", "redis"]
+)
+def test_responses_are_cached_until_performances_change(
+    client, session, engine, fomenki_stage, add_performance, backend
+):
+    response_cache.backend = backend
+    add_listed_performance(session, add_performance, fomenki_stage, 1)
+
+    response = client.get("/performances/", params={"theater_name": "fomenki"})
+    assert len(response.json()) == 1
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"].startswith("public")
+
+    # Served from the cache without seeing the new performance
+    add_listed_performance(session, add_performance, fomenki_stage, 2)
+    response = client.get("/performances/", params={"theater_name": "fomenki"})
+    assert len(response.json()) == 1
+    response = client.get(
+        "/performances/",
+        params={"theater_name": "fomenki"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    performance = ScrapedPerformance(
+        title="Мамаша Кураж",
+        stage_id=fomenki_stage.stage_id,
+        datetime=datetime.datetime(2025, 5, 3, 19, 0),
+    )
+    with Session(engine) as sync_session:
+        asyncio.run(
+            ScraperManager.store_performances(sync_session, [performance], "fomenki")
+        )
+
+    response = client.get(
+        "/performances/",
+        params={"theater_name": "fomenki"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert response.headers["ETag"] != etag
+
+
+def test_errors_are_not_cached(client, fomenki_stage):
+    assert client.get("/performances/1").status_code == 404
+    assert "ETag" not in client.get("/performances/1").headers
+
+
+@pytest.mark.anyio
+async def test_memory_cache_evicts_least_recently_used_and_expired():
+    cache = MemoryCache(max_entries=2, ttl=0.05)
+    response = CachedResponse(status_code=200, headers={}, body=b"[]", etag='"1"')
+    await cache.set("a", response)
+    await cache.set("b", response)
+    await cache.get("a")
+    await cache.set("c", response)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == response
+
+    await asyncio.sleep(0.05)
+    assert await cache.get("a") is None
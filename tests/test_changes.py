@@ -0,0 +1,64 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.changes import change_notifier, stream_changes, wait_for_changes
+from src.config import settings
+from src.services.change_service import ChangeService
+
+
+@pytest.fixture
+def session_factory(engine, database_path):
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+    return async_sessionmaker(async_engine, class_=AsyncSession)
+
+
+def record_change(session, add_performance, stage, day):
+    performance = add_performance(
+        "Приречная страна", stage, datetime.datetime(2025, 5, day, 19, 0)
+    )
+    session.commit()
+    [change] = ChangeService().record(session, "fomenki", [performance], [])
+    session.commit()
+    return change.sequence
+
+
+@pytest.mark.anyio
+async def test_waiting_for_changes_wakes_up_on_notify(
+    session, session_factory, fomenki_stage, add_performance, mocker
+):
+    # Only a notification can end the wait in time
+    mocker.patch.object(settings, "CHANGES_POLL_INTERVAL", 60)
+    task = asyncio.create_task(wait_for_changes(session_factory, since=0, timeout=60))
+    await asyncio.sleep(0.1)
+    assert not task.done()
+
+    sequence = record_change(session, add_performance, fomenki_stage, 1)
+    change_notifier.notify()
+    [change] = await asyncio.wait_for(task, 5)
+    assert change.sequence == sequence
+    assert change.title == "Приречная страна"
+
+    assert await wait_for_changes(session_factory, since=sequence, timeout=0) == []
+
+
+@pytest.mark.anyio
+async def test_stream_changes_resumes_after_sequence(
+    session, session_factory, fomenki_stage, add_performance, mocker
+):
+    first = record_change(session, add_performance, fomenki_stage, 1)
+    second = record_change(session, add_performance, fomenki_stage, 2)
+    mocker.patch.object(settings, "CHANGES_KEEPALIVE", 0)
+
+    stream = stream_changes(session_factory, since=first)
+    event = await anext(stream)
+    assert event.startswith(f"id: {second}\nevent: inserted\ndata: {{".encode())
+    assert b'"datetime":"2025-05-02T19:00:00"' in event
+    assert await anext(stream) == b": keepalive\n\n"
+    await stream.aclose()
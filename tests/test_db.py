@@ -0,0 +1,118 @@
+import datetime
+
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import Session, select
+
+from src.db import create_db_and_tables
+from src.models import Performance, PerformanceListing, Show
+
+# Performances as stored before shows were introduced
+LEGACY_SCHEMA = [
+    "CREATE TABLE theater (theater_id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "full_name VARCHAR, url VARCHAR)",
+    "CREATE TABLE stage (stage_id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "address VARCHAR, theater_id INTEGER NOT NULL REFERENCES theater (theater_id))",
+    "CREATE TABLE performance (performance_id INTEGER PRIMARY KEY, "
+    "title VARCHAR NOT NULL, stage_id INTEGER NOT NULL REFERENCES stage (stage_id), "
+    "datetime DATETIME NOT NULL, director VARCHAR, author VARCHAR, "
+    "cancelled_at DATETIME)",
+    "CREATE UNIQUE INDEX uq_performance_title_stage_datetime "
+    "ON performance (title, stage_id, datetime)",
+    "CREATE TABLE performancelisting (performance_id INTEGER PRIMARY KEY, "
+    "title VARCHAR NOT NULL, datetime DATETIME NOT NULL, director VARCHAR, "
+    "author VARCHAR, cancelled_at DATETIME, stage_id INTEGER NOT NULL, "
+    "stage_name VARCHAR NOT NULL, stage_address VARCHAR, "
+    "theater_id INTEGER NOT NULL, theater_name VARCHAR NOT NULL, "
+    "theater_full_name VARCHAR, theater_url VARCHAR)",
+    "INSERT INTO theater VALUES (1, 'fomenki', NULL, NULL), (2, 'ramt', NULL, NULL)",
+    "INSERT INTO stage VALUES (1, 'Новая сцена', NULL, 1), "
+    "(2, 'Старая сцена', NULL, 1), (3, 'Большая сцена', NULL, 2)",
+    "INSERT INTO performance VALUES "
+    "(1, 'Бесы', 1, '2025-05-01 19:00:00.000000', NULL, NULL, NULL), "
+    "(2, 'Бесы', 2, '2025-05-02 19:00:00.000000', 'Режиссёр', NULL, NULL), "
+    "(3, 'Бесы', 3, '2025-05-01 19:00:00.000000', NULL, 'Автор', NULL)",
+    "INSERT INTO performancelisting VALUES "
+    "(1, 'Бесы', '2025-05-01 19:00:00.000000', NULL, NULL, NULL, "
+    "1, 'Новая сцена', NULL, 1, 'fomenki', NULL, NULL)",
+]
+
+
+def test_performances_are_migrated_to_shows(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    create_db_and_tables(engine)
+    # Migrated databases are left alone
+    create_db_and_tables(engine)
+
+    with Session(engine) as session:
+        shows = session.exec(select(Show).order_by(Show.theater_id)).all()
+        assert [(s.theater_id, s.title, s.director, s.author) for s in shows] == [
+            (1, "Бесы", "Режиссёр", None),
+            (2, "Бесы", None, "Автор"),
+        ]
+        performances = session.exec(
+            select(Performance).order_by(Performance.performance_id)
+        ).all()
+        assert [p.show_id for p in performances] == [
+            shows[0].show_id,
+            shows[0].show_id,
+            shows[1].show_id,
+        ]
+        assert performances[0].datetime == datetime.datetime(2025, 5, 1, 19, 0)
+        listing = session.exec(select(PerformanceListing)).one()
+        assert listing.show_id == shows[0].show_id
+
+    columns = {column["name"] for column in inspect(engine).get_columns("performance")}
+    assert "title" not in columns
+    indexes = {index["name"] for index in inspect(engine).get_indexes("performance")}
+    assert "uq_performance_show_stage_datetime" in indexes
+    engine.dispose()
+
+
+# Tables of the first release: no listing and no unique index
+BASELINE_SCHEMA = [
+    "CREATE TABLE theater (theater_id INTEGER NOT NULL, name VARCHAR(7) NOT NULL, "
+    "full_name VARCHAR, url VARCHAR, PRIMARY KEY (theater_id))",
+    "CREATE TABLE stage (stage_id INTEGER NOT NULL, name VARCHAR NOT NULL, "
+    "theater_id INTEGER NOT NULL, address VARCHAR, PRIMARY KEY (stage_id), "
+    "FOREIGN KEY(theater_id) REFERENCES theater (theater_id))",
+    "CREATE TABLE performance (performance_id INTEGER NOT NULL, "
+    "title VARCHAR NOT NULL, stage_id INTEGER NOT NULL, datetime DATETIME NOT NULL, "
+    "director VARCHAR, author VARCHAR, PRIMARY KEY (performance_id), "
+    "FOREIGN KEY(stage_id) REFERENCES stage (stage_id))",
+    "INSERT INTO theater VALUES (1, 'fomenki', NULL, NULL)",
+    "INSERT INTO stage VALUES (1, 'Новая сцена', 1, NULL)",
+    "INSERT INTO performance VALUES "
+    "(1, 'Бесы', 1, '2025-05-01 19:00:00.000000', 'Режиссёр', NULL), "
+    "(2, 'Бесы', 1, '2025-05-02 19:00:00.000000', NULL, NULL)",
+]
+
+
+def test_first_release_database_is_migrated(database_path):
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+
+    create_db_and_tables(engine)
+
+    with Session(engine) as session:
+        [show] = session.exec(select(Show)).all()
+        assert (show.title, show.director) == ("Бесы", "Режиссёр")
+        performances = session.exec(select(Performance)).all()
+        assert {p.show_id for p in performances} == {show.show_id}
+        assert all(p.cancelled_at is None for p in performances)
+        # New performances no longer need a title
+        session.add(
+            Performance(
+                show_id=show.show_id,
+                stage_id=1,
+                datetime=datetime.datetime(2025, 5, 3, 19, 0),
+            )
+        )
+        session.commit()
+        assert session.exec(select(PerformanceListing)).all() == []
+    engine.dispose()
@@ -0,0 +1,25 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+def slow_initialize_database():
+    time.sleep(0.5)
+
+
+def test_startup_does_not_wait_for_database(mocker):
+    mocker.patch("src.main.settings.SCHEDULER_ENABLED", False)
+    mocker.patch("src.main.initialize_database", slow_initialize_database)
+
+    started = time.perf_counter()
+    with TestClient(app) as client:
+        assert time.perf_counter() - started < 0.5
+        assert client.get("/is_alive/").status_code == 200
+        assert client.get("/is_ready/").status_code == 503
+
+        time.sleep(0.6)
+        response = client.get("/is_ready/")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+from sqlmodel import text
+
+from src.metrics import Metrics, metrics
+from src.models import ScrapeStatus, StoreResult
+from src.services.listing_service import ListingService
+
+
+@pytest.fixture
+def enabled_metrics():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    metrics.enable(prometheus_client.CollectorRegistry())
+    yield metrics
+    metrics.enabled = False
+
+
+def test_disabled_metrics_are_no_ops(client):
+    disabled = Metrics(enabled=False)
+    with disabled.time_phase("fomenki", "fetch"):
+        pass
+    disabled.record_run("fomenki", ScrapeStatus.success, 1, StoreResult(inserted=1))
+    disabled.observe_request("GET", "/performances/", 200, 0.1)
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_scraper_phases_and_runs(enabled_metrics):
+    with enabled_metrics.time_phase("fomenki", "parse"):
+        pass
+    enabled_metrics.record_run(
+        "fomenki", ScrapeStatus.success, 3, StoreResult(inserted=2, unchanged=1)
+    )
+
+    registry = enabled_metrics.registry
+    labels = {"theater": "fomenki", "phase": "parse"}
+    assert registry.get_sample_value("scraper_phase_seconds_count", labels) == 1
+    assert (
+        registry.get_sample_value(
+            "scraper_runs_total", {"theater": "fomenki", "status": "success"}
+        )
+        == 1
+    )
+    for outcome, count in {"found": 3, "inserted": 2, "unchanged": 1}.items():
+        labels = {"theater": "fomenki", "outcome": outcome}
+        assert registry.get_sample_value("scraper_performances_total", labels) == count
+
+
+def test_slow_queries_are_logged(engine, caplog):
+    slow_metrics = Metrics(enabled=False, slow_query_threshold=1e-9)
+    slow_metrics.instrument_engine(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert "Slow query" in caplog.text
+    assert "SELECT 1" in caplog.text
+
+
+def test_queries_and_requests_are_timed(
+    enabled_metrics, engine, client, session, fomenki_stage, add_performance
+):
+    enabled_metrics.instrument_engine(engine)
+    add_performance(
+        "Приречная страна",
+        fomenki_stage,
+        datetime.datetime(2025, 5, 1, 19, 0),
+    )
+    ListingService().refresh(session)
+    session.commit()
+
+    # The second response comes from the response cache
+    for _ in range(2):
+        assert client.get("/performances/1").status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+
+    registry = enabled_metrics.registry
+    labels = {
+        "method": "GET",
+        "route": "/performances/{performance_id}",
+        "status": "200",
+    }
+    assert registry.get_sample_value("http_request_seconds_count", labels) == 2
+    assert registry.get_sample_value("db_query_seconds_count", {"operation": "INSERT"})
+    assert "http_request_seconds_bucket" in response.text
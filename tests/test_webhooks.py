@@ -0,0 +1,97 @@
+import datetime
+import hashlib
+import hmac
+import json
+
+import httpx
+import pytest
+
+from src.config import settings
+from src.models import WebhookCursor
+from src.scrapers.scheduler import ScrapeLock
+from src.services.change_service import ChangeService
+from src.webhooks import WebhookDispatcher
+
+URL = "https://example.com/hook"
+
+
+@pytest.mark.anyio
+async def test_webhooks_retry_failed_batches(
+    engine, session, fomenki_stage, add_performance, mocker
+):
+    mocker.patch.object(settings, "WEBHOOK_SECRET", "secret")
+    statuses = [500, 200]
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return httpx.Response(statuses.pop(0))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    dispatcher = WebhookDispatcher([URL], client, bind=engine, lock=ScrapeLock(engine))
+    # New webhooks start after the latest change
+    assert await dispatcher.deliver(URL) is None
+
+    performances = [
+        add_performance(
+            "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, day, 19, 0)
+        )
+        for day in (1, 2)
+    ]
+    session.commit()
+    changes = ChangeService().record(session, "fomenki", performances, [])
+    session.commit()
+
+    assert await dispatcher.deliver(URL) == settings.WEBHOOK_RETRY_BASE
+    assert await dispatcher.deliver(URL) == 0
+    assert await dispatcher.deliver(URL) is None
+
+    # The failed batch is delivered again
+    assert requests[0].content == requests[1].content
+    body = json.loads(requests[1].content)
+    assert [change["sequence"] for change in body["changes"]] == [
+        change.sequence for change in changes
+    ]
+    assert body["last_sequence"] == changes[-1].sequence
+    signature = hmac.new(b"secret", requests[1].content, hashlib.sha256).hexdigest()
+    assert requests[1].headers["X-Webhook-Signature"] == f"sha256={signature}"
+
+    session.expire_all()
+    cursor = session.get(WebhookCursor, URL)
+    assert (cursor.last_sequence, cursor.consecutive_failures) == (
+        changes[-1].sequence,
+        0,
+    )
+
+
+@pytest.mark.anyio
+async def test_webhooks_release_the_lock_while_posting(
+    engine, session, fomenki_stage, add_performance, mocker
+):
+    lock = ScrapeLock(engine)
+    acquired_while_posting = []
+
+    async def respond(request):
+        async with lock.acquire(f"webhook:{URL}") as acquired:
+            acquired_while_posting.append(acquired)
+        return httpx.Response(200)
+
+    mocker.patch(
+        "src.webhooks.create_http_client",
+        return_value=httpx.AsyncClient(transport=httpx.MockTransport(respond)),
+    )
+    dispatcher = WebhookDispatcher([URL], bind=engine, lock=lock)
+    assert await dispatcher.deliver(URL) is None
+    performance = add_performance(
+        "Приречная страна", fomenki_stage, datetime.datetime(2025, 5, 1, 19, 0)
+    )
+    session.commit()
+    ChangeService().record(session, "fomenki", [performance], [])
+    session.commit()
+
+    assert await dispatcher.deliver(URL) == 0
+    assert acquired_while_posting == [True]
+
+    # Clients created by the dispatcher are closed with it
+    await dispatcher.stop()
+    assert dispatcher.client.is_closed